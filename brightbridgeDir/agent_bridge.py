@@ -3,272 +3,1245 @@
 Bridge script to interface between Node.js and Google ADK agents
 Enhanced for Railway deployment with better error handling
 """
+import time
+# Taken first so the one-shot "imports" timing span covers the whole module
+MODULE_STARTED = time.perf_counter()
 import sys
 import json
 import asyncio
-import time
+import argparse
+import signal
 import uuid
+import zlib
 from datetime import datetime
 import os
 
+# Longest NDJSON request line accepted in worker/socket mode (chat history included)
+MAX_REQUEST_LINE_BYTES = 16 * 1024 * 1024
+
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def log_error(message):
-    """Log error to stderr for debugging"""
-    print(f"ERROR: {message}", file=sys.stderr, flush=True)
+from bridge.admission import AdmissionController, Shed
+from bridge.batch import run_batch
+from bridge.cache import ResponseCache
+from bridge.crisis import CrisisDetector
+from bridge.history import HistoryCompactor
+from bridge.latency import InjectedFailure, LatencyModel
+from bridge.log import dropped_records, setup_logging
+from bridge.metrics import REGISTRY, start_metrics_server, write_metrics_file
+from bridge.resilience import Resilience, TransientError, is_transient
+from bridge.routing import DIRECT, INTENT_KEYWORDS, ORCHESTRATOR, IntentRouter
+from bridge.rules import RuleEngine
+from bridge.sessions import SessionManager
+from bridge.timing import NULL_TIMER, Timer, process_age_ms
+
+# JSON-lines records on stderr via a background writer (BRIDGE_LOG_LEVEL / BRIDGE_LOG_SAMPLE)
+logger = setup_logging()
+
+def log_error(message, **fields):
+    """Log an error, with optional structured fields"""
+    logger.error(message, extra=fields)
+
+def log_info(message, **fields):
+    """Log at info level (subject to BRIDGE_LOG_SAMPLE), with optional structured fields"""
+    logger.info(message, extra=fields)
 
-def log_info(message):
-    """Log info to stderr for debugging"""
-    print(f"INFO: {message}", file=sys.stderr, flush=True)
+def log_debug(message, **fields):
+    """Per-request detail, only written with BRIDGE_LOG_LEVEL=DEBUG"""
+    logger.debug(message, extra=fields)
+
+def log_timings(request_id, timings):
+    """One structured stderr record with a request's timing spans (never sampled out)"""
+    logger.info("timings", extra={"type": "timings", "id": request_id, **timings, "unsampled": True})
 
 # Enhanced development mode detection
 DEVELOPMENT_MODE = (
     os.getenv('NODE_ENV') == 'development' or 
-    not os.getenv('GOOGLE_API_KEY') or
+    # Replayed recordings need no API key
+    (not os.getenv('GOOGLE_API_KEY') and not os.getenv('BRIDGE_REPLAY_DIR')) or
     os.getenv('RAILWAY_ENVIRONMENT_NAME') is not None  # Railway deployment
 )
 
+# Conversation sessions kept per bridge process (LRU size cap + idle expiry)
+SESSION_MAX = int(os.getenv('BRIDGE_SESSION_MAX', '1000'))
+SESSION_IDLE_TTL = float(os.getenv('BRIDGE_SESSION_TTL_SECONDS', '1800'))
+
+# Durable ADK sessions in a SQLite file that every worker on the host can share
+# (unset keeps them in memory); writes are batched every FLUSH_MS or BATCH rows
+SESSION_DB = os.getenv('BRIDGE_SESSION_DB')
+SESSION_DB_BATCH = int(os.getenv('BRIDGE_SESSION_DB_BATCH', '64'))
+SESSION_DB_FLUSH_MS = float(os.getenv('BRIDGE_SESSION_DB_FLUSH_MS', '50'))
+SESSION_DB_CACHE = int(os.getenv('BRIDGE_SESSION_DB_CACHE', '256'))
+SESSION_DB_RETENTION_DAYS = float(os.getenv('BRIDGE_SESSION_DB_RETENTION_DAYS', '30'))
+
+# Reply cache for repeated context-free prompts (crisis traffic is never cached)
+RESPONSE_CACHE = os.getenv('BRIDGE_RESPONSE_CACHE', '1') != '0'
+RESPONSE_CACHE_MAX = int(os.getenv('BRIDGE_RESPONSE_CACHE_MAX', '512'))
+RESPONSE_CACHE_TTL = float(os.getenv('BRIDGE_RESPONSE_CACHE_TTL_SECONDS', '600'))
+
+# Conversation history kept verbatim before older turns are folded into a summary
+HISTORY_KEEP_TURNS = int(os.getenv('BRIDGE_HISTORY_KEEP_TURNS', '6'))
+HISTORY_TOKEN_BUDGET = int(os.getenv('BRIDGE_HISTORY_TOKEN_BUDGET', '2000'))
+
+# Record every agent run to gzip JSONL files, or replay such recordings instead of
+# calling the model (BRIDGE_REPLAY_SPEED: 1 = recorded timing, 2 = twice as fast, 0 = no waits)
+RECORD_DIR = os.getenv('BRIDGE_RECORD_DIR')
+REPLAY_DIR = os.getenv('BRIDGE_REPLAY_DIR')
+REPLAY_SPEED = float(os.getenv('BRIDGE_REPLAY_SPEED', '1'))
+
+# Send unambiguous agent_types straight to their sub-agent instead of the root orchestrator
+DIRECT_ROUTING = os.getenv('BRIDGE_DIRECT_ROUTING', '1') != '0'
+
+# Mock enrichment rule table (bridge/enrichment_rules.json by default) and blocks added per reply
+MOCK_RULES_PATH = os.getenv('BRIDGE_MOCK_RULES') or None
+MOCK_MAX_ENRICHMENTS = int(os.getenv('BRIDGE_MOCK_MAX_ENRICHMENTS', '2'))
+
+# Local crisis lexicon scan ahead of any model call (bridge/crisis_lexicon.json by default)
+CRISIS_FAST_PATH = os.getenv('BRIDGE_CRISIS_FAST_PATH', '1') != '0'
+crisis_detector = CrisisDetector.from_file(os.getenv('BRIDGE_CRISIS_LEXICON') or None) if CRISIS_FAST_PATH else None
+
+# Per-stage timing spans for every request (a request can also ask with "timings": true)
+TIMINGS = os.getenv('BRIDGE_TIMINGS', '0') == '1'
+
+# Requests allowed to wait for a slot once --max-concurrency are running, and the
+# deadline applied to requests that do not send their own deadline_ms (0 = none)
+MAX_QUEUE = int(os.getenv('BRIDGE_MAX_QUEUE', '64'))
+DEFAULT_DEADLINE_MS = float(os.getenv('BRIDGE_DEFAULT_DEADLINE_MS', '0'))
+
+# Shared by every connection; long-running modes install their cap at startup
+admission = AdmissionController()
+
+# Retries / circuit breaker around agent runs (BRIDGE_RETRY_*, BRIDGE_BREAKER_*), plus
+# hedged second attempts for non-streaming, session-less requests when BRIDGE_HEDGE=1
+resilience = Resilience.from_env(os.environ)
+HEDGING = os.getenv('BRIDGE_HEDGE', '0') == '1'
+
+# Prometheus text file written when the process exits ("{pid}" is substituted)
+METRICS_FILE = os.getenv('BRIDGE_METRICS_FILE')
+
+REQUESTS = REGISTRY.counter(
+    "bridge_requests_total", "Chat requests by agent_type, route and outcome", ("agent_type", "route", "outcome"))
+REQUEST_SECONDS = REGISTRY.histogram(
+    "bridge_request_duration_seconds", "Chat request latency", ("agent_type", "route"))
+IN_FLIGHT = REGISTRY.gauge("bridge_requests_in_flight", "Chat requests being processed")
+CRISIS_DETECTIONS = REGISTRY.counter("bridge_crisis_detections_total", "Requests answered with crisis resources")
+REGISTRY.gauge("bridge_sessions", "Conversation sessions held by the bridge").set_function(
+    lambda: len(_bridge.sessions) if _bridge is not None else 0)
+REGISTRY.gauge("bridge_admission_waiting", "Chat requests queued for a concurrency slot").set_function(
+    lambda: admission.stats()["waiting"])
+
 if DEVELOPMENT_MODE:
     log_info("Running in development/Railway mode - using enhanced mock responses")
-    
-    class MockAgentBridge:
-        def __init__(self):
-            self.responses = {
-                'crisis': [
-                    "I understand you're going through a really difficult time right now, and I want you to know that reaching out shows incredible strength. Your feelings are valid, and you don't have to face this alone.",
-                    "I'm here to support you through this crisis. While I'm currently in development mode, please know that immediate help is available if you need it.",
-                    "Thank you for trusting me with how you're feeling. Crisis situations can feel overwhelming, but there are people trained to help you through this."
-                ],
-                'therapy': [
-                    "I can hear that you're looking for emotional support, and I'm glad you reached out. It takes courage to acknowledge when we need help with our mental health.",
-                    "Your emotional wellbeing matters, and it's completely normal to need support. While my full therapeutic capabilities are being developed, I want you to know that what you're feeling is valid.",
-                    "Mental health is just as important as physical health. I'm here to listen and provide what support I can while encouraging you to also connect with professional resources."
-                ],
-                'education': [
-                    "Learning can be challenging, especially when you're neurodivergent, but everyone has their own unique learning style and strengths. Let's explore what works best for you.",
-                    "Education should be accessible and tailored to your needs. While my specialized education agent is being configured, I can share some general strategies that many neurodivergent learners find helpful.",
-                    "Your learning journey is unique, and there's no one-size-fits-all approach. Let's work together to find strategies that play to your strengths."
-                ],
-                'social': [
-                    "Social interactions can feel complex, but remember that everyone struggles with social situations sometimes. You're not alone in finding this challenging.",
-                    "Building social skills is a process, and it's okay to take it one step at a time. Authenticity is more valuable than trying to fit into social expectations that don't feel natural.",
-                    "Social connections are important, but they should feel genuine and comfortable for you. Let's explore ways to build meaningful relationships at your own pace."
-                ],
-                'interview': [
-                    "Job interviews can be particularly challenging for neurodivergent individuals, but your unique perspective and skills are valuable assets. Let's work on presenting your best self authentically.",
-                    "Interview preparation is about more than just answering questions - it's about communicating your value and finding the right fit for both you and the employer.",
-                    "Your neurodivergent traits can be strengths in the workplace. Let's focus on how to effectively communicate your abilities and any accommodations you might need."
-                ],
-                'screening': [
-                    "Understanding yourself better is a wonderful step toward self-advocacy and getting the support you need. Self-awareness is incredibly valuable.",
-                    "Learning about neurodivergent conditions can be enlightening and validating. Remember, neurodivergence isn't something to be 'fixed' - it's a different way of experiencing the world.",
-                    "Exploring whether you might be neurodivergent is a personal journey. While I can provide educational information, professional evaluation is important for accurate understanding."
-                ],
-                'caregiver': [
-                    "Supporting a neurodivergent loved one shows incredible care and dedication. Your efforts to understand and help make a real difference in their life.",
-                    "Being a caregiver can be both rewarding and challenging. Remember to take care of yourself too - you can't pour from an empty cup.",
-                    "Every neurodivergent individual is unique, so what works for one person might not work for another. Patience, understanding, and open communication are key."
-                ],
-                'dailyLiving': [
-                    "Daily living skills are fundamental to independence, and it's completely normal to need support in developing these. Everyone learns at their own pace.",
-                    "Creating structure and routines can be incredibly helpful for neurodivergent individuals. Let's explore strategies that can make daily tasks more manageable.",
-                    "Independence looks different for everyone. The goal is to develop skills that help you live as autonomously as possible while recognizing when you need support."
-                ],
-                'general': [
-                    "Thank you for reaching out. I'm here to listen and provide support in whatever way I can. What's on your mind today?",
-                    "I'm glad you're here. Whether you're looking for information, support, or just someone to talk to, I'm here to help.",
-                    "Every conversation is an opportunity to learn and grow. I'm here to support you on your journey, whatever that looks like for you."
-                ]
-            }
-            
-        async def process_request(self, agent_type, message, user_name, conversation_history):
-            """Enhanced mock response with context awareness"""
+
+class MockAgentBridge:
+    def __init__(self):
+        # Simulated backend latency / failures (BRIDGE_MOCK_* settings, fixed 500ms by default)
+        self.latency = LatencyModel.from_env(os.environ)
+        # Turn counts per client session, so session reuse is observable in mock mode too
+        self.sessions = SessionManager(max_sessions=SESSION_MAX, idle_ttl=SESSION_IDLE_TTL)
+        self.router = IntentRouter(enabled=DIRECT_ROUTING)
+        self.response_cache = new_response_cache()
+        self.history = HistoryCompactor(keep_turns=HISTORY_KEEP_TURNS, token_budget=HISTORY_TOKEN_BUDGET)
+        self.rules = RuleEngine.from_file(MOCK_RULES_PATH, max_matches=MOCK_MAX_ENRICHMENTS)
+        self.responses = {
+            'crisis': [
+                "I understand you're going through a really difficult time right now, and I want you to know that reaching out shows incredible strength. Your feelings are valid, and you don't have to face this alone.",
+                "I'm here to support you through this crisis. While I'm currently in development mode, please know that immediate help is available if you need it.",
+                "Thank you for trusting me with how you're feeling. Crisis situations can feel overwhelming, but there are people trained to help you through this."
+            ],
+            'therapy': [
+                "I can hear that you're looking for emotional support, and I'm glad you reached out. It takes courage to acknowledge when we need help with our mental health.",
+                "Your emotional wellbeing matters, and it's completely normal to need support. While my full therapeutic capabilities are being developed, I want you to know that what you're feeling is valid.",
+                "Mental health is just as important as physical health. I'm here to listen and provide what support I can while encouraging you to also connect with professional resources."
+            ],
+            'education': [
+                "Learning can be challenging, especially when you're neurodivergent, but everyone has their own unique learning style and strengths. Let's explore what works best for you.",
+                "Education should be accessible and tailored to your needs. While my specialized education agent is being configured, I can share some general strategies that many neurodivergent learners find helpful.",
+                "Your learning journey is unique, and there's no one-size-fits-all approach. Let's work together to find strategies that play to your strengths."
+            ],
+            'social': [
+                "Social interactions can feel complex, but remember that everyone struggles with social situations sometimes. You're not alone in finding this challenging.",
+                "Building social skills is a process, and it's okay to take it one step at a time. Authenticity is more valuable than trying to fit into social expectations that don't feel natural.",
+                "Social connections are important, but they should feel genuine and comfortable for you. Let's explore ways to build meaningful relationships at your own pace."
+            ],
+            'interview': [
+                "Job interviews can be particularly challenging for neurodivergent individuals, but your unique perspective and skills are valuable assets. Let's work on presenting your best self authentically.",
+                "Interview preparation is about more than just answering questions - it's about communicating your value and finding the right fit for both you and the employer.",
+                "Your neurodivergent traits can be strengths in the workplace. Let's focus on how to effectively communicate your abilities and any accommodations you might need."
+            ],
+            'screening': [
+                "Understanding yourself better is a wonderful step toward self-advocacy and getting the support you need. Self-awareness is incredibly valuable.",
+                "Learning about neurodivergent conditions can be enlightening and validating. Remember, neurodivergence isn't something to be 'fixed' - it's a different way of experiencing the world.",
+                "Exploring whether you might be neurodivergent is a personal journey. While I can provide educational information, professional evaluation is important for accurate understanding."
+            ],
+            'caregiver': [
+                "Supporting a neurodivergent loved one shows incredible care and dedication. Your efforts to understand and help make a real difference in their life.",
+                "Being a caregiver can be both rewarding and challenging. Remember to take care of yourself too - you can't pour from an empty cup.",
+                "Every neurodivergent individual is unique, so what works for one person might not work for another. Patience, understanding, and open communication are key."
+            ],
+            'dailyLiving': [
+                "Daily living skills are fundamental to independence, and it's completely normal to need support in developing these. Everyone learns at their own pace.",
+                "Creating structure and routines can be incredibly helpful for neurodivergent individuals. Let's explore strategies that can make daily tasks more manageable.",
+                "Independence looks different for everyone. The goal is to develop skills that help you live as autonomously as possible while recognizing when you need support."
+            ],
+            'general': [
+                "Thank you for reaching out. I'm here to listen and provide support in whatever way I can. What's on your mind today?",
+                "I'm glad you're here. Whether you're looking for information, support, or just someone to talk to, I'm here to help.",
+                "Every conversation is an opportunity to learn and grow. I'm here to support you on your journey, whatever that looks like for you."
+            ]
+        }
+
+    def track_session(self, user_name, session_id):
+        if session_id:
+            turns, _ = self.sessions.get_or_create((user_name or "user", session_id), lambda: [0])
+            turns[0] += 1
+
+    async def process_request(self, agent_type, message, user_name, conversation_history, session_id=None, route=None):
+        """Enhanced mock response with context awareness"""
+        async for event in self.stream_request(
+            agent_type, message, user_name, conversation_history, session_id=session_id, route=route,
+            partial_text=False
+        ):
+            if event["event"] == "final":
+                return event["response"]
+
+    async def stream_request(self, agent_type, message, user_name, conversation_history, session_id=None, route=None,
+                             partial_text=True, timer=NULL_TIMER):
+        """Mock response as a stream; with ``partial_text`` it is paced out one paragraph at a time"""
+        self.track_session(user_name, session_id)
+        with timer.span("route"):
+            decision = self.router.route(agent_type, message, route)
+        started = time.perf_counter()
+        # The mock ignores history, but reports what compaction would have saved
+        with timer.span("history"):
+            history = self.history.compact(conversation_history) if conversation_history else None
+
+        with timer.span("compose"):
+            response = self.compose_response(agent_type, message, user_name)
+        latency_ms = self.latency.sample_ms()
+        timer.add("mock_latency", latency_ms)
+        failing = self.latency.should_fail()
+        if partial_text and not failing:
+            paragraphs = response.split("\n\n")
+            delay = latency_ms / 1000 / len(paragraphs)
+            for index, paragraph in enumerate(paragraphs):
+                await asyncio.sleep(delay)
+                yield {"event": "chunk", "text": paragraph if index == 0 else "\n\n" + paragraph}
+        else:
             # Simulate processing time
-            await asyncio.sleep(0.5)
-            
-            # Get base responses for the agent type
-            base_responses = self.responses.get(agent_type, self.responses['general'])
-            base_response = base_responses[hash(message) % len(base_responses)]
-            
-            # Personalize the response
-            personalized_response = f"Hi {user_name}! {base_response}"
-            
-            # Add context-aware additions based on message content
-            message_lower = message.lower()
-            
-            if agent_type == 'crisis':
-                personalized_response += "\n\n🚨 **IMMEDIATE RESOURCES:**\n• National Suicide Prevention Lifeline: 988\n• Crisis Text Line: Text HOME to 741741\n• Emergency Services: 911\n\nIf you're in immediate danger, please reach out to these resources right away."
-            
-            elif 'anxious' in message_lower or 'anxiety' in message_lower:
-                personalized_response += "\n\n💙 **Quick Anxiety Tips:**\n• Try the 4-7-8 breathing technique\n• Ground yourself using the 5-4-3-2-1 method\n• Remember: this feeling will pass"
-            
-            elif 'study' in message_lower or 'homework' in message_lower:
-                personalized_response += "\n\n📚 **Study Strategies:**\n• Break tasks into smaller chunks\n• Use visual aids and color coding\n• Take regular breaks (Pomodoro technique)\n• Find your optimal study environment"
-            
-            elif 'social' in message_lower or 'friends' in message_lower:
-                personalized_response += "\n\n👥 **Social Tips:**\n• Start with shared interests or activities\n• Practice active listening\n• It's okay to need breaks from social situations\n• Quality over quantity in relationships"
-            
-            elif 'interview' in message_lower or 'job' in message_lower:
-                personalized_response += "\n\n💼 **Interview Preparation:**\n• Research the company and role thoroughly\n• Practice common questions out loud\n• Prepare examples using the STAR method\n• Consider disclosure strategies for accommodations"
-            
-            # Add encouraging closing
-            personalized_response += f"\n\nRemember, {user_name}, you're taking positive steps by reaching out for support. That takes courage, and I'm here to help you along the way."
-            
-            return personalized_response
-    
-    AgentBridge = MockAgentBridge
-
-else:
-    # Production mode with Google ADK (if available)
-    try:
-        log_info("Attempting to load Google ADK components...")
-        
-        from google.adk.sessions.in_memory_session_service import InMemorySessionService
-        from google.adk.sessions.session import Session
-        from google.adk.agents.invocation_context import InvocationContext, new_invocation_context_id
-        from google.genai.types import UserContent
-        from bridgebright.agent import root_agent
-        
-        log_info("Google ADK components loaded successfully")
-        
-        class AgentBridge:
-            def __init__(self):
+            await asyncio.sleep(latency_ms / 1000)
+
+        if failing:
+            self.router.record(decision, (time.perf_counter() - started) * 1000)
+            raise InjectedFailure("Injected mock backend failure")
+
+        self.router.record(decision, (time.perf_counter() - started) * 1000)
+        final = {"event": "final", "response": response, "route": decision.route}
+        if history is not None:
+            final["history"] = history_report(history)
+        yield final
+
+    def stats(self):
+        stats = {
+            "sessions": self.sessions.stats(),
+            "routes": self.router.stats(),
+            "latency_model": self.latency.describe(),
+            "enrichment_rules": len(self.rules),
+        }
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.stats()
+        return stats
+
+    async def remember_turn(self, user_name, session_id, message, response):
+        """Record a turn answered without running the mock (e.g. from the response cache)"""
+        self.track_session(user_name, session_id)
+
+    async def has_context(self, user_name, session_id):
+        return bool(session_id) and (user_name or "user", session_id) in self.sessions
+
+    def compose_response(self, agent_type, message, user_name):
+        # Get base responses for the agent type
+        base_responses = self.responses.get(agent_type, self.responses['general'])
+        # crc32 rather than hash(): str hashes are randomized per process
+        base_response = base_responses[zlib.crc32(message.encode("utf-8")) % len(base_responses)]
+
+        # Personalize the response
+        personalized_response = f"Hi {user_name}! {base_response}"
+
+        # Add context-aware additions based on message content
+        personalized_response += self.rules.enrich(message, agent_type)
+
+        # Add encouraging closing
+        personalized_response += f"\n\nRemember, {user_name}, you're taking positive steps by reaching out for support. That takes courage, and I'm here to help you along the way."
+
+        return personalized_response
+
+class AgentBridge:
+    """Production bridge backed by the Google ADK root agent.
+
+    ADK and the agent package are imported when the first instance is built,
+    so mock-mode requests and health checks never pay for them.
+    """
+
+    def __init__(self):
+        try:
+            log_info("Attempting to load Google ADK components...")
+            from google.adk.sessions.in_memory_session_service import InMemorySessionService
+            # Cheap: reads the agent registry; agents are only built on first use
+            import bridgebright.agent
+            log_info("Google ADK components loaded successfully")
+
+            if SESSION_DB:
+                from bridgebright.sqlite_sessions import SqliteSessionService
+                self.session_service = SqliteSessionService(
+                    SESSION_DB, batch_size=SESSION_DB_BATCH, flush_ms=SESSION_DB_FLUSH_MS, cache_size=SESSION_DB_CACHE
+                )
+                if SESSION_DB_RETENTION_DAYS:
+                    pruned = self.session_service.delete_idle_sessions(SESSION_DB_RETENTION_DAYS * 86400)
+                    log_info("Session database opened", path=SESSION_DB, pruned=pruned)
+                # Session-less requests never reach the database
+                self.throwaway_session_service = InMemorySessionService()
+            else:
+                self.session_service = InMemorySessionService()
+                self.throwaway_session_service = self.session_service
+            self.sessions = SessionManager(max_sessions=SESSION_MAX, idle_ttl=SESSION_IDLE_TTL)
+            self.router = IntentRouter(enabled=DIRECT_ROUTING)
+            self.response_cache = new_response_cache()
+            self.history = HistoryCompactor(keep_turns=HISTORY_KEEP_TURNS, token_budget=HISTORY_TOKEN_BUDGET)
+            self.event_source = new_event_source()
+            log_info("AgentBridge initialized successfully")
+        except ImportError:
+            raise
+        except Exception as e:
+            log_error(f"Failed to initialize AgentBridge: {str(e)}")
+            raise
+
+    async def process_request(self, agent_type, message, user_name, conversation_history, session_id=None, route=None):
+        """Process a request using the appropriate agent and return the reply text"""
+        async for event in self.stream_request(
+            agent_type, message, user_name, conversation_history, session_id=session_id, route=route,
+            partial_text=False
+        ):
+            if event["event"] == "final":
+                return event["response"]
+
+    async def stream_request(self, agent_type, message, user_name, conversation_history, session_id=None, route=None,
+                             partial_text=True, timer=NULL_TIMER):
+        """Run the routed agent and yield progress events as they arrive.
+
+        ``self.router`` sends an unambiguous ``agent_type`` straight to its
+        sub-agent, saving the root agent's routing LLM call; everything else
+        (or ``route="orchestrator"``) goes through the root agent.
+
+        Yields ``chunk`` (text as the model produces it; with ``partial_text`` the
+        model streams deltas over SSE), ``tool_start``/``tool_end`` around each
+        sub-agent delegation, and finally ``final`` with the complete reply.
+
+        With a ``session_id`` the ADK session is kept in ``self.sessions`` and
+        reused on later turns, so only a brand-new session is seeded from the
+        client's ``conversation_history``. Without one the session is throwaway
+        and runs on ``self.throwaway_session_service``, which is never persisted.
+
+        ``timer`` collects route, session, history, invocation, first-event,
+        per-delegation and total agent spans.
+        """
+        from bridgebright.agent import SUB_AGENTS, get_root_agent, get_sub_agent
+        from bridgebright.runner import compact_session, new_session, seed_history, stream_turn
+
+        decision = None
+        history = None
+        try:
+            log_debug("Running agent request", agent_type=agent_type)
+            with timer.span("route"):
+                decision = self.router.route(agent_type, message, route)
+                if decision.route == DIRECT and agent_type in SUB_AGENTS:
+                    agent = get_sub_agent(agent_type)
+                else:
+                    decision = decision._replace(route=ORCHESTRATOR)
+                    agent = get_root_agent()
+            log_debug("Routed", route=decision.route, reason=decision.reason)
+            user_id = user_name or "user"
+
+            with timer.span("session"):
+                if session_id:
+                    session_service = self.session_service
+                    slot, created = await self.session_slot(user_id, session_id)
+                    session, session_lock = slot
+                else:
+                    session_service = self.throwaway_session_service
+                    session, session_lock, created = new_session(user_id), asyncio.Lock(), True
+
+            # One turn at a time per session so events never interleave
+            lock_started = time.perf_counter()
+            async with session_lock:
+                timer.since("session_lock", lock_started)
+                if session_id and not created:
+                    session = await self.current_session(slot)
+                # Keep the prompt within the history budget before every agent call
+                with timer.span("history"):
+                    if created and conversation_history:
+                        history = self.history.compact(conversation_history)
+                        await seed_history(session_service, session, history.turns, agent.name)
+                    elif not created:
+                        history = await compact_session(session_service, session, self.history, agent.name)
+                if history is not None:
+                    log_debug("History compacted", tokens_before=history.tokens_before, tokens_after=history.tokens_after)
+
+                log_debug("Running agent", agent=agent.name)
+
+                # Run the agent, passing progress through; "final" carries the reply
+                response_content = ""
+                degraded = False
+                started = time.perf_counter()
+                events_before = len(session.events)
+                yielded = False
                 try:
-                    self.session_service = InMemorySessionService()
-                    log_info("AgentBridge initialized successfully")
-                except Exception as e:
-                    log_error(f"Failed to initialize AgentBridge: {str(e)}")
+                    async for event in stream_turn(agent, session_service, session, message, partial_text, timer,
+                                                   self.event_source.run if self.event_source else None):
+                        if event["event"] == "final":
+                            response_content = event["response"]
+                            break
+                        yielded = True
+                        yield event
+                    log_debug("Agent replied", response_length=len(response_content))
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Past the deadline (or the caller went away): leave no unanswered user turn behind
+                    rollback_turn(session_service, session, events_before)
                     raise
-                
-            async def process_request(self, agent_type, message, user_name, conversation_history):
-                """Process a request using the appropriate agent"""
+                except Exception as agent_error:
+                    if is_transient(agent_error) and not yielded:
+                        # Undo the half-finished turn so a retry starts from the same session
+                        rollback_turn(session_service, session, events_before)
+                        self.router.record(decision, (time.perf_counter() - started) * 1000)
+                        raise TransientError(agent_error) from agent_error
+                    log_error(f"Agent execution error: {str(agent_error)}")
+                    response_content = f"I'm experiencing some technical difficulties with my AI agents right now. Please try again in a moment."
+                    degraded = True
+                timer.since("agent", started)
+                self.router.record(decision, (time.perf_counter() - started) * 1000)
+
+            if not response_content:
+                response_content = "I'm sorry, I couldn't generate a response at this time. Please try again."
+                degraded = True
+
+        except TransientError:
+            raise
+        except Exception as e:
+            log_error(f"Process request error: {str(e)}")
+            response_content = f"I apologize, but I'm experiencing some technical difficulties right now. Please try again in a moment."
+            degraded = True
+
+        final = {"event": "final", "response": response_content, "route": decision.route if decision else None}
+        if history is not None:
+            final["history"] = history_report(history)
+        if degraded:
+            final["degraded"] = True
+        yield final
+
+    async def remember_turn(self, user_name, session_id, message, response):
+        """Append a turn answered without running an agent (e.g. from the response cache)"""
+        from bridgebright.agent import ROOT_AGENT_NAME
+        from bridgebright.runner import seed_history
+
+        slot, _ = await self.session_slot(user_name or "user", session_id)
+        async with slot[1]:
+            await seed_history(
+                self.session_service,
+                await self.current_session(slot),
+                [{"role": "user", "content": message}, {"role": "assistant", "content": response}],
+                ROOT_AGENT_NAME
+            )
+
+    async def session_slot(self, user_id, session_id):
+        """``([session, lock], created)`` for a client session.
+
+        With a durable session store, a session this process does not hold
+        (evicted, from before a restart, or last served by another worker)
+        is loaded from it and counts as existing rather than created. Read
+        the session through ``current_session`` once holding the lock.
+        """
+        from bridgebright.runner import APP_NAME, new_session
+
+        key = (user_id, session_id)
+        stored = None
+        if SESSION_DB and key not in self.sessions:
+            stored = await self.session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+        slot, created = self.sessions.get_or_create(
+            key,
+            lambda: [stored or new_session(user_id, session_id), asyncio.Lock()]
+        )
+        return slot, created and stored is None
+
+    async def current_session(self, slot):
+        """The slot's session, reloaded first if another worker has written to it since (call under its lock).
+
+        Several workers can serve one session (``--dispatch least``, or a
+        restart moving it under affinity); without this a worker would run,
+        and compact, its own stale copy.
+        """
+        session = slot[0]
+        if SESSION_DB and await self.session_service.is_stale(session):
+            stored = await self.session_service.get_session(
+                app_name=session.app_name, user_id=session.user_id, session_id=session.id)
+            if stored is not None:
+                log_debug("Reloaded session written by another worker")
+                slot[0] = session = stored
+        return session
+
+    async def has_context(self, user_name, session_id):
+        if not session_id:
+            return False
+        key = (user_name or "user", session_id)
+        if key in self.sessions:
+            return True
+        if SESSION_DB:
+            from bridgebright.runner import APP_NAME
+            return await self.session_service.has_session(APP_NAME, *key)
+        return False
+
+    def stats(self):
+        from bridgebright.registry import get_registry
+
+        stats = {"sessions": self.sessions.stats(), "routes": self.router.stats(), "agents": get_registry().stats()}
+        if SESSION_DB:
+            stats["session_store"] = self.session_service.stats()
+        if self.event_source is not None:
+            stats["replay" if REPLAY_DIR else "recording"] = self.event_source.stats()
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.stats()
+        return stats
+
+def rollback_turn(session_service, session, events_before):
+    """Remove the events a half-finished turn added to ``session``, from the session store too"""
+    abandoned = session.events[events_before:]
+    del session.events[events_before:]
+    discard_events = getattr(session_service, "discard_events", None)
+    if discard_events is not None:
+        discard_events(session, abandoned)
+
+def history_report(history):
+    """Token counts before/after compaction, as returned to the caller"""
+    return {
+        "tokens_before": history.tokens_before,
+        "tokens_after": history.tokens_after,
+        "turns_summarized": history.turns_summarized,
+    }
+
+def new_response_cache():
+    if not RESPONSE_CACHE:
+        return None
+    return ResponseCache(max_entries=RESPONSE_CACHE_MAX, ttl=RESPONSE_CACHE_TTL)
+
+def new_event_source():
+    """Replayer for BRIDGE_REPLAY_DIR, else recorder for BRIDGE_RECORD_DIR, else None (call the model)"""
+    if REPLAY_DIR:
+        from bridgebright.replay import EventReplayer
+        replayer = EventReplayer.from_directory(REPLAY_DIR, speed=REPLAY_SPEED)
+        log_info("Replaying recorded agent runs", directory=REPLAY_DIR, recordings=len(replayer), speed=REPLAY_SPEED)
+        if RECORD_DIR:
+            log_info("BRIDGE_RECORD_DIR is ignored while replaying")
+        return replayer
+    if RECORD_DIR:
+        from bridgebright.replay import EventRecorder
+        log_info("Recording agent runs", directory=RECORD_DIR)
+        return EventRecorder(RECORD_DIR)
+    return None
+
+_bridge = None
+
+def get_bridge():
+    """Return the process-wide bridge, building it on first use.
+
+    Production mode falls back to MockAgentBridge when Google ADK cannot be
+    imported, exactly as the eager import used to.
+    """
+    global _bridge, DEVELOPMENT_MODE
+    if _bridge is None:
+        if DEVELOPMENT_MODE:
+            _bridge = MockAgentBridge()
+        else:
+            try:
+                _bridge = AgentBridge()
+            except ImportError as e:
+                log_error(f"Google ADK not available, falling back to mock mode: {str(e)}")
+                # Fall back to mock mode
+                DEVELOPMENT_MODE = True
+                _bridge = MockAgentBridge()
+    return _bridge
+
+_fallback_bridge = None
+
+def degraded_reply(agent_type, message, user_name):
+    """Canned MockAgentBridge reply, served while the circuit breaker is open"""
+    global _fallback_bridge
+    if _fallback_bridge is None:
+        _fallback_bridge = _bridge if isinstance(_bridge, MockAgentBridge) else MockAgentBridge()
+    return _fallback_bridge.compose_response(agent_type, message, user_name)
+
+def error_result(error, response, request_id=None):
+    """Build the JSON error payload shared by every bridge mode"""
+    result = {
+        "success": False,
+        "error": error,
+        "response": response
+    }
+    if request_id is not None:
+        result["id"] = request_id
+    return result
+
+def request_deadline(request):
+    """``time.monotonic()`` instant by which the request must be answered, or None"""
+    try:
+        deadline_ms = float(request.get('deadline_ms') or DEFAULT_DEADLINE_MS)
+    except (TypeError, ValueError):
+        deadline_ms = DEFAULT_DEADLINE_MS
+    return time.monotonic() + deadline_ms / 1000 if deadline_ms > 0 else None
+
+def time_left(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+def tag_event(event, request_id):
+    if request_id is not None:
+        event["id"] = request_id
+    return event
+
+async def is_cache_eligible(bridge, agent_type, message, user_name, conversation_history, session_id):
+    """Only context-free first turns without crisis signals use the response cache"""
+    if bridge.response_cache is None:
+        return False
+    if conversation_history or await bridge.has_context(user_name, session_id):
+        return False
+    return 'crisis' not in bridge.router.signals(message)
+
+async def cached_reply(bridge, cache_eligible, agent_type, message, user_name, session_id):
+    """Final event for a cache hit (recorded in the session like a real turn), else None"""
+    if bridge.response_cache is None:
+        return None
+    if not cache_eligible:
+        bridge.response_cache.bypass()
+        return None
+
+    response = bridge.response_cache.get(agent_type, message, user_name)
+    if response is None:
+        return None
+    if session_id:
+        await bridge.remember_turn(user_name, session_id, message, response)
+    log_debug("Answered from response cache")
+    return {"event": "final", "response": response, "cached": True}
+
+def request_timer(request):
+    """Timer for a request that asked for timings (or all, with BRIDGE_TIMINGS=1)"""
+    return Timer() if TIMINGS or request.get('timings') else NULL_TIMER
+
+async def handle_request(request, emit=None, timer=None):
+    """Run one decoded request through the shared bridge and build its JSON result.
+
+    When the request sets ``"stream": true`` and an ``emit`` callback is given,
+    every progress event is passed to ``emit`` (tagged with the request id)
+    before the final result is returned with ``"event": "final"``. With timings
+    on, the result carries a ``timings`` object that is also logged to stderr.
+    """
+    request_id = request.get('id')
+    op = request.get('op', 'chat')
+
+    if op == 'ping':
+        result = {
+            "success": True,
+            "op": "ping",
+            "mode": "development" if DEVELOPMENT_MODE else "production"
+        }
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+    if op == 'stats':
+        result = {
+            "success": True,
+            "op": "stats",
+            "mode": "development" if DEVELOPMENT_MODE else "production",
+            "stats": get_bridge().stats()
+        }
+        if crisis_detector is not None:
+            result["stats"]["crisis"] = crisis_detector.stats()
+        result["stats"]["admission"] = admission.stats()
+        result["stats"]["resilience"] = resilience.stats()
+        result["stats"]["log_records_dropped"] = dropped_records()
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+    if op == 'metrics':
+        result = {"success": True, "op": "metrics", "metrics": REGISTRY.render()}
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+    if op != 'chat':
+        return error_result(f"Unknown op: {op}", "I'm sorry, there was a communication error. Please try again.", request_id)
+
+    IN_FLIGHT.inc()
+    started = time.perf_counter()
+    try:
+        result = await handle_chat(request, emit, timer)
+    finally:
+        IN_FLIGHT.dec()
+
+    # Unknown agent_types share one label so clients cannot blow up the series count
+    agent_type = request.get('agent_type', 'general')
+    agent_label = agent_type if agent_type in INTENT_KEYWORDS or agent_type == 'general' else 'other'
+    route_label = result.get("route") or "none"
+    if result.get("status") in ("shed", "truncated"):
+        outcome = result["status"]
+    elif not result.get("success"):
+        outcome = "error"
+    elif result.get("cached"):
+        outcome = "cached"
+    elif result.get("degraded"):
+        outcome = "degraded"
+    else:
+        outcome = "ok"
+    REQUESTS.inc(agent_type=agent_label, route=route_label, outcome=outcome)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, agent_type=agent_label, route=route_label)
+    if result.get("crisis"):
+        CRISIS_DETECTIONS.inc()
+    return result
+
+async def handle_chat(request, emit=None, timer=None):
+    """The chat op: crisis scan, admission, response cache, then the bridge's agent run.
+
+    The result's ``status`` is ``completed``, ``truncated`` (``deadline_ms``
+    ran out mid-run: the agent is cancelled and whatever text had arrived is
+    returned) or ``shed`` (turned away by admission control without running).
+    """
+    request_id = request.get('id')
+    deadline = request_deadline(request)
+
+    # Extract request parameters
+    agent_type = request.get('agent_type', 'general')
+    message = request.get('message', '')
+    user_name = request.get('user_name', 'User')
+    conversation_history = request.get('conversation_history') or []
+    if not isinstance(conversation_history, list):
+        conversation_history = []
+    session_id = request.get('session_id')
+    route = request.get('route')
+
+    log_debug("Processing request", id=request_id, agent_type=agent_type, message_length=len(message))
+
+    stream = bool(request.get('stream')) and emit is not None
+    timer = timer or request_timer(request)
+
+    # Crisis resources go out before the bridge (or any model) is touched
+    with timer.span("crisis_scan"):
+        crisis = crisis_detector.detect(message, agent_type) if crisis_detector is not None else None
+    if crisis is not None:
+        log_info("Crisis signals detected", id=request_id, categories=sorted(crisis.categories))
+        if stream:
+            await emit(tag_event({
+                "event": "resources",
+                "text": crisis_detector.resources,
+                "categories": sorted(crisis.categories)
+            }, request_id))
+
+    admission_started = time.perf_counter()
+    try:
+        await admission.acquire(deadline)
+    except Shed as shed:
+        log_info("Request shed", id=request_id, reason=shed.reason)
+        fallback = "I'm getting a lot of messages right now. Please try again in a moment."
+        if crisis is not None:
+            fallback = crisis_detector.with_resources(fallback)
+        result = error_result(str(shed), fallback, request_id)
+        result.update(status="shed", shed_reason=shed.reason)
+        if crisis is not None:
+            result["crisis"] = sorted(crisis.categories)
+        return result
+    timer.since("admission", admission_started)
+
+    status = "completed"
+    try:
+        with timer.span("bridge"):
+            bridge = get_bridge()
+        with timer.span("cache_lookup"):
+            cache_eligible = crisis is None and await is_cache_eligible(bridge, agent_type, message, user_name, conversation_history, session_id)
+            final = await cached_reply(bridge, cache_eligible, agent_type, message, user_name, session_id)
+        if final is not None:
+            if stream:
+                await emit(tag_event({"event": "chunk", "text": final["response"]}, request_id))
+        elif not resilience.breaker.allow():
+            log_info("Circuit breaker open, serving degraded reply", id=request_id)
+            final = {
+                "event": "final",
+                "response": degraded_reply(agent_type, message, user_name),
+                "degraded": True,
+                "breaker": "open"
+            }
+            if stream:
+                await emit(tag_event({"event": "chunk", "text": final["response"]}, request_id))
+        else:
+            # Text received per attempt, for a truncated reply
+            attempts = []
+            emitted = False
+
+            async def run_bridge():
+                nonlocal emitted
+                partial = []
+                attempts.append(partial)
+                events = bridge.stream_request(
+                    agent_type, message, user_name, conversation_history, session_id=session_id, route=route,
+                    partial_text=stream, timer=timer
+                )
                 try:
-                    log_info(f"Processing request for agent_type: {agent_type}")
-                    
-                    # Create a session
-                    session_id = str(uuid.uuid4())
-                    session = Session(
-                        id=session_id,
-                        app_name="brightbridge",
-                        user_id=user_name or "user",
-                        state={},
-                        events=[],
-                        last_update_time=time.time(),
-                    )
-                    
-                    # Create user content
-                    user_content = UserContent(message)
-                    
-                    # Create invocation context
-                    context = InvocationContext(
-                        session_service=self.session_service,
-                        invocation_id=new_invocation_context_id(),
-                        agent=root_agent,
-                        user_content=user_content,
-                        session=session,
-                    )
-                    
-                    log_info("Running root agent...")
-                    
-                    # Run the root agent
-                    response_content = ""
-                    try:
-                        async for event in root_agent.run_async(context):
-                            if hasattr(event, "content") and event.content:
-                                response_content = event.content
-                                log_info(f"Received response: {response_content[:100]}...")
-                                break
-                    except Exception as agent_error:
-                        log_error(f"Agent execution error: {str(agent_error)}")
-                        response_content = f"I'm experiencing some technical difficulties with my AI agents right now. Please try again in a moment."
-                    
-                    if not response_content:
-                        response_content = "I'm sorry, I couldn't generate a response at this time. Please try again."
-                    
-                    return response_content
-                    
-                except Exception as e:
-                    log_error(f"Process request error: {str(e)}")
-                    return f"I apologize, but I'm experiencing some technical difficulties right now. Please try again in a moment."
-        
-    except ImportError as e:
-        log_error(f"Google ADK not available, falling back to mock mode: {str(e)}")
-        # Fall back to mock mode
-        DEVELOPMENT_MODE = True
-        AgentBridge = MockAgentBridge
+                    async for event in events:
+                        if event["event"] == "final":
+                            return event
+                        if event["event"] == "chunk":
+                            partial.append(event["text"])
+                        if stream:
+                            emitted = True
+                            await emit(tag_event(event, request_id))
+                    return {"event": "final", "response": ""}
+                finally:
+                    # Cancelled while emitting: close the run now so it rolls back its turn
+                    await events.aclose()
+
+            try:
+                # Retries transient failures (unless output already went out) and cancels
+                # the agent run, down to run_async, when the deadline passes
+                final = await asyncio.wait_for(
+                    resilience.call(
+                        run_bridge,
+                        retryable=lambda: not emitted,
+                        hedge=HEDGING and not stream and not session_id,
+                        succeeded=lambda event: not event.get("degraded")
+                    ),
+                    time_left(deadline)
+                )
+            except asyncio.TimeoutError:
+                status = "truncated"
+                text = max(("".join(partial).strip() for partial in attempts), key=len, default="")
+                log_info("Deadline exceeded, reply truncated", id=request_id, partial_length=len(text))
+                final = {
+                    "event": "final",
+                    "response": f"{text}…" if text else "I'm sorry, this is taking longer than expected. Please try again in a moment."
+                }
+
+            if bridge.response_cache is not None and cache_eligible and status == "completed" and not final.get("degraded"):
+                bridge.response_cache.put(agent_type, message, user_name, final["response"])
+        response = final["response"]
+    except Exception as bridge_error:
+        log_error(f"Bridge processing error: {str(bridge_error)}")
+        fallback = "I'm experiencing technical difficulties with my AI system. Please try again in a moment."
+        if crisis is not None:
+            fallback = crisis_detector.with_resources(fallback)
+        result = error_result(str(bridge_error), fallback, request_id)
+        result["status"] = "failed"
+        return result
+    finally:
+        admission.release()
+
+    if crisis is not None:
+        response = crisis_detector.with_resources(response)
+
+    result = {
+        "success": True,
+        "response": response,
+        "agent_type": agent_type,
+        "mode": "development" if DEVELOPMENT_MODE else "production",
+        "status": status
+    }
+    for field in ("route", "cached", "history", "degraded", "breaker"):
+        if final.get(field):
+            result[field] = final[field]
+    if crisis is not None:
+        result["crisis"] = sorted(crisis.categories)
+    if timer.enabled:
+        result["timings"] = timer.as_dict()
+        log_timings(request_id, result["timings"])
+    if stream:
+        result["event"] = "final"
+    if request_id is not None:
+        result["id"] = request_id
+
+    log_debug("Processed request", id=request_id)
+    return result
+
+def write_result(result):
+    """Write one JSON result as a single line on stdout"""
+    sys.stdout.write(json.dumps(result) + "\n")
+    sys.stdout.flush()
 
 async def main():
     """Main function to handle the bridge communication"""
+    main_started = time.perf_counter()
     try:
-        log_info("Starting agent bridge main function...")
+        log_debug("Starting agent bridge main function...")
         
         # Read input from stdin
+        read_started = time.perf_counter()
         input_data = sys.stdin.read()
-        log_info(f"Received input data: {input_data[:200]}...")
+        read_ms = (time.perf_counter() - read_started) * 1000
+        log_debug("Received request", bytes=len(input_data))
         
         try:
+            parse_started = time.perf_counter()
             request = json.loads(input_data)
+            parse_ms = (time.perf_counter() - parse_started) * 1000
         except json.JSONDecodeError as e:
             log_error(f"JSON decode error: {str(e)}")
-            error_response = {
-                "success": False,
-                "error": f"Invalid JSON input: {str(e)}",
-                "response": "I'm sorry, there was a communication error. Please try again."
-            }
-            print(json.dumps(error_response), flush=True)
+            write_result(error_result(
+                f"Invalid JSON input: {str(e)}",
+                "I'm sorry, there was a communication error. Please try again."
+            ))
             return
         
-        # Extract request parameters
-        agent_type = request.get('agent_type', 'general')
-        message = request.get('message', '')
-        user_name = request.get('user_name', 'User')
-        conversation_history = request.get('conversation_history', [])
-        
-        log_info(f"Processing: agent_type={agent_type}, user={user_name}, message_length={len(message)}")
-        
-        # Create bridge instance and process request
-        try:
-            bridge = AgentBridge()
-            response = await bridge.process_request(agent_type, message, user_name, conversation_history)
-            
-            # Return response as JSON
-            result = {
-                "success": True,
-                "response": response,
-                "agent_type": agent_type,
-                "mode": "development" if DEVELOPMENT_MODE else "production"
-            }
-            
-            log_info("Successfully processed request")
-            print(json.dumps(result), flush=True)
-            
-        except Exception as bridge_error:
-            log_error(f"Bridge processing error: {str(bridge_error)}")
-            error_response = {
-                "success": False,
-                "error": str(bridge_error),
-                "response": "I'm experiencing technical difficulties with my AI system. Please try again in a moment."
-            }
-            print(json.dumps(error_response), flush=True)
+        async def emit(event):
+            write_result(event)
+
+        timer = request_timer(request) if isinstance(request, dict) else NULL_TIMER
+        if timer.enabled:
+            # Everything this process did before the request was parsed
+            interpreter_ms = process_age_ms()
+            if interpreter_ms is not None:
+                timer.add("interpreter", max(interpreter_ms - (time.perf_counter() - MODULE_STARTED) * 1000, 0.0))
+            timer.add("imports", (main_started - MODULE_STARTED) * 1000)
+            timer.add("read_stdin", read_ms)
+            timer.add("json_parse", parse_ms)
+
+        write_result(await handle_request(request, emit, timer))
         
     except Exception as e:
         log_error(f"Main function error: {str(e)}")
-        error_response = {
-            "success": False,
-            "error": str(e),
-            "response": "I'm experiencing technical difficulties. Please try again in a moment."
-        }
-        print(json.dumps(error_response), flush=True)
+        write_result(error_result(
+            str(e),
+            "I'm experiencing technical difficulties. Please try again in a moment."
+        ))
+
+async def open_stdin_reader():
+    """Wrap stdin in an asyncio StreamReader so reading never blocks the loop"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_REQUEST_LINE_BYTES)
+    protocol = asyncio.StreamReaderProtocol(reader)
+    await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+    return reader
+
+def install_stop_handlers(stopping):
+    """Set ``stopping`` on SIGTERM/SIGINT so long-running modes can drain"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+async def handle_line(line, send):
+    """Decode one NDJSON request line and send its correlated result"""
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        log_error(f"JSON decode error: {str(e)}")
+        await send(error_result(
+            f"Invalid JSON input: {str(e)}",
+            "I'm sorry, there was a communication error. Please try again."
+        ))
+        return
+
+    try:
+        result = await handle_request(request, send)
+    except Exception as e:
+        log_error(f"Worker request error: {str(e)}")
+        result = error_result(
+            str(e),
+            "I'm experiencing technical difficulties. Please try again in a moment.",
+            request.get('id')
+        )
+    await send(result)
+
+async def pump_requests(reader, send, stopping, max_pipeline=None, handler=None):
+    """Read NDJSON requests from ``reader`` until EOF or ``stopping``, then drain.
+
+    Every line is handled as its own task, so results can be sent out of order;
+    callers correlate them through the ``id`` field. ``max_pipeline`` bounds how
+    many requests from this one stream may be in flight before reading pauses.
+    ``handler(line, send)`` answers each line (default: ``handle_line``).
+    """
+    handler = handler or handle_line
+    in_flight = set()
+    pipeline = asyncio.Semaphore(max_pipeline) if max_pipeline else None
+
+    def finished(task):
+        in_flight.discard(task)
+        if pipeline is not None:
+            pipeline.release()
+
+    stop_waiter = asyncio.ensure_future(stopping.wait())
+    try:
+        while not stopping.is_set():
+            if pipeline is not None:
+                await pipeline.acquire()
+
+            read_line = asyncio.ensure_future(reader.readline())
+            await asyncio.wait({read_line, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not read_line.done():
+                read_line.cancel()
+                break
+
+            try:
+                line = read_line.result()
+            except ConnectionError:
+                break
+            except (asyncio.LimitOverrunError, ValueError) as e:
+                log_error(f"Request line too long: {str(e)}")
+                await send(error_result(
+                    "Request line too long",
+                    "Your message is quite long. Please try breaking it into smaller parts."
+                ))
+                line = b"\n"
+
+            if not line:
+                break
+            if not line.strip():
+                # Blank or rejected line: nothing was started, so give the pipeline slot back
+                if pipeline is not None:
+                    pipeline.release()
+                continue
+
+            task = asyncio.ensure_future(handler(line, send))
+            in_flight.add(task)
+            task.add_done_callback(finished)
+    finally:
+        stop_waiter.cancel()
+
+    if in_flight:
+        log_info(f"Draining {len(in_flight)} in-flight request(s)...")
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+def configure_admission(max_concurrency=None, max_queue=MAX_QUEUE):
+    """Install the process-wide chat concurrency cap and wait-queue bound"""
+    global admission
+    admission = AdmissionController(max_concurrent=max_concurrency, max_queue=max_queue)
+
+async def serve_worker(max_concurrency=None, max_queue=MAX_QUEUE):
+    """Long-lived worker: NDJSON requests on stdin, NDJSON results on stdout.
+
+    At most ``max_concurrency`` chats run at once with ``max_queue`` more
+    waiting; beyond that they are shed. On EOF or SIGTERM/SIGINT the worker
+    stops reading and drains in-flight work.
+    """
+    log_info("Starting agent bridge worker...")
+    # Pay for the bridge (and ADK imports in production) once, before the first request
+    get_bridge()
+    reader = await open_stdin_reader()
+
+    stopping = asyncio.Event()
+    install_stop_handlers(stopping)
+    configure_admission(max_concurrency, max_queue)
+
+    async def send(result):
+        write_result(result)
+
+    await pump_requests(reader, send, stopping)
+    log_info("Agent bridge worker stopped")
+
+def stream_sender(writer):
+    """``send`` callback writing NDJSON results to ``writer``; results for a closed peer are dropped"""
+    write_lock = asyncio.Lock()
+
+    async def send(result):
+        if writer.is_closing():
+            return
+        async with write_lock:
+            writer.write((json.dumps(result) + "\n").encode())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    return send
+
+async def start_listener(on_connection, unix_path=None, host="127.0.0.1", port=None):
+    """Listen on a Unix socket (replacing a stale one) or a TCP port"""
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = await asyncio.start_unix_server(on_connection, path=unix_path, limit=MAX_REQUEST_LINE_BYTES)
+        log_info(f"Listening on unix:{unix_path}")
+    else:
+        server = await asyncio.start_server(on_connection, host, port, limit=MAX_REQUEST_LINE_BYTES)
+        bound = server.sockets[0].getsockname()
+        log_info(f"Listening on tcp:{bound[0]}:{bound[1]}")
+    return server
+
+async def close_listener(server, connections, unix_path=None):
+    """Stop accepting, wait for open connections to drain, then remove the Unix socket"""
+    server.close()
+    if connections:
+        await asyncio.gather(*connections, return_exceptions=True)
+    await server.wait_closed()
+    if unix_path and os.path.exists(unix_path):
+        os.unlink(unix_path)
+
+async def serve_socket(unix_path=None, host="127.0.0.1", port=None, max_concurrency=None, max_pipeline=None,
+                       max_queue=MAX_QUEUE):
+    """Serve the NDJSON request/response contract on a Unix socket or TCP port.
+
+    Each connection is pipelined like a worker's stdin: many requests may be in
+    flight per connection and results carry the request ``id``. ``max_concurrency``
+    caps chats running across all connections, with ``max_queue`` more allowed
+    to wait before new ones are shed. SIGTERM/SIGINT stops accepting,
+    drains in-flight requests, then closes every connection.
+    """
+    log_info("Starting agent bridge socket server...")
+    get_bridge()
+
+    stopping = asyncio.Event()
+    install_stop_handlers(stopping)
+    configure_admission(max_concurrency, max_queue)
+    connections = set()
+
+    async def on_connection(reader, writer):
+        connections.add(asyncio.current_task())
+        try:
+            await pump_requests(reader, stream_sender(writer), stopping, max_pipeline)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            connections.discard(asyncio.current_task())
+
+    server = await start_listener(on_connection, unix_path, host, port)
+    try:
+        await stopping.wait()
+    finally:
+        log_info("Shutting down socket server...")
+        await close_listener(server, connections, unix_path)
+    log_info("Agent bridge socket server stopped")
+
+async def serve_batch(args):
+    """Run a JSONL file of requests through the shared bridge and log a summary record"""
+    log_info(f"Starting batch run over {args.batch}...")
+    get_bridge()
+    stopping = asyncio.Event()
+    install_stop_handlers(stopping)
+
+    summary = await run_batch(
+        handle_request,
+        args.batch,
+        output_path=args.output,
+        concurrency=args.max_concurrency or 8,
+        rate=args.rate,
+        ordered=not args.unordered,
+        resume=args.resume,
+        message_field=args.message_field,
+        id_field=args.id_field,
+        defaults={"agent_type": args.agent_type} if args.message_field else None,
+        stopping=stopping
+    )
+    logger.info("batch_summary", extra={"type": "batch_summary", **summary, "unsampled": True})
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BrightBridge Node.js <-> ADK agent bridge")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--worker",
+        action="store_true",
+        help="serve newline-delimited JSON requests on stdin until EOF instead of a single request"
+    )
+    mode.add_argument("--unix", metavar="PATH", help="serve newline-delimited JSON requests on a Unix domain socket")
+    mode.add_argument("--port", type=int, help="serve newline-delimited JSON requests on a TCP port")
+    mode.add_argument("--batch", metavar="INPUT", help="answer every request in a JSONL file, then exit")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP bind address for --port (default: 127.0.0.1)")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.getenv('BRIDGE_MAX_CONCURRENCY', '0')) or None,
+        help="most requests processed at once in worker/socket mode (env BRIDGE_MAX_CONCURRENCY)"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=MAX_QUEUE,
+        help="chats allowed to wait for a --max-concurrency slot before new ones are shed (env BRIDGE_MAX_QUEUE, default 64)"
+    )
+    parser.add_argument(
+        "--max-pipeline",
+        type=int,
+        default=32,
+        help="most in-flight requests per socket connection before reading pauses (default: 32)"
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv('BRIDGE_METRICS_PORT', '0')) or None,
+        help="serve Prometheus metrics on http://HOST:PORT/metrics in worker, socket and batch modes (env BRIDGE_METRICS_PORT)"
+    )
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="bind address for --metrics-port (default: 127.0.0.1)")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--output", metavar="PATH", help="write batch results here instead of stdout (needed for --resume)")
+    batch.add_argument("--rate", type=float, help="most batch requests started per second")
+    batch.add_argument("--unordered", action="store_true", help="write batch results as they finish, not in input order")
+    batch.add_argument("--resume", action="store_true", help="skip input lines already answered in --output")
+    batch.add_argument("--message-field", help="input field holding the message, for files that are not bridge requests")
+    batch.add_argument("--id-field", default="id", help="input field used as the request id with --message-field")
+    batch.add_argument("--agent-type", default="general", help="agent_type for --message-field records (default: general)")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    return args
+
+async def serve_with_metrics(mode, metrics_port=None, metrics_host="127.0.0.1"):
+    """Run a bridge mode with ``GET /metrics`` served alongside, then write BRIDGE_METRICS_FILE"""
+    server = None
+    if metrics_port is not None:
+        server = await start_metrics_server(REGISTRY, metrics_host, metrics_port)
+        bound = server.sockets[0].getsockname()
+        log_info(f"Serving metrics on http://{bound[0]}:{bound[1]}/metrics")
+    try:
+        await mode
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        if METRICS_FILE:
+            try:
+                write_metrics_file(REGISTRY, METRICS_FILE)
+            except OSError as e:
+                log_error(f"Could not write metrics file: {str(e)}")
+
+def run_mode(args):
+    """Pick the coroutine for the requested bridge mode"""
+    if args.unix or args.port is not None:
+        mode = serve_socket(
+            unix_path=args.unix,
+            host=args.host,
+            port=args.port,
+            max_concurrency=args.max_concurrency,
+            max_pipeline=args.max_pipeline,
+            max_queue=args.max_queue
+        )
+    elif args.worker:
+        mode = serve_worker(max_concurrency=args.max_concurrency, max_queue=args.max_queue)
+    elif args.batch:
+        mode = serve_batch(args)
+    else:
+        # One-shot: nothing would be around to scrape, so only the metrics file applies
+        return serve_with_metrics(main())
+    return serve_with_metrics(mode, args.metrics_port, args.metrics_host)
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(run_mode(args))
     except Exception as e:
         log_error(f"Asyncio run error: {str(e)}")
-        error_response = {
-            "success": False,
-            "error": str(e),
-            "response": "I'm experiencing technical difficulties. Please try again in a moment."
-        }
-        print(json.dumps(error_response), flush=True)
\ No newline at end of file
+        write_result(error_result(
+            str(e),
+            "I'm experiencing technical difficulties. Please try again in a moment."
+        ))
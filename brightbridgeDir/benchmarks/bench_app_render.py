@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Streamlit app rerun time against conversation length
+
+Loads ``bridgebright_app.py`` in Streamlit's AppTest harness, fills the
+session with synthetic conversations of each ``--messages`` length and times
+plain reruns (no agent call), once with the windowed transcript
+(BRIDGE_CHAT_WINDOW) and once with the window turned off so every message
+is rendered. Also reports how much chat HTML each rerun sends to the
+browser. Needs Streamlit and Google ADK installed; no model is called.
+Prints a JSON report.
+
+    python benchmarks/bench_app_render.py --messages 10,100,1000 --reruns 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(BRIDGE_DIR, "bridgebright_app.py")
+
+from streamlit.testing.v1 import AppTest
+
+USER_TEXT = "I have a job interview next week and I keep freezing up when they ask about myself."
+REPLY_TEXT = (
+    "That freeze is really common. Try preparing a three-sentence answer: where you are now, "
+    "what you are good at, and why this role fits. Practise it out loud a few times. " * 3
+)
+
+
+def conversation(length):
+    return [
+        {"role": "user", "content": f"{USER_TEXT} ({index})"} if index % 2 == 0
+        else {"role": "assistant", "content": f"{REPLY_TEXT} ({index})"}
+        for index in range(length)
+    ]
+
+
+def chat_html_bytes(app):
+    return sum(len(element.value) for element in app.markdown if "chat-message" in element.value)
+
+
+def measure(length, window, reruns):
+    os.environ["BRIDGE_CHAT_WINDOW"] = str(window)
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=60)
+    app.session_state.messages = conversation(length)
+    app.run()  # warm up imports and the cached resources
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - started)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return {
+        "messages": length,
+        "window": window or "all",
+        "rerun_ms_p50": round(statistics.median(samples) * 1000, 2),
+        "rerun_ms_max": round(max(samples) * 1000, 2),
+        "chat_html_bytes": chat_html_bytes(app),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Streamlit app reruns against conversation length")
+    parser.add_argument("--messages", default="10,100,500,1000", help="comma-separated conversation lengths")
+    parser.add_argument("--window", type=int, default=int(os.getenv("BRIDGE_CHAT_WINDOW", "20")))
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+
+    lengths = [int(length) for length in args.messages.split(",")]
+    results = [measure(length, window, args.reruns) for window in (args.window, 0) for length in lengths]
+    print(json.dumps({"benchmark": "app_render", "python": sys.version.split()[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for agent_bridge.py
+
+Drives the bridge in each of its modes with the same synthetic workload and
+prints one machine-readable JSON report:
+
+- spawn:  one process per request, like the Node server's default
+- worker: one long-lived ``--worker`` process fed NDJSON over stdin
+- socket: one ``--unix`` server with a connection per client
+
+Each mode runs ``--concurrency`` closed-loop clients until ``--requests``
+requests are done. The report gives throughput, p50/p95/p99 latency,
+cold start (spawn until the first answer or a ready ping) and peak RSS.
+The bridge runs in mock mode unless ``--production`` is passed. With
+``--replay DIR`` it runs the production code path against agent runs recorded
+earlier (``--record DIR`` on a production run with a real API key), so the
+real bridge can be measured offline.
+
+    python benchmarks/bench_bridge.py --modes spawn,worker,socket --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BRIDGE_SCRIPT = os.path.join(BRIDGE_DIR, "agent_bridge.py")
+
+AGENT_TYPES = ["general", "crisis", "therapy", "education", "social", "interview", "screening",
+               "caregiver", "dailyLiving"]
+OPENERS = [
+    "I'm feeling anxious and stressed. Can you help me?",
+    "I need help with my studies and learning strategies.",
+    "I have a job interview coming up and need help preparing.",
+    "I need help with social interactions and communication.",
+    "I'd like to understand more about neurodivergent conditions and how they might relate to my experiences.",
+    "Can you help me build a daily routine that actually sticks?",
+]
+# Cold start for spawn mode: not one of the workload's requests, so nothing it measures is warmed
+WARMUP_REQUEST = {
+    "id": "warmup",
+    "agent_type": "general",
+    "message": "Hi, just checking that you are there.",
+    "user_name": "bench-warmup",
+    "conversation_history": [],
+}
+FILLER = ("Some days are harder than others and I am not sure where to start, "
+          "so any practical suggestions would really help me. ").split()
+
+
+def build_workload(count, seed):
+    """Synthetic mix of agent types and short/medium/long messages"""
+    rng = random.Random(seed)
+    workload = []
+    for index in range(count):
+        words = rng.choice([0, 20, 80, 250])
+        message = rng.choice(OPENERS)
+        if words:
+            message += " " + " ".join(rng.choice(FILLER) for _ in range(words))
+        workload.append({
+            "id": index,
+            "agent_type": rng.choice(AGENT_TYPES),
+            "message": message,
+            "user_name": f"bench{index % 50}",
+            "conversation_history": [],
+        })
+    return workload
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(mode, latencies_ms, failures, elapsed_s, cold_start_ms, peak_rss_kb):
+    ordered = sorted(latencies_ms)
+    total = len(latencies_ms) + failures
+    return {
+        "mode": mode,
+        "requests": total,
+        "failures": failures,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(total / elapsed_s, 2) if elapsed_s else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else None,
+            "p50": round(percentile(ordered, 0.50), 2) if ordered else None,
+            "p95": round(percentile(ordered, 0.95), 2) if ordered else None,
+            "p99": round(percentile(ordered, 0.99), 2) if ordered else None,
+            "max": round(ordered[-1], 2) if ordered else None,
+        },
+        "cold_start_ms": round(cold_start_ms, 2) if cold_start_ms is not None else None,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 2) if peak_rss_kb else None,
+    }
+
+
+def peak_rss_kb(pid):
+    """VmHWM (peak resident set) of a live process, from /proc"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def closed_loop(workload, concurrency, send_one):
+    """Run ``concurrency`` clients that each send their next request when the last one answers"""
+    queue = asyncio.Queue()
+    for request in workload:
+        queue.put_nowait(request)
+    latencies, failures = [], [0]
+
+    async def client(client_id):
+        while not queue.empty():
+            request = queue.get_nowait()
+            started = time.perf_counter()
+            ok = await send_one(client_id, request)
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                failures[0] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return latencies, failures[0], time.perf_counter() - started
+
+
+async def spawn_bridge(args, env):
+    return await asyncio.create_subprocess_exec(
+        sys.executable, BRIDGE_SCRIPT, *args,
+        cwd=BRIDGE_DIR, env=env,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        limit=16 * 1024 * 1024,
+    )
+
+
+async def bench_spawn(workload, concurrency, env):
+    async def send_one(_, request):
+        process = await spawn_bridge([], env)
+        stdout, _ = await process.communicate(json.dumps(request).encode())
+        try:
+            return json.loads(stdout.decode().splitlines()[-1]).get("success", False)
+        except (ValueError, IndexError):
+            return False
+
+    started = time.perf_counter()
+    await send_one(None, WARMUP_REQUEST)
+    cold_start_ms = (time.perf_counter() - started) * 1000
+
+    latencies, failures, elapsed = await closed_loop(workload, concurrency, send_one)
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return summarize("spawn", latencies, failures, elapsed, cold_start_ms, peak)
+
+
+async def bench_worker(workload, concurrency, env):
+    started = time.perf_counter()
+    process = await spawn_bridge(["--worker"], env)
+    pending = {}
+
+    async def read_results():
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            result = json.loads(line)
+            future = pending.pop(result.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    reader = asyncio.ensure_future(read_results())
+
+    async def send(request):
+        future = asyncio.get_running_loop().create_future()
+        pending[request["id"]] = future
+        process.stdin.write((json.dumps(request) + "\n").encode())
+        await process.stdin.drain()
+        return await future
+
+    await send({"id": "ready", "op": "ping"})
+    cold_start_ms = (time.perf_counter() - started) * 1000
+
+    async def send_one(_, request):
+        return (await send(request)).get("success", False)
+
+    latencies, failures, elapsed = await closed_loop(workload, concurrency, send_one)
+    peak = peak_rss_kb(process.pid)
+    process.stdin.close()
+    await process.wait()
+    await reader
+    return summarize("worker", latencies, failures, elapsed, cold_start_ms, peak)
+
+
+async def bench_socket(workload, concurrency, env):
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="bridge-bench-"), "bridge.sock")
+    started = time.perf_counter()
+    process = await spawn_bridge(["--unix", socket_path, "--max-pipeline", "1"], env)
+
+    connection = None
+    while connection is None:
+        if process.returncode is not None:
+            raise RuntimeError("socket server exited before listening")
+        try:
+            connection = await asyncio.open_unix_connection(socket_path, limit=16 * 1024 * 1024)
+        except (FileNotFoundError, ConnectionRefusedError):
+            await asyncio.sleep(0.005)
+
+    async def request_on(conn, request):
+        reader, writer = conn
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    await request_on(connection, {"id": "ready", "op": "ping"})
+    cold_start_ms = (time.perf_counter() - started) * 1000
+
+    connections = [connection] + [
+        await asyncio.open_unix_connection(socket_path, limit=16 * 1024 * 1024) for _ in range(concurrency - 1)
+    ]
+
+    async def send_one(client_id, request):
+        return (await request_on(connections[client_id], request)).get("success", False)
+
+    latencies, failures, elapsed = await closed_loop(workload, concurrency, send_one)
+    peak = peak_rss_kb(process.pid)
+    for _, writer in connections:
+        writer.close()
+    process.terminate()
+    await process.wait()
+    return summarize("socket", latencies, failures, elapsed, cold_start_ms, peak)
+
+
+MODES = {"spawn": bench_spawn, "worker": bench_worker, "socket": bench_socket}
+
+
+async def run(args):
+    env = dict(os.environ, PYTHONPATH=BRIDGE_DIR, PYTHONUNBUFFERED="1")
+    if not args.production and not args.replay:
+        env["NODE_ENV"] = "development"
+    if args.record:
+        env["BRIDGE_RECORD_DIR"] = args.record
+    if args.replay:
+        env["BRIDGE_REPLAY_DIR"] = args.replay
+        env["BRIDGE_REPLAY_SPEED"] = str(args.replay_speed)
+    if args.mock_latency:
+        env["BRIDGE_MOCK_LATENCY"] = args.mock_latency
+    env.setdefault("BRIDGE_MOCK_SEED", str(args.seed))
+    if not args.cache:
+        env["BRIDGE_RESPONSE_CACHE"] = "0"
+
+    workload = build_workload(args.requests, args.seed)
+    results = []
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        requests = workload[:args.spawn_requests] if mode == "spawn" and args.spawn_requests else workload
+        results.append(await MODES[mode](requests, args.concurrency, env))
+
+    return {
+        "benchmark": "agent_bridge",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "mock_latency": None if args.replay else env.get("BRIDGE_MOCK_LATENCY", "fixed:500"),
+            "response_cache": args.cache,
+            "production": args.production or bool(args.replay),
+            "replay": args.replay,
+            "replay_speed": args.replay_speed if args.replay else None,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent_bridge.py across its modes")
+    parser.add_argument("--modes", default="spawn,worker,socket", help="comma-separated subset of spawn,worker,socket")
+    parser.add_argument("--requests", type=int, default=200, help="requests per mode")
+    parser.add_argument("--spawn-requests", type=int, default=None,
+                        help="cap requests for the (slow) spawn mode; defaults to --requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop clients")
+    parser.add_argument("--seed", type=int, default=1, help="workload and mock latency seed")
+    parser.add_argument("--mock-latency", help="BRIDGE_MOCK_LATENCY for the run, e.g. fixed:50 or normal:400,120")
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--production", action="store_true", help="do not force mock mode")
+    parser.add_argument("--record", metavar="DIR", help="record the agent runs of a --production run to DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay agent runs recorded in DIR instead of calling the model")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="replay speed: 1 = recorded timing, 2 = twice as fast, 0 = no waits (default: 1)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    unknown = set(args.modes.split(",")) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
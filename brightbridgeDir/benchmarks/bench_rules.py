@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the mock bridge's enrichment rule engine
+
+Grows a synthetic rule table from a handful of rules to thousands of
+keywords and times RuleEngine.match (one trie-compiled regex) against the
+if/elif-style scan it replaced (an ``in`` check per keyword). The compiled
+matcher's per-message cost should stay roughly flat as the table grows;
+the linear scan's should not. Prints a JSON report.
+
+    python benchmarks/bench_rules.py --sizes 5,50,500,2000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bridge.rules import Rule, RuleEngine, load_rules
+
+MESSAGES = [
+    "I'm feeling anxious and stressed. Can you help me?",
+    "I need help with my studies and learning strategies, the homework keeps piling up.",
+    "I have a job interview coming up and need help preparing.",
+    "I need help with social interactions and making friends at my new school.",
+    "Can you help me build a daily routine that actually sticks? Mornings are chaos and I keep "
+    "forgetting appointments, which makes me feel like I'm failing at everything.",
+]
+
+
+def synthetic_rules(count, keywords_per_rule, seed):
+    """The shipped rules plus ``count`` random ones that never match the messages"""
+    rng = random.Random(seed)
+    rules = list(load_rules())
+    for index in range(count):
+        keywords = tuple(
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 11)))
+            for _ in range(keywords_per_rule)
+        )
+        rules.append(Rule(f"synthetic_{index}", rng.randint(0, 50), keywords, frozenset(), "...", False))
+    return rules
+
+
+def linear_match(rules, message):
+    message_lower = message.lower()
+    return [rule for rule in rules if any(keyword in message_lower for keyword in rule.keywords)]
+
+
+def time_per_message(match, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            match(message)
+    return (time.perf_counter() - started) / (iterations * len(MESSAGES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark enrichment rule matching as the rule table grows")
+    parser.add_argument("--sizes", default="0,10,100,500,2000", help="synthetic rules added on top of the shipped ones")
+    parser.add_argument("--keywords-per-rule", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        rules = synthetic_rules(size, args.keywords_per_rule, args.seed)
+        started = time.perf_counter()
+        engine = RuleEngine(rules)
+        compile_ms = (time.perf_counter() - started) * 1000
+        results.append({
+            "rules": len(rules),
+            "keywords": sum(len(rule.keywords) for rule in rules),
+            "compile_ms": round(compile_ms, 2),
+            "compiled_us_per_message": round(time_per_message(engine.match, args.iterations), 2),
+            "linear_us_per_message": round(time_per_message(lambda m: linear_match(rules, m), args.iterations), 2),
+        })
+
+    print(json.dumps({"benchmark": "enrichment_rules", "python": sys.version.split()[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
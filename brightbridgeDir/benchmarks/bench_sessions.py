@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Session service benchmark: SQLite (WAL, batched writes) against in-memory
+
+Creates ``--sessions`` sessions, appends ``--events`` text events to each
+from concurrent tasks, then times get_session for every session while it is
+cached ("hot") and again from a fresh service on the same file ("cold", so
+every load reads the database). Needs Google ADK. Prints a JSON report.
+
+    python benchmarks/bench_sessions.py --sessions 200 --events 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events import Event
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai.types import ModelContent, UserContent
+
+from bridgebright.sqlite_sessions import SqliteSessionService
+
+APP_NAME = "bench"
+TEXT = "I have a job interview next week and I keep freezing up when they ask about myself. " * 3
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def latency_report(samples):
+    return {
+        "p50_us": round(percentile(samples, 0.5) * 1e6, 1),
+        "p95_us": round(percentile(samples, 0.95) * 1e6, 1),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+    }
+
+
+def make_events(count):
+    return [
+        Event(invocation_id=f"i{index}", author="bench_agent", content=ModelContent(TEXT)) if index % 2
+        else Event(invocation_id=f"i{index}", author="user", content=UserContent(TEXT))
+        for index in range(count)
+    ]
+
+
+async def append_all(service, sessions, events_per_session):
+    # Built up front so only append_event is timed
+    events = {session.id: make_events(events_per_session) for session in sessions}
+
+    async def fill(session):
+        for event in events[session.id]:
+            await service.append_event(session, event)
+            # Let the other sessions' appends interleave, as concurrent requests would
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fill(session) for session in sessions))
+    flush = getattr(service, "flush_pending", None)
+    if flush is not None:
+        flush()
+    return time.perf_counter() - started
+
+
+async def load_all(service, sessions):
+    samples = []
+    for session in sessions:
+        started = time.perf_counter()
+        loaded = await service.get_session(app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+        samples.append(time.perf_counter() - started)
+        assert loaded is not None and len(loaded.events) == len(session.events)
+    return samples
+
+
+async def run_backend(name, service, reopen, args):
+    sessions = [
+        await service.create_session(app_name=APP_NAME, user_id=f"user{index % 50}", session_id=f"s{index}")
+        for index in range(args.sessions)
+    ]
+    append_s = await append_all(service, sessions, args.events)
+    total = args.sessions * args.events
+    report = {
+        "backend": name,
+        "events": total,
+        "append_events_per_s": round(total / append_s),
+        "load_hot": latency_report(await load_all(service, sessions)),
+    }
+    if reopen is not None:
+        cold = reopen()
+        report["load_cold"] = latency_report(await load_all(cold, sessions))
+        cold.close()
+    if hasattr(service, "stats"):
+        report["stats"] = {key: value for key, value in service.stats().items() if key != "path"}
+    return report
+
+
+async def main_async(args):
+    results = [await run_backend("in_memory", InMemorySessionService(), None, args)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.db or os.path.join(directory, "sessions.db")
+        options = dict(batch_size=args.batch_size, flush_ms=args.flush_ms, cache_size=args.sessions)
+        service = SqliteSessionService(path, **options)
+        results.append(await run_backend(
+            "sqlite", service, lambda: SqliteSessionService(path, **dict(options, cache_size=0)), args))
+        service.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite session service against the in-memory one")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--events", type=int, default=20, help="events appended per session")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--flush-ms", type=float, default=50)
+    parser.add_argument("--db", help="database file to use (default: a temporary one)")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print(json.dumps({"benchmark": "sessions", "python": sys.version.split()[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Per-agent prompt size report, before and after shared-prefix composition
+
+"Before" is parsed from the Agent(...) calls in a git revision of the
+agent modules (by default the one just before bridgebright/prompts.py was
+added), "after" comes from the agent registry (bridgebright/agents.json),
+so Google ADK does not need to be installed. Token counts use the bridge's
+~4 characters per token estimate. For the root agent the sub-agent
+descriptions are counted too, since ADK sends them as the tool
+declarations on every root turn. Prints a JSON report.
+
+    python benchmarks/prompt_tokens.py
+    python benchmarks/prompt_tokens.py --baseline 85ef434
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BRIDGE_DIR)
+
+from bridge.history import estimate_tokens
+from bridgebright.registry import AgentRegistry, load_config
+
+ROOT_MODULE = "bridgebright/agent.py"
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=BRIDGE_DIR, check=True, capture_output=True, text=True).stdout
+
+
+def default_baseline():
+    added = git("log", "--diff-filter=A", "--format=%H", "--", "bridgebright/prompts.py").split()
+    return f"{added[-1]}^" if added else "HEAD"
+
+
+def _value(node, constants):
+    """A string literal, or a module-level constant it names"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    return None
+
+
+def agent_calls(source):
+    """{name: {"description", "instruction"}} for every Agent(...) call in ``source``"""
+    tree = ast.parse(source)
+    constants = {
+        target.id: node.value.value
+        for node in tree.body if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+        for target in node.targets if isinstance(target, ast.Name)
+    }
+    agents = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "Agent":
+            fields = {keyword.arg: _value(keyword.value, constants) for keyword in node.keywords}
+            agents[fields["name"]] = {
+                "description": fields.get("description") or "",
+                "instruction": fields.get("instruction") or "",
+            }
+    return agents
+
+
+def agents_at(revision):
+    """{name: {"description", "instruction"}} as hard-coded in the agent modules at ``revision``"""
+    agents = {}
+    for path in git("ls-tree", "-r", "--name-only", revision, "--", "bridgebright").split():
+        if path == ROOT_MODULE or (path.startswith("bridgebright/sub_agents/") and path.endswith("/agent.py")):
+            agents.update(agent_calls(git("show", f"{revision}:./{path}")))
+    return agents
+
+
+def registry_agents(path=None):
+    """The same shape for the agents declared in the registry config"""
+    registry = AgentRegistry.from_file(path)
+    return {
+        spec.name: {"description": spec.description, "instruction": spec.instruction}
+        for spec in (registry.root, *registry.specs.values())
+    }
+
+
+def prompt_tokens(agents, root_name):
+    """Tokens each agent sends per turn: its instruction, plus tool declarations for the root"""
+    tools = sum(estimate_tokens(name) + estimate_tokens(agent["description"])
+                for name, agent in agents.items() if name != root_name)
+    return {
+        name: estimate_tokens(agent["instruction"]) + (tools if name == root_name else 0)
+        for name, agent in agents.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-agent prompt tokens before and after prefix composition")
+    parser.add_argument("--baseline", help="git revision with hard-coded instructions (default: before prompts.py existed)")
+    parser.add_argument("--config", help="agent registry config (default: bridgebright/agents.json)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    root_name = config["root"]["name"]
+    specialist_prefix = config.get("specialist_prefix", "")
+
+    baseline = args.baseline or default_baseline()
+    before = prompt_tokens(agents_at(baseline), root_name)
+    after_agents = registry_agents(args.config)
+    after = prompt_tokens(after_agents, root_name)
+    prefix = estimate_tokens(specialist_prefix)
+
+    rows = []
+    for name in sorted(set(before) | set(after)):
+        instruction = after_agents.get(name, {}).get("instruction", "")
+        shared = prefix if specialist_prefix and instruction.startswith(specialist_prefix) else 0
+        rows.append({
+            "agent": name,
+            "before_tokens": before.get(name),
+            "after_tokens": after.get(name),
+            "shared_prefix_tokens": shared,
+            "unique_tokens": after[name] - shared if name in after else None,
+        })
+
+    print(json.dumps({
+        "report": "prompt_tokens",
+        "baseline": baseline,
+        "shared_prefix_tokens": prefix,
+        "agents": rows,
+        "total_before": sum(before.values()),
+        "total_after": sum(after.values()),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
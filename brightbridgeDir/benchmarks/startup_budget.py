@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for agent_bridge.py
+
+Spawns the bridge the same way the Node server does, with ``-X importtime``,
+and measures wall-clock time from spawn to the first response line. Exits
+non-zero when the median cold start exceeds the configured budget, so it can
+gate CI or a deploy.
+
+    python benchmarks/startup_budget.py --budget-ms 800 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BRIDGE_SCRIPT = os.path.join(BRIDGE_DIR, "agent_bridge.py")
+
+DEFAULT_BUDGET_MS = float(os.getenv("BRIDGE_STARTUP_BUDGET_MS", "1500"))
+DEFAULT_REQUEST = {
+    "agent_type": "general",
+    "message": "Hello! I'd like to chat about how I'm feeling today.",
+    "user_name": "Benchmark",
+    "conversation_history": []
+}
+
+
+def parse_importtime(stderr_text):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us = int(fields[0])
+            cumulative_us = int(fields[1])
+        except ValueError:
+            # Header row
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (self_us, cumulative_us, depth)
+    return modules
+
+
+def run_once(request, env):
+    """Spawn one bridge process and time it to the first stdout line"""
+    payload = json.dumps(request).encode()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", BRIDGE_SCRIPT],
+        cwd=BRIDGE_DIR,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    process.stdin.write(payload)
+    process.stdin.close()
+    first_line = process.stdout.readline()
+    first_response_ms = (time.perf_counter() - started) * 1000
+    process.stdout.read()
+    stderr_text = process.stderr.read().decode(errors="replace")
+    process.wait()
+    exit_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        response = json.loads(first_line)
+    except ValueError:
+        response = None
+
+    return {
+        "first_response_ms": first_response_ms,
+        "exit_ms": exit_ms,
+        "returncode": process.returncode,
+        "success": bool(response and response.get("success")),
+        "mode": response.get("mode") if response else None,
+        "imports": parse_importtime(stderr_text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent_bridge.py cold start against a budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail when median time to first response exceeds this (env BRIDGE_STARTUP_BUDGET_MS)")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to sample")
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to report")
+    parser.add_argument("--request", help="JSON request to send instead of the default general chat")
+    args = parser.parse_args()
+
+    request = json.loads(args.request) if args.request else DEFAULT_REQUEST
+    env = dict(os.environ, PYTHONPATH=BRIDGE_DIR, PYTHONUNBUFFERED="1")
+
+    runs = [run_once(request, env) for _ in range(args.runs)]
+    first_response = [run["first_response_ms"] for run in runs]
+    median_ms = statistics.median(first_response)
+
+    # Import profile from the last run, top-level modules only (nested ones are counted in them)
+    imports = runs[-1]["imports"]
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in imports.items() if depth == 0),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    total_import_us = sum(cumulative for _, cumulative in top_level)
+
+    report = {
+        "budget_ms": args.budget_ms,
+        "runs": args.runs,
+        "mode": runs[-1]["mode"],
+        "all_succeeded": all(run["success"] for run in runs),
+        "first_response_ms": {
+            "median": round(median_ms, 2),
+            "min": round(min(first_response), 2),
+            "max": round(max(first_response), 2),
+        },
+        "process_exit_ms_median": round(statistics.median(run["exit_ms"] for run in runs), 2),
+        "import_time_ms": round(total_import_us / 1000, 2),
+        "modules_imported": len(imports),
+        "slowest_imports_ms": {name: round(cumulative / 1000, 2) for name, cumulative in top_level[:args.top]},
+        "within_budget": median_ms <= args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+
+    if not report["all_succeeded"]:
+        print("❌ Bridge did not answer successfully on every run", file=sys.stderr)
+        sys.exit(2)
+    if not report["within_budget"]:
+        print(f"❌ Cold start {median_ms:.0f}ms is over the {args.budget_ms:.0f}ms budget", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Cold start {median_ms:.0f}ms is within the {args.budget_ms:.0f}ms budget", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Runtime helpers for agent_bridge.py. Nothing in here imports Google ADK, so
+# mock mode and the long-running bridge modes can use them without paying for it.
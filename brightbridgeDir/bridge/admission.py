@@ -0,0 +1,90 @@
+"""
+Admission control: a global concurrency cap with a bounded wait queue
+"""
+import asyncio
+import collections
+import time
+
+
+class Shed(Exception):
+    """A request was turned away instead of being run"""
+
+    def __init__(self, reason):
+        super().__init__(f"request shed: {reason}")
+        self.reason = reason
+
+
+class AdmissionController:
+    """Lets at most ``max_concurrent`` requests run, with up to ``max_queue`` waiting.
+
+    A request that arrives to a full queue is shed immediately, so overload
+    turns into fast rejections rather than an ever-growing backlog; one whose
+    deadline passes while it waits is shed too. Waiters are admitted in
+    arrival order. ``max_concurrent=None`` admits everything.
+    """
+
+    def __init__(self, max_concurrent=None, max_queue=64):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiters = collections.deque()
+        self._stats = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_deadline": 0, "peak_queue": 0}
+
+    def _has_slot(self):
+        return self.max_concurrent is None or self._active < self.max_concurrent
+
+    async def acquire(self, deadline=None):
+        """Wait for a slot; ``deadline`` is a ``time.monotonic()`` instant. Raises Shed."""
+        if self._has_slot() and not self._waiters:
+            self._active += 1
+            self._stats["admitted"] += 1
+            return
+        if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+            self._stats["shed_queue_full"] += 1
+            raise Shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["peak_queue"] = max(self._stats["peak_queue"], len(self._waiters))
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Handed a slot just as the deadline passed: give it back
+                self.release()
+            else:
+                waiter.cancel()
+            self._stats["shed_deadline"] += 1
+            raise Shed("deadline")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self._stats["admitted"] += 1
+
+    def release(self):
+        """Free a slot, handing it straight to the longest waiter if there is one"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self):
+        return dict(
+            self._stats,
+            active=self._active,
+            waiting=len(self._waiters),
+            max_concurrent=self.max_concurrent,
+            max_queue=self.max_queue,
+        )
@@ -0,0 +1,182 @@
+"""
+Batch processing of a JSONL file of requests on one event loop
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+
+class RateLimiter:
+    """Spaces request starts at most ``rate`` per second (no bursts)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+def load_checkpoint(output_path):
+    """Input line numbers already answered in ``output_path``.
+
+    The output file is the checkpoint: every result records its input
+    ``line``. A torn last line from an interrupted run is cut off so the
+    resumed run appends cleanly.
+    """
+    done = set()
+    if not output_path or not os.path.exists(output_path):
+        return done
+
+    good_bytes = 0
+    with open(output_path, "rb") as handle:
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(raw)["line"])
+            except (ValueError, KeyError, TypeError):
+                break
+            good_bytes += len(raw)
+    if good_bytes != os.path.getsize(output_path):
+        with open(output_path, "r+b") as handle:
+            handle.truncate(good_bytes)
+    return done
+
+
+def to_request(record, message_field=None, id_field="id", defaults=None):
+    """Bridge request for one input record.
+
+    Records are bridge requests already, unless ``message_field`` names the
+    field holding the message (e.g. ``body`` in a backlog-style file), in
+    which case ``id_field`` supplies the id and ``defaults`` the rest.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("request must be a JSON object")
+    if message_field is None:
+        request = dict(defaults or {}, **record)
+    else:
+        if message_field not in record:
+            raise ValueError(f"missing field: {message_field}")
+        request = dict(defaults or {}, message=str(record[message_field]))
+        if id_field in record:
+            request["id"] = record[id_field]
+    request.pop("stream", None)
+    return request
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+async def run_batch(handle, input_path, output_path=None, concurrency=8, rate=None, ordered=True,
+                    resume=False, message_field=None, id_field="id", defaults=None, stopping=None):
+    """Answer every request in ``input_path`` with ``handle(request)`` and write results as JSONL.
+
+    At most ``concurrency`` requests run at once and at most ``rate`` start per
+    second. With ``ordered`` the results keep input order (a window of a few
+    times ``concurrency`` bounds how far ahead work may run); otherwise each is
+    written as soon as it finishes. With ``resume`` input lines already in
+    ``output_path`` are skipped. Setting ``stopping`` ends reading early and
+    drains what is in flight. Returns a summary dict.
+    """
+    skip = load_checkpoint(output_path) if resume else set()
+    out = open(output_path, "a" if resume else "w", encoding="utf-8") if output_path else sys.stdout
+    slots = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate) if rate else None
+    window = concurrency * 4
+
+    pending = {}
+    written = asyncio.Event()
+    next_seq = 0
+    latencies = []
+    counts = {"succeeded": 0, "failed": 0}
+
+    def write(result):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        counts["succeeded" if result.get("success") else "failed"] += 1
+
+    def deliver(seq, result):
+        nonlocal next_seq
+        if not ordered:
+            write(result)
+            return
+        pending[seq] = result
+        while next_seq in pending:
+            write(pending.pop(next_seq))
+            next_seq += 1
+        written.set()
+
+    async def run_one(seq, line_number, raw):
+        try:
+            try:
+                request = to_request(json.loads(raw), message_field, id_field, defaults)
+            except ValueError as e:
+                result = {"success": False, "error": f"Invalid request: {e}"}
+            else:
+                started = time.perf_counter()
+                try:
+                    result = await handle(request)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                    if "id" in request:
+                        result["id"] = request["id"]
+                latencies.append((time.perf_counter() - started) * 1000)
+            deliver(seq, dict(result, line=line_number))
+        finally:
+            slots.release()
+
+    tasks = set()
+    seq = 0
+    started = time.perf_counter()
+    try:
+        with open(input_path, encoding="utf-8") as source:
+            for line_number, raw in enumerate(source):
+                if stopping is not None and stopping.is_set():
+                    break
+                if line_number in skip or not raw.strip():
+                    continue
+                while ordered and seq - next_seq >= window:
+                    written.clear()
+                    await written.wait()
+                await slots.acquire()
+                if limiter is not None:
+                    await limiter.wait()
+                task = asyncio.ensure_future(run_one(seq, line_number, raw))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                seq += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    processed = counts["succeeded"] + counts["failed"]
+    return {
+        "processed": processed,
+        "succeeded": counts["succeeded"],
+        "failed": counts["failed"],
+        "skipped": len(skip),
+        "interrupted": bool(stopping is not None and stopping.is_set()),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(processed / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+        },
+    }
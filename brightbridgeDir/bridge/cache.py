@@ -0,0 +1,171 @@
+"""
+TTL-bounded cache of agent replies with near-duplicate lookup
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+USER_PLACEHOLDER = "\x00user_name\x00"
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _PUNCTUATION.sub(" ", (message or "").lower()).replace("'", "")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def reply_template(response, user_name):
+    """``response`` with whole-word ``user_name`` swapped for the placeholder.
+
+    Returns None when the name cannot be told apart from the rest of the
+    reply: a single character, or a name that also appears in another case
+    (Hope/hope, Will/will), where any replacement would rewrite ordinary words.
+    """
+    name = (user_name or "").strip()
+    if not name:
+        return response
+    if len(name) < 2:
+        return None
+    pattern = r"(?<!\w)" + re.escape(name) + r"(?!\w)"
+    if len(re.findall(pattern, response, re.IGNORECASE)) != len(re.findall(pattern, response)):
+        return None
+    return re.sub(pattern, lambda match: USER_PLACEHOLDER, response)
+
+
+def shingles(text, size=3):
+    """Character n-grams of a normalized message (the whole text if shorter)"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class ResponseCache:
+    """Reply cache keyed by (agent_type, normalized message).
+
+    Replies are stored as templates with the user's name swapped for a
+    placeholder, so one entry serves every user; replies where the name
+    cannot be swapped cleanly (see ``reply_template``) are not stored. Lookups try the exact key
+    first, then a character-shingle inverted index for near-duplicates whose
+    Jaccard similarity is at least ``similarity``. Entries expire after
+    ``ttl`` seconds and the least recently used go first past ``max_entries``.
+    Agent types in ``excluded_agent_types`` are never stored or served.
+    """
+
+    def __init__(self, max_entries=512, ttl=600.0, similarity=0.85, shingle_size=3,
+                 excluded_agent_types=("crisis",), clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.shingle_size = shingle_size
+        self.excluded_agent_types = set(excluded_agent_types)
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._index = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.unstorable = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, agent_type, message, user_name):
+        """Return the cached reply personalised for ``user_name``, or None"""
+        if agent_type in self.excluded_agent_types:
+            return None
+        normalized = normalize_message(message)
+        key = (agent_type, normalized)
+        with self._lock:
+            now = self.clock()
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self.hits += 1
+            else:
+                entry = self._nearest(agent_type, normalized, now)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                self.near_hits += 1
+            template = entry[0]
+        return template.replace(USER_PLACEHOLDER, user_name or "")
+
+    def put(self, agent_type, message, user_name, response):
+        if agent_type in self.excluded_agent_types or not response:
+            return
+        template = reply_template(response, user_name)
+        if template is None:
+            with self._lock:
+                self.unstorable += 1
+            return
+        normalized = normalize_message(message)
+        key = (agent_type, normalized)
+        grams = shingles(normalized, self.shingle_size)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (template, self.clock() + self.ttl, grams)
+            for gram in grams:
+                self._index.setdefault((agent_type, gram), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def bypass(self):
+        """Count a request that was not eligible for the cache"""
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self):
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "unstorable": self.unstorable,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _live_entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, agent_type, normalized, now):
+        grams = shingles(normalized, self.shingle_size)
+        overlaps = {}
+        for gram in grams:
+            for key in self._index.get((agent_type, gram), ()):
+                overlaps[key] = overlaps.get(key, 0) + 1
+
+        best_key, best_score = None, self.similarity
+        for key, overlap in overlaps.items():
+            other = self._entries[key][2]
+            score = overlap / (len(grams) + len(other) - overlap)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return self._live_entry(best_key, now) if best_key is not None else None
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            keys = self._index.get((key[0], gram))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[(key[0], gram)]
@@ -0,0 +1,89 @@
+"""
+Local crisis detection that runs before any model call
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from bridge.keywords import KeywordMatcher
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crisis_lexicon.json")
+
+# Curly apostrophes and runs of whitespace would otherwise hide "can’t  cope"
+_APOSTROPHES = re.compile(r"[‘’ʼ]")
+_WHITESPACE = re.compile(r"\s+")
+
+CrisisMatch = namedtuple("CrisisMatch", ["categories", "terms", "elapsed_us"])
+
+
+def normalize(message):
+    return _WHITESPACE.sub(" ", _APOSTROPHES.sub("'", message or ""))
+
+
+class CrisisDetector:
+    """Scans a message against the crisis lexicon in one regex pass.
+
+    ``lexicon`` has the ``resources`` text to show, ``terms`` (category ->
+    phrases, matched as word prefixes so 'suicid' style stems work) and
+    ``agent_types`` that always count as a detection. Scan counts, hits per
+    category and scan time are kept for the stats op.
+    """
+
+    def __init__(self, lexicon):
+        self.resources = lexicon["resources"]
+        self.agent_types = frozenset(lexicon.get("agent_types", ()))
+        self._matcher = KeywordMatcher(lexicon["terms"], whole_words=False)
+        self._lock = threading.Lock()
+        self._scans = 0
+        self._detections = 0
+        self._by_category = {}
+        self._total_us = 0.0
+        self._max_us = 0.0
+
+    @classmethod
+    def from_file(cls, path=None):
+        with open(path or DEFAULT_LEXICON_PATH, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def detect(self, message, agent_type=None):
+        """CrisisMatch when the message (or its agent_type) signals a crisis, else None"""
+        started = time.perf_counter()
+        categories, terms = set(), []
+        for term, labels in self._matcher.matches(normalize(message)):
+            categories |= labels
+            terms.append(term)
+        if agent_type in self.agent_types:
+            categories.add("agent_type")
+        elapsed_us = (time.perf_counter() - started) * 1e6
+
+        with self._lock:
+            self._scans += 1
+            self._total_us += elapsed_us
+            self._max_us = max(self._max_us, elapsed_us)
+            if categories:
+                self._detections += 1
+                for category in categories:
+                    self._by_category[category] = self._by_category.get(category, 0) + 1
+
+        if not categories:
+            return None
+        return CrisisMatch(frozenset(categories), tuple(terms), elapsed_us)
+
+    def with_resources(self, response):
+        """``response`` led by the resource block, unless it already carries it"""
+        if self.resources in (response or ""):
+            return response
+        return f"{self.resources}\n\n{response}" if response else self.resources
+
+    def stats(self):
+        with self._lock:
+            return {
+                "scans": self._scans,
+                "detections": self._detections,
+                "by_category": dict(self._by_category),
+                "mean_us": round(self._total_us / self._scans, 2) if self._scans else 0.0,
+                "max_us": round(self._max_us, 2),
+            }
@@ -0,0 +1,85 @@
+"""
+Token-budgeted conversation history compaction
+"""
+import re
+from collections import namedtuple
+
+SUMMARY_ROLE = "summary"
+SUMMARY_PREFIX = "Summary of our earlier conversation:"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+CompactedHistory = namedtuple(
+    "CompactedHistory", ["turns", "tokens_before", "tokens_after", "turns_summarized"]
+)
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def turns_tokens(turns):
+    return sum(estimate_tokens(turn.get("content", "")) for turn in turns)
+
+
+def summary_line(turn, max_chars=160):
+    """One extractive line for a turn: the speaker and their first sentence"""
+    text = " ".join(turn.get("content", "").split())
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) > max_chars:
+        first = first[:max_chars - 1].rstrip() + "…"
+    speaker = "User" if turn.get("role") == "user" else "Assistant"
+    return f"{speaker}: {first}"
+
+
+class HistoryCompactor:
+    """Keeps the last ``keep_turns`` turns verbatim and folds older ones into a summary.
+
+    Turns are ``{"role", "content"}`` dicts. A leading turn with role
+    ``"summary"`` is the rolling summary from an earlier compaction; its lines
+    are kept and the newly folded turns are appended to it. The summary is then
+    trimmed, oldest lines first, so everything fits in ``token_budget``.
+    """
+
+    def __init__(self, keep_turns=6, token_budget=2000, min_summary_tokens=64):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.min_summary_tokens = min_summary_tokens
+
+    def needs_compaction(self, turns):
+        return len(turns) > self.keep_turns or turns_tokens(turns) > self.token_budget
+
+    def compact(self, turns):
+        turns = [turn for turn in turns or [] if isinstance(turn, dict) and turn.get("content")]
+        tokens_before = turns_tokens(turns)
+        if not self.needs_compaction(turns):
+            return CompactedHistory(turns, tokens_before, tokens_before, 0)
+
+        summary_lines = []
+        if turns and turns[0].get("role") == SUMMARY_ROLE:
+            previous = turns.pop(0)["content"]
+            if previous.startswith(SUMMARY_PREFIX):
+                previous = previous[len(SUMMARY_PREFIX):]
+            summary_lines = [line for line in previous.strip().splitlines() if line.strip()]
+
+        split = max(len(turns) - self.keep_turns, 0)
+        older, recent = turns[:split], turns[split:]
+
+        # Recent turns are verbatim, but never let them crowd out the whole budget
+        summary_floor = self.min_summary_tokens if (older or summary_lines) else 0
+        while len(recent) > 1 and turns_tokens(recent) > self.token_budget - summary_floor:
+            older.append(recent.pop(0))
+
+        summary_lines.extend(summary_line(turn) for turn in older)
+        summary_budget = max(self.token_budget - turns_tokens(recent), 0)
+        while summary_lines and estimate_tokens(SUMMARY_PREFIX + "\n" + "\n".join(summary_lines)) > summary_budget:
+            summary_lines.pop(0)
+
+        compacted = list(recent)
+        if summary_lines:
+            compacted.insert(0, {
+                "role": SUMMARY_ROLE,
+                "content": SUMMARY_PREFIX + "\n" + "\n".join(summary_lines),
+            })
+        return CompactedHistory(compacted, tokens_before, turns_tokens(compacted), len(older))
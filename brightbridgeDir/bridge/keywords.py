@@ -0,0 +1,84 @@
+"""
+Multi-keyword matching with one compiled pattern
+"""
+import re
+
+
+def trie_pattern(keywords):
+    """Regex source matching any of ``keywords``, with shared prefixes factored out.
+
+    A flat ``a|b|c`` alternation is tried branch by branch at every position,
+    so its cost grows with the number of keywords; the trie form branches on
+    one character at a time and stays flat as the keyword list grows. Longer
+    keywords win over their own prefixes (the optional groups are greedy).
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds which labels' keywords occur in a text, in a single regex pass.
+
+    ``keywords`` maps each label to its keywords; a keyword may belong to
+    several labels. Matching is case-insensitive and anchored at a word start;
+    with ``whole_words`` the keyword must also end on a word boundary,
+    otherwise it matches as a prefix ('anxious' matches 'anxiousness').
+    """
+
+    def __init__(self, keywords, whole_words=True):
+        self.whole_words = whole_words
+        labels_by_keyword = {}
+        for label, words in keywords.items():
+            for word in words:
+                labels_by_keyword.setdefault(word.lower(), set()).add(label)
+
+        # Only the longest keyword at a position is reported, so fold in the
+        # labels of any shorter keyword that would have matched there too
+        self._labels = {}
+        for keyword, labels in labels_by_keyword.items():
+            merged = set(labels)
+            for end in range(1, len(keyword)):
+                prefix = keyword[:end]
+                if prefix in labels_by_keyword and (not whole_words or not _is_word_char(keyword[end])):
+                    merged |= labels_by_keyword[prefix]
+            self._labels[keyword] = frozenset(merged)
+
+        tail = r"\b" if whole_words else ""
+        self._pattern = re.compile(r"\b(?:" + trie_pattern(self._labels) + r")" + tail) if self._labels else None
+
+    def __len__(self):
+        return len(self._labels)
+
+    def matches(self, text):
+        """Yield ``(keyword, labels)`` for each keyword occurrence in ``text``"""
+        if self._pattern is None or not text:
+            return
+        for match in self._pattern.finditer(text.lower()):
+            keyword = match.group(0)
+            yield keyword, self._labels[keyword]
+
+    def labels(self, text):
+        """Set of labels with at least one keyword in ``text``"""
+        found = set()
+        for _, labels in self.matches(text):
+            found |= labels
+        return found
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
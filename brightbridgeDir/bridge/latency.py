@@ -0,0 +1,111 @@
+"""
+Latency and failure model for MockAgentBridge load testing
+"""
+import json
+import random
+
+
+class InjectedFailure(RuntimeError):
+    """Error raised on purpose by the mock to simulate a failing model backend"""
+
+
+def load_histogram(path):
+    """Read latency samples as ``[(latency_ms, weight), ...]``.
+
+    Accepts a JSON list of latencies, a JSON object ``{"latency_ms": count}``,
+    or a text file with one ``latency_ms [count]`` pair per line.
+    """
+    with open(path) as handle:
+        text = handle.read()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if isinstance(data, list):
+        samples = [(float(value), 1.0) for value in data]
+    elif isinstance(data, dict):
+        samples = [(float(value), float(count)) for value, count in data.items()]
+    else:
+        samples = []
+        for line in text.splitlines():
+            fields = line.split("#", 1)[0].split()
+            if fields:
+                samples.append((float(fields[0]), float(fields[1]) if len(fields) > 1 else 1.0))
+
+    samples = [(value, weight) for value, weight in samples if weight > 0]
+    if not samples:
+        raise ValueError(f"No latency samples in {path}")
+    return samples
+
+
+class LatencyModel:
+    """Samples per-request latency and decides injected failures.
+
+    ``spec`` picks the base distribution:
+
+    - ``fixed:500``: always 500 ms
+    - ``normal:500,120``: normal with mean 500 ms and std-dev 120 ms (floored at 0)
+    - ``histogram:/path/to/samples``: replayed from recorded latencies (see load_histogram)
+
+    On top of that, ``tail_probability`` of requests get ``tail_ms`` extra
+    latency and ``error_rate`` of them fail. With a ``seed`` the sequence of
+    draws is reproducible run to run.
+    """
+
+    def __init__(self, spec="fixed:500", tail_probability=0.0, tail_ms=0.0, error_rate=0.0, seed=None):
+        self.spec = spec
+        self.tail_probability = tail_probability
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        if self.kind == "fixed":
+            self.base_ms = float(args or 500)
+        elif self.kind == "normal":
+            mean, _, stddev = args.partition(",")
+            self.mean_ms = float(mean)
+            self.stddev_ms = float(stddev or 0)
+        elif self.kind == "histogram":
+            samples = load_histogram(args)
+            self.values = [value for value, _ in samples]
+            self.weights = [weight for _, weight in samples]
+        else:
+            raise ValueError(f"Unknown latency model: {spec}")
+
+    @classmethod
+    def from_env(cls, environ):
+        seed = environ.get("BRIDGE_MOCK_SEED")
+        return cls(
+            spec=environ.get("BRIDGE_MOCK_LATENCY", "fixed:500"),
+            tail_probability=float(environ.get("BRIDGE_MOCK_TAIL_PROBABILITY", "0")),
+            tail_ms=float(environ.get("BRIDGE_MOCK_TAIL_MS", "0")),
+            error_rate=float(environ.get("BRIDGE_MOCK_ERROR_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def sample_ms(self):
+        if self.kind == "fixed":
+            latency = self.base_ms
+        elif self.kind == "normal":
+            latency = max(self.random.gauss(self.mean_ms, self.stddev_ms), 0.0)
+        else:
+            latency = self.random.choices(self.values, weights=self.weights)[0]
+
+        if self.tail_probability and self.random.random() < self.tail_probability:
+            latency += self.tail_ms
+        return latency
+
+    def should_fail(self):
+        return bool(self.error_rate) and self.random.random() < self.error_rate
+
+    def describe(self):
+        return {
+            "spec": self.spec,
+            "tail_probability": self.tail_probability,
+            "tail_ms": self.tail_ms,
+            "error_rate": self.error_rate,
+        }
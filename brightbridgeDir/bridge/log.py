@@ -0,0 +1,133 @@
+"""
+Structured, non-blocking logging for the bridge
+
+Records are written to stderr as JSON lines by a background thread, so the
+request path only pays for an in-memory queue put. Settings:
+
+- BRIDGE_LOG_LEVEL: DEBUG, INFO (default), WARNING or ERROR
+- BRIDGE_LOG_SAMPLE: fraction of INFO/DEBUG records kept (default 1.0);
+  warnings and errors are never sampled out
+- BRIDGE_LOG_QUEUE: most records waiting for the writer (default 10000);
+  records beyond that are dropped and counted rather than blocking
+
+A forked child (bridge_supervisor.py workers) starts its own writer thread.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+LOGGER_NAME = "bridge"
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, then any extra fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key != "unsampled":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a ``rate`` fraction of INFO-and-below records unless they set ``unsampled``"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > logging.INFO or getattr(record, "unsampled", False):
+            return True
+        return random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the writer falls behind"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+_handler = None
+_listener = None
+
+
+def setup_logging(stream=None, environ=None):
+    """Configure the ``bridge`` logger from the environment and start the writer thread"""
+    global _handler, _listener
+    environ = os.environ if environ is None else environ
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    level = logging.getLevelName(environ.get("BRIDGE_LOG_LEVEL", "INFO").upper())
+    logger.setLevel(level if isinstance(level, int) else logging.INFO)
+    logger.propagate = False
+
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter())
+
+    _handler = DroppingQueueHandler(queue.Queue(int(environ.get("BRIDGE_LOG_QUEUE", "10000"))))
+    _handler.addFilter(SamplingFilter(float(environ.get("BRIDGE_LOG_SAMPLE", "1"))))
+    logger.addHandler(_handler)
+
+    _listener = logging.handlers.QueueListener(_handler.queue, writer)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """The writer thread does not survive fork(): give a child its own queue and writer"""
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    _handler.dropped = 0
+    _handler._lock = threading.Lock()
+    _listener = logging.handlers.QueueListener(_handler.queue, *_listener.handlers)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def dropped_records():
+    return _handler.dropped if _handler is not None else 0
@@ -0,0 +1,211 @@
+"""
+In-process metrics with Prometheus text exposition
+"""
+import asyncio
+import bisect
+import math
+import os
+import threading
+
+# Request / agent latencies in seconds, from cache hits to slow multi-agent turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, or is read from ``set_function`` at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        self._function = function
+
+    def render(self):
+        if self._function is not None:
+            return self.header() + [f"{self.name} {_format_value(self._function())}"]
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; ``observe`` is a bisect plus three adds"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # First bucket whose upper bound (le) is >= value; len(buckets) is +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[2] if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Named metrics; declaring the same name twice returns the existing metric"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _declare(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already declared differently")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._declare(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._declare(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._declare(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the bridge and the agent run loop in this process
+REGISTRY = Registry()
+
+
+async def start_metrics_server(registry, host="127.0.0.1", port=9464):
+    """Serve ``registry`` as Prometheus text on ``GET /metrics``; returns the asyncio server"""
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def write_metrics_file(registry, path):
+    """Atomically write ``registry`` to ``path`` (``{pid}`` is replaced by the process id)"""
+    path = path.replace("{pid}", str(os.getpid()))
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(registry.render())
+    os.replace(temporary, path)
+    return path
@@ -0,0 +1,263 @@
+"""
+Retries, hedging and a circuit breaker around agent execution
+"""
+import asyncio
+import collections
+import random
+import time
+
+from bridge.latency import InjectedFailure
+from bridge.metrics import REGISTRY
+
+# HTTP-style codes and gRPC-style statuses the model APIs use for "try again"
+TRANSIENT_CODES = {408, 429, 500, 502, 503, 504}
+TRANSIENT_STATUSES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "ABORTED"}
+TRANSIENT_NAMES = ("ServerError", "ServiceUnavailable", "TooManyRequests", "ResourceExhausted", "Timeout")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+RETRIES = REGISTRY.counter("bridge_retries_total", "Agent attempts retried after a transient error")
+HEDGES = REGISTRY.counter(
+    "bridge_hedges_total", "Hedged second attempts by which attempt answered first", ("winner",))
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "bridge_breaker_transitions_total", "Circuit breaker state changes", ("state",))
+BREAKER_STATE = REGISTRY.gauge("bridge_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open")
+BREAKER_LEVELS = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+BREAKER_STATE.set(0)
+
+
+class TransientError(Exception):
+    """A transient agent failure surfaced (after cleanup) so the caller can retry it"""
+
+    def __init__(self, cause):
+        super().__init__(str(cause))
+        self.cause = cause
+
+
+def is_transient(error):
+    """Whether ``error`` is worth retrying: overload, unavailability or a timeout"""
+    if isinstance(error, (TransientError, InjectedFailure, ConnectionError)):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in TRANSIENT_CODES:
+        return True
+    if str(getattr(error, "status", "") or "").upper() in TRANSIENT_STATUSES:
+        return True
+    return any(name in type(error).__name__ for name in TRANSIENT_NAMES)
+
+
+class RetryPolicy:
+    """Up to ``attempts`` tries with full-jitter exponential backoff between them"""
+
+    def __init__(self, attempts=3, base_ms=200, max_ms=2000, rng=None):
+        self.attempts = max(attempts, 1)
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+        self.rng = rng or random.Random()
+
+    def delay(self, retry_index):
+        """Seconds to wait before retry number ``retry_index`` (0-based)"""
+        return self.rng.uniform(0, min(self.max_ms, self.base_ms * 2 ** retry_index)) / 1000
+
+
+class CircuitBreaker:
+    """Opens when the error rate over the last ``window`` calls reaches ``error_rate``.
+
+    While open every call is refused for ``open_seconds``; then one probe is let
+    through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, window=20, error_rate=0.5, min_calls=10, open_seconds=30.0, clock=time.monotonic):
+        self.window = window
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self._outcomes = collections.deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def _move(self, state):
+        if state != self.state:
+            self.state = state
+            BREAKER_TRANSITIONS.inc(state=state)
+            BREAKER_STATE.set(BREAKER_LEVELS[state])
+
+    def is_open(self):
+        """Whether calls are being refused right now (read-only, unlike ``allow``)"""
+        return self.state == OPEN and self.clock() - self._opened_at < self.open_seconds
+
+    def allow(self):
+        if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._move(HALF_OPEN)
+            self._probing = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record(self, ok):
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok:
+                self._outcomes.clear()
+                self._move(CLOSED)
+            else:
+                self._trip()
+            return
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+            self._trip()
+
+    def abandon(self):
+        """A call ended with no outcome (cancelled, e.g. past its deadline): free the probe slot"""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def _trip(self):
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self._move(OPEN)
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": self._outcomes.count(False),
+        }
+
+
+class LatencyWindow:
+    """Recent successful attempt latencies, for the hedging delay"""
+
+    def __init__(self, size=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = collections.deque(maxlen=size)
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Resilience:
+    """Runs an agent attempt with retries, optional hedging and a circuit breaker.
+
+    ``call(attempt)`` awaits ``attempt()`` (a fresh coroutine per try). A
+    transient failure is retried after a jittered backoff while ``retryable()``
+    allows it (e.g. nothing has been streamed yet) and the breaker stays
+    closed. With ``hedge`` and enough latency history, a second attempt starts
+    once the first has run past the ``hedge_percentile`` latency and whichever
+    finishes first wins. Callers check ``breaker.allow()`` before calling;
+    the breaker then gets one outcome per call, however many attempts it took.
+    """
+
+    def __init__(self, retry=None, breaker=None, hedge_percentile=0.95, latencies=None):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.latencies = latencies or LatencyWindow()
+        self._counts = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            retry=RetryPolicy(
+                attempts=int(environ.get("BRIDGE_RETRY_ATTEMPTS", "3")),
+                base_ms=float(environ.get("BRIDGE_RETRY_BASE_MS", "200")),
+                max_ms=float(environ.get("BRIDGE_RETRY_MAX_MS", "2000")),
+            ),
+            breaker=CircuitBreaker(
+                window=int(environ.get("BRIDGE_BREAKER_WINDOW", "20")),
+                error_rate=float(environ.get("BRIDGE_BREAKER_ERROR_RATE", "0.5")),
+                min_calls=int(environ.get("BRIDGE_BREAKER_MIN_CALLS", "10")),
+                open_seconds=float(environ.get("BRIDGE_BREAKER_OPEN_SECONDS", "30")),
+            ),
+            hedge_percentile=float(environ.get("BRIDGE_HEDGE_PERCENTILE", "0.95")),
+            latencies=LatencyWindow(min_samples=int(environ.get("BRIDGE_HEDGE_MIN_SAMPLES", "20"))),
+        )
+
+    async def call(self, attempt, retryable=None, hedge=False, succeeded=None):
+        """Result of the first successful attempt; re-raises the last failure.
+
+        ``succeeded(result)`` lets a returned-but-degraded result count as a
+        failure for the breaker without being retried.
+        """
+        self._counts["calls"] += 1
+        for retry_index in range(self.retry.attempts):
+            try:
+                result = await (self._hedged(attempt) if hedge else self._timed(attempt))
+            except Exception as error:
+                last_try = retry_index + 1 == self.retry.attempts
+                if last_try or not is_transient(error) or (retryable and not retryable()) or self.breaker.is_open():
+                    self._counts["failures"] += 1
+                    self.breaker.record(False)
+                    raise
+                self._counts["retries"] += 1
+                RETRIES.inc()
+                await asyncio.sleep(self.retry.delay(retry_index))
+                continue
+            except BaseException:
+                # Cancelled mid-attempt: no outcome to record, but a half-open probe must not stay taken
+                self.breaker.abandon()
+                raise
+            self.breaker.record(succeeded(result) if succeeded else True)
+            return result
+
+    async def _timed(self, attempt):
+        started = time.perf_counter()
+        result = await attempt()
+        self.latencies.add(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, attempt):
+        delay = self.latencies.percentile(self.hedge_percentile)
+        primary = asyncio.ensure_future(self._timed(attempt))
+        if delay is None:
+            return await primary
+
+        tasks = {primary}
+        hedged = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedged = True
+                self._counts["hedges"] += 1
+                tasks.add(asyncio.ensure_future(self._timed(attempt)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedged:
+                            self._hedge_finished("primary" if task is primary else "hedge")
+                        return task.result()
+                    error = task.exception()
+            if hedged:
+                self._hedge_finished("none")
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_finished(self, winner):
+        HEDGES.inc(winner=winner)
+        if winner == "hedge":
+            self._counts["hedge_wins"] += 1
+
+    def stats(self):
+        return dict(self._counts, breaker=self.breaker.stats(),
+                    hedge_delay_ms=_ms(self.latencies.percentile(self.hedge_percentile)))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
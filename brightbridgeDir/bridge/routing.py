@@ -0,0 +1,95 @@
+"""
+Deterministic routing: skip the root orchestrator when agent_type is unambiguous
+"""
+import threading
+from collections import namedtuple
+
+from bridge.keywords import KeywordMatcher
+
+# Keyword signals per agent_type, mirroring BrightBridgeAgent.analyzeIntent on the
+# Node side (minus the catch-all 'support' and 'add'). Here they are matched on
+# word boundaries and used only to spot messages that carry signals for more
+# than one specialist.
+INTENT_KEYWORDS = {
+    'crisis': ['crisis', 'emergency', 'suicide', 'hurt myself', 'panic', 'overwhelmed', 'meltdown',
+               "can't cope", 'want to die', 'kill myself'],
+    'education': ['study', 'learn', 'school', 'homework', 'exam', 'test', 'academic', 'college',
+                  'university', 'assignment', 'learning', 'education'],
+    'therapy': ['anxious', 'stressed', 'depressed', 'sad', 'worried', 'emotional', 'feelings',
+                'mental health', 'therapy', 'counseling', 'anxiety', 'depression'],
+    'social': ['social', 'friends', 'communication', 'conversation', 'relationship', 'interact',
+               'awkward', 'shy', 'talking', 'people'],
+    'interview': ['interview', 'job', 'career', 'work', 'employment', 'professional', 'resume', 'cv',
+                  'workplace'],
+    'dailyLiving': ['routine', 'daily', 'organize', 'time management', 'independent', 'life skills',
+                    'chores', 'schedule', 'organization'],
+    'screening': ['adhd', 'autism', 'dyslexia', 'neurodivergent', 'diagnosis', 'condition',
+                  'understand myself', 'symptoms', 'autistic'],
+    'caregiver': ['family', 'parent', 'caregiver', 'help my child', 'my kid', 'my son', 'my daughter',
+                  'parenting'],
+}
+
+# Always sent straight to their specialist, whatever else the message mentions
+PINNED_AGENT_TYPES = {'crisis'}
+
+ORCHESTRATOR = "orchestrator"
+DIRECT = "direct"
+
+RouteDecision = namedtuple("RouteDecision", ["route", "agent_type", "reason"])
+
+
+class IntentRouter:
+    """Decides whether a request can skip the root agent's routing LLM call.
+
+    A request goes ``direct`` to the sub-agent for its ``agent_type`` when that
+    type is routable and the message has no keyword signals for any other
+    specialist; 'general', unknown and mixed-signal requests go to the
+    ``orchestrator``. Latency is recorded per route so the saving is visible.
+    """
+
+    def __init__(self, enabled=True, keywords=None):
+        self.enabled = enabled
+        self.keywords = keywords or INTENT_KEYWORDS
+        self._matcher = KeywordMatcher(self.keywords)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def signals(self, message):
+        """Set of agent_types whose keywords appear in ``message``"""
+        return self._matcher.labels(message)
+
+    def route(self, agent_type, message, override=None):
+        if override == ORCHESTRATOR:
+            return RouteDecision(ORCHESTRATOR, agent_type, "requested")
+        if agent_type not in self.keywords:
+            return RouteDecision(ORCHESTRATOR, agent_type, "general")
+        if override == DIRECT:
+            return RouteDecision(DIRECT, agent_type, "requested")
+        if not self.enabled:
+            return RouteDecision(ORCHESTRATOR, agent_type, "disabled")
+        if agent_type in PINNED_AGENT_TYPES:
+            return RouteDecision(DIRECT, agent_type, "pinned")
+
+        others = self.signals(message) - {agent_type}
+        if others:
+            return RouteDecision(ORCHESTRATOR, agent_type, "ambiguous")
+        return RouteDecision(DIRECT, agent_type, "unambiguous")
+
+    def record(self, decision, elapsed_ms):
+        key = f"{DIRECT}:{decision.agent_type}" if decision.route == DIRECT else ORCHESTRATOR
+        with self._lock:
+            stats = self._stats.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {
+                    "count": stats["count"],
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                }
+                for key, stats in self._stats.items()
+            }
@@ -0,0 +1,72 @@
+"""
+Data-driven enrichment rules for the mock bridge's replies
+"""
+import json
+import os
+from collections import namedtuple
+
+from bridge.keywords import KeywordMatcher
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "enrichment_rules.json")
+
+Rule = namedtuple("Rule", ["name", "priority", "keywords", "agent_types", "text", "exclusive"])
+
+
+def load_rules(path=None):
+    """Read a rule table: a JSON list of objects with at least ``name`` and ``text``"""
+    with open(path or DEFAULT_RULES_PATH, encoding="utf-8") as handle:
+        entries = json.load(handle)
+    return [
+        Rule(
+            name=entry["name"],
+            priority=int(entry.get("priority", 0)),
+            keywords=tuple(entry.get("keywords", ())),
+            agent_types=frozenset(entry.get("agent_types", ())),
+            text=entry["text"],
+            exclusive=bool(entry.get("exclusive", False)),
+        )
+        for entry in entries
+    ]
+
+
+class RuleEngine:
+    """Picks the enrichment blocks for a message.
+
+    A rule fires when the request's agent_type is in its ``agent_types`` or
+    any of its ``keywords`` appears in the message (prefix match, like the
+    substring checks this replaces). Fired rules are applied by descending
+    priority, then table order, up to ``max_matches``; an ``exclusive`` rule
+    stops any further blocks from being added after it.
+    """
+
+    def __init__(self, rules, max_matches=2):
+        self.rules = sorted(rules, key=lambda rule: -rule.priority)
+        self.max_matches = max_matches
+        self._order = {rule.name: index for index, rule in enumerate(self.rules)}
+        self._by_name = {rule.name: rule for rule in self.rules}
+        self._matcher = KeywordMatcher({rule.name: rule.keywords for rule in self.rules}, whole_words=False)
+        self._by_agent_type = {}
+        for rule in self.rules:
+            for agent_type in rule.agent_types:
+                self._by_agent_type.setdefault(agent_type, set()).add(rule.name)
+
+    @classmethod
+    def from_file(cls, path=None, max_matches=2):
+        return cls(load_rules(path), max_matches=max_matches)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match(self, message, agent_type=None):
+        """Rules that apply to this request, in the order their text is added"""
+        fired = self._matcher.labels(message) | self._by_agent_type.get(agent_type, set())
+        selected = []
+        for name in sorted(fired, key=self._order.__getitem__):
+            rule = self._by_name[name]
+            selected.append(rule)
+            if rule.exclusive or len(selected) >= self.max_matches:
+                break
+        return selected
+
+    def enrich(self, message, agent_type=None):
+        return "".join("\n\n" + rule.text for rule in self.match(message, agent_type))
@@ -0,0 +1,132 @@
+"""
+Bounded session store shared by every request a bridge process handles
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionManager:
+    """LRU + idle-TTL map from a client session key to its session object.
+
+    Entries are kept in least-recently-used order, so expired sessions are
+    always at the front and a sweep only touches what it evicts. The store is
+    agnostic about what it holds (an ADK ``Session``, a mock turn counter, ...);
+    ``on_evict`` is called with ``(key, value)`` whenever an entry is dropped.
+    """
+
+    def __init__(self, max_sessions=1000, idle_ttl=1800.0, on_evict=None, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return the live session for ``key`` (refreshing it) or None"""
+        with self._lock:
+            now = self.clock()
+            evicted = self._sweep(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                value = None
+            else:
+                self.hits += 1
+                entry[1] = now
+                self._entries.move_to_end(key)
+                value = entry[0]
+        self._notify(evicted)
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return ``(session, created)``, building a new one with ``factory()`` on a miss"""
+        with self._lock:
+            now = self.clock()
+            evicted = self._sweep(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                entry[1] = now
+                self._entries.move_to_end(key)
+                value, created = entry[0], False
+            else:
+                self.misses += 1
+                value, created = factory(), True
+                self._entries[key] = [value, now]
+                evicted.extend(self._trim())
+        self._notify(evicted)
+        return value, created
+
+    def put(self, key, value):
+        with self._lock:
+            now = self.clock()
+            evicted = self._sweep(now)
+            self._entries[key] = [value, now]
+            self._entries.move_to_end(key)
+            evicted.extend(self._trim())
+        self._notify(evicted)
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._notify([(key, entry[0])])
+
+    def sweep(self):
+        """Drop every session idle for longer than ``idle_ttl``; returns how many"""
+        with self._lock:
+            evicted = self._sweep(self.clock())
+        self._notify(evicted)
+        return len(evicted)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _sweep(self, now):
+        evicted = []
+        if not self.idle_ttl:
+            return evicted
+        while self._entries:
+            key, (value, last_used) = next(iter(self._entries.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _trim(self):
+        evicted = []
+        while self.max_sessions and len(self._entries) > self.max_sessions:
+            key, (value, _) = self._entries.popitem(last=False)
+            self.evictions += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _notify(self, evicted):
+        if self.on_evict is None:
+            return
+        for key, value in evicted:
+            self.on_evict(key, value)
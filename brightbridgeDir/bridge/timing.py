@@ -0,0 +1,95 @@
+"""
+Per-request timing spans
+"""
+import os
+import time
+
+
+class _Span:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.since(self.name, self.started)
+        return False
+
+
+class Timer:
+    """Named durations for one request, in milliseconds.
+
+    A name seen twice (e.g. two delegations to the same tool) accumulates.
+    ``total_ms`` runs from when the timer was created.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._spans = {}
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add(self, name, ms):
+        self._spans[name] = self._spans.get(name, 0.0) + ms
+
+    def since(self, name, started):
+        self.add(name, (time.perf_counter() - started) * 1000)
+
+    def as_dict(self):
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "spans": {name: round(ms, 2) for name, ms in self._spans.items()},
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTimer:
+    """Stand-in when timings are off: every call is a no-op"""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, name):
+        return self._span
+
+    def add(self, name, ms):
+        pass
+
+    def since(self, name, started):
+        pass
+
+    def as_dict(self):
+        return None
+
+
+NULL_TIMER = NullTimer()
+
+
+def process_age_ms():
+    """How long this process has existed (Linux only, 1/CLK_TCK resolution), else None"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Field 22, counted after the parenthesised command name
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            uptime_s = float(uptime.read().split()[0])
+        return max(uptime_s - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0) * 1000
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Pre-forking supervisor for agent_bridge.py
+
+Imports the bridge once (in production also Google ADK and every agent in
+the registry), then forks ``--workers`` bridge workers that share that warm
+state copy-on-write instead of each paying for it. Clients speak the same
+NDJSON contract as a single bridge, on stdin/stdout (--worker), a Unix
+socket or a TCP port, and every request is passed to one worker over a
+socketpair:
+
+- with ``--dispatch affinity`` (the default) requests carrying a
+  ``session_id`` always go to the same worker slot, so its sessions stay in
+  one process; while that slot's worker is being replaced they wait for the
+  new one rather than move. Everything else, and every request with
+  ``--dispatch least``, goes to the worker with the fewest outstanding
+  requests. ``least`` spreads one session over several workers, so it needs
+  BRIDGE_SESSION_DB: each worker then reloads the session when another has
+  written to it, where in-memory sessions would each go their own way
+- a worker that exits is restarted, and the requests it still held are
+  answered with an error result
+- a worker whose private memory grows past ``--max-worker-mb`` is replaced,
+  then answers what it already holds and exits
+- ``{"op": "stats"}`` reports each worker's load next to its own bridge stats
+
+    python bridge_supervisor.py --workers 4 --unix /tmp/brightbridge.sock
+"""
+import argparse
+import asyncio
+import atexit
+import itertools
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import agent_bridge as bridge
+from agent_bridge import MAX_REQUEST_LINE_BYTES, error_result, log_error, log_info
+
+DISPATCH_POLICIES = ("affinity", "least")
+
+# Progress lines a worker sends before a request's final result
+PROGRESS_EVENTS = {"chunk", "tool_start", "tool_end", "resources"}
+
+# A worker that dies sooner than this after starting is restarted after a pause
+MIN_WORKER_LIFETIME = 1.0
+
+# How long a session's request waits for its slot's replacement worker under affinity
+SLOT_WAIT_SECONDS = 10.0
+
+TROUBLE_REPLY = "I'm experiencing technical difficulties. Please try again in a moment."
+
+
+def warm_imports():
+    """Everything workers would otherwise each import and build, done once before forking"""
+    if bridge.DEVELOPMENT_MODE:
+        return
+    try:
+        from google.adk.sessions.in_memory_session_service import InMemorySessionService  # noqa: F401
+        import bridgebright.runner  # noqa: F401
+        from bridgebright.agent import SUB_AGENTS, get_root_agent, get_sub_agent
+        from bridgebright.registry import get_registry
+    except ImportError as e:
+        # Workers hit the same error and fall back to mock mode themselves
+        log_error(f"Google ADK not available, workers will use mock mode: {str(e)}")
+        return
+    started = time.perf_counter()
+    get_root_agent()
+    for agent_type in SUB_AGENTS:
+        # Both variants: routed to directly, and delegated to by the root agent
+        get_sub_agent(agent_type)
+        get_registry().agent(agent_type)
+    log_info("Agents built before forking", agents=2 * len(SUB_AGENTS) + 1,
+             ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def worker_memory(pid):
+    """``(rss_mb, private_mb)`` for a process, from /proc; None where that is unavailable.
+
+    Pages still shared copy-on-write with the supervisor count towards RSS
+    but not towards private memory, which is what the memory cap checks.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0])
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/statm") as handle:
+                return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, None
+        except (OSError, ValueError, IndexError):
+            return None, None
+    if "Rss" not in fields:
+        return None, None
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields["Rss"] / 1024, private / 1024
+
+
+class Worker:
+    """One forked bridge worker and the requests it has not answered yet"""
+
+    def __init__(self, slot, pid, sock, reader, writer):
+        self.slot = slot
+        self.pid = pid
+        self.sock = sock
+        self.reader = reader
+        self.send = bridge.stream_sender(writer)
+        self.writer = writer
+        self.started = time.monotonic()
+        # supervisor request id -> (client's id, client send callback, future for the final result)
+        self.pending = {}
+        self.dispatched = 0
+        self.completed = 0
+        self.failed = 0
+        self.retiring = False
+        # Set once EOF went to the worker: it takes no new requests after that
+        self.input_closed = False
+        self.rss_mb = None
+        self.private_mb = None
+
+    def close_input(self):
+        """Send EOF: the worker answers what it already received, then exits"""
+        if not self.input_closed and not self.writer.is_closing():
+            self.writer.write_eof()
+        self.input_closed = True
+
+    def load(self):
+        return {
+            "slot": self.slot,
+            "pid": self.pid,
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "outstanding": len(self.pending),
+            "dispatched": self.dispatched,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retiring": self.retiring,
+            "rss_mb": None if self.rss_mb is None else round(self.rss_mb, 1),
+            "private_mb": None if self.private_mb is None else round(self.private_mb, 1),
+        }
+
+
+class Supervisor:
+    """Forks, feeds, watches and replaces the bridge workers"""
+
+    def __init__(self, workers, dispatch="affinity", max_worker_mb=0, check_interval=1.0,
+                 max_concurrency=None, max_queue=bridge.MAX_QUEUE):
+        self.slots = [None] * workers
+        self.retiring = set()
+        self.dispatch = dispatch
+        self.max_worker_mb = max_worker_mb
+        self.check_interval = check_interval
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.stopping = False
+        self.restarts = 0
+        self.recycled = 0
+        self.lost_requests = 0
+        self.ids = itertools.count()
+        self.exited = set()
+        self.tasks = set()
+        # Notified whenever a slot gets a new worker (or the supervisor stops)
+        self.slot_filled = asyncio.Condition()
+        # Descriptors a forked worker must not keep open (listeners, client connections)
+        self.inherited_fds = set()
+
+    # Worker lifecycle
+
+    async def spawn(self, slot):
+        parent_sock, child_sock = socket.socketpair()
+        stop_signals = {signal.SIGTERM, signal.SIGINT}
+        # Held until the child has dropped the supervisor's signal handling
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                parent_sock.close()
+                self._run_child(child_sock, stop_signals)
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+        child_sock.close()
+
+        reader, writer = await asyncio.open_connection(sock=parent_sock, limit=MAX_REQUEST_LINE_BYTES)
+        worker = Worker(slot, pid, parent_sock, reader, writer)
+        await self.fill_slot(slot, worker)
+        self._track(asyncio.ensure_future(self._read_results(worker)))
+        log_info("Bridge worker started", slot=slot, pid=pid)
+        return worker
+
+    async def fill_slot(self, slot, worker):
+        async with self.slot_filled:
+            self.slots[slot] = worker
+            self.slot_filled.notify_all()
+
+    def _run_child(self, sock, stop_signals):
+        """Body of a forked worker: serve requests from ``sock``, then exit without returning"""
+        status = 0
+        try:
+            # The supervisor's loop owns the wakeup fd; the worker's loop installs its own
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            for fd in self.inherited_fds | {worker.sock.fileno() for worker in self.workers()}:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            # Results go over the socketpair; the client-facing stdio belongs to the supervisor
+            devnull = os.open(os.devnull, os.O_RDWR)
+            os.dup2(devnull, 0)
+            os.dup2(devnull, 1)
+            os.close(devnull)
+            # Forked from inside the supervisor's running loop (Python < 3.12 does not reset this)
+            asyncio.events._set_running_loop(None)
+            asyncio.run(serve_supervised(sock, self.max_concurrency, self.max_queue))
+        except BaseException as e:
+            log_error(f"Bridge worker error: {str(e)}")
+            status = 1
+        finally:
+            # os._exit skips atexit: flush logs and the session store here
+            atexit._run_exitfuncs()
+            os._exit(status)
+
+    def workers(self):
+        return [worker for worker in self.slots if worker is not None] + list(self.retiring)
+
+    async def _read_results(self, worker):
+        while True:
+            try:
+                line = await worker.reader.readline()
+            except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+                log_error(f"Bridge worker stream error: {str(e)}", pid=worker.pid)
+                break
+            if not line:
+                break
+            try:
+                result = json.loads(line)
+                entry = worker.pending.get(result.get("id"))
+            except (ValueError, AttributeError):
+                entry = None
+            if entry is None:
+                log_error("Unmatched result from bridge worker", pid=worker.pid)
+                continue
+
+            client_id, send, done = entry
+            final = result.get("event") not in PROGRESS_EVENTS
+            if final:
+                del worker.pending[result["id"]]
+                worker.completed += 1
+            if client_id is None:
+                del result["id"]
+            else:
+                result["id"] = client_id
+            try:
+                if send is not None:
+                    await send(result)
+            finally:
+                if final and not done.done():
+                    done.set_result(result)
+        self._worker_lost(worker)
+
+    def _worker_lost(self, worker):
+        """The worker's stream closed: fail what it still held and restart its slot"""
+        worker.writer.close()
+        self.exited.add(worker.pid)
+        self.retiring.discard(worker)
+        for key, (client_id, send, done) in list(worker.pending.items()):
+            worker.failed += 1
+            self.lost_requests += 1
+            result = error_result("Bridge worker exited", TROUBLE_REPLY, client_id)
+            if send is not None:
+                self._track(asyncio.ensure_future(send(result)))
+            if not done.done():
+                done.set_result(result)
+        worker.pending.clear()
+
+        if self.slots[worker.slot] is worker:
+            self.slots[worker.slot] = None
+            if not self.stopping:
+                log_error("Bridge worker exited, restarting", slot=worker.slot, pid=worker.pid)
+                self.restarts += 1
+                lived = time.monotonic() - worker.started
+                self._track(asyncio.ensure_future(self._respawn(worker.slot, lived < MIN_WORKER_LIFETIME)))
+
+    async def _respawn(self, slot, pause):
+        if pause:
+            # Crashing on startup: do not fork in a tight loop
+            await asyncio.sleep(MIN_WORKER_LIFETIME)
+        if not self.stopping and self.slots[slot] is None:
+            await self.spawn(slot)
+
+    async def _recycle(self, worker):
+        """Replace ``worker`` in its slot, then let it finish what it holds and exit"""
+        log_info("Bridge worker over memory cap, replacing", slot=worker.slot, pid=worker.pid,
+                 private_mb=round(worker.private_mb or worker.rss_mb, 1))
+        self.recycled += 1
+        worker.retiring = True
+        self.retiring.add(worker)
+        self.slots[worker.slot] = None
+        await self.spawn(worker.slot)
+        # EOF rather than SIGTERM, so requests still buffered in the socket are read and answered
+        worker.close_input()
+
+    def _reap(self):
+        for pid in list(self.exited):
+            try:
+                reaped, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                reaped = pid
+            if reaped:
+                self.exited.discard(pid)
+
+    async def monitor(self):
+        """Reap exited workers, sample memory and recycle workers over the cap"""
+        while not self.stopping:
+            self._reap()
+            for worker in self.workers():
+                worker.rss_mb, worker.private_mb = worker_memory(worker.pid)
+                used = worker.private_mb if worker.private_mb is not None else worker.rss_mb
+                if (self.max_worker_mb and used is not None and used > self.max_worker_mb
+                        and not worker.retiring and self.slots[worker.slot] is worker):
+                    await self._recycle(worker)
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self):
+        for slot in range(len(self.slots)):
+            await self.spawn(slot)
+        self._track(asyncio.ensure_future(self.monitor()))
+
+    async def stop(self, grace=30.0):
+        """Close every worker's input (each drains its requests and exits), then wait for them"""
+        self.stopping = True
+        async with self.slot_filled:
+            self.slot_filled.notify_all()
+        for worker in self.workers():
+            worker.close_input()
+        deadline = time.monotonic() + grace
+        while self.workers() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for worker in self.workers():
+            log_error("Bridge worker did not stop in time, killing it", pid=worker.pid)
+            os.kill(worker.pid, signal.SIGKILL)
+        while self.workers():
+            await asyncio.sleep(0.05)
+        self._reap()
+        for task in self.tasks:
+            task.cancel()
+
+    def _track(self, task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    # Dispatch
+
+    async def pick(self, request):
+        """The worker for ``request``: its session's slot under affinity, else the least loaded.
+
+        A session's slot can be empty while its worker is restarted or
+        recycled. The request then waits up to SLOT_WAIT_SECONDS for the
+        replacement instead of moving to another worker, which would hold a
+        different copy of the session. None when no worker is available.
+        """
+        session_id = request.get("session_id")
+        if self.dispatch == "affinity" and session_id:
+            key = f"{request.get('user_name') or 'user'}\0{session_id}"
+            slot = zlib.crc32(key.encode()) % len(self.slots)
+            async with self.slot_filled:
+                try:
+                    await asyncio.wait_for(
+                        self.slot_filled.wait_for(lambda: self.slots[slot] is not None or self.stopping),
+                        SLOT_WAIT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                return self.slots[slot]
+        live = [worker for worker in self.slots if worker is not None]
+        if not live:
+            return None
+        return min(live, key=lambda worker: (len(worker.pending), worker.dispatched))
+
+    async def submit(self, worker, request, send=None):
+        """Send ``request`` to ``worker``; progress goes to ``send`` and the final result is returned.
+
+        A worker whose input is already closed (retiring, stopping, or gone)
+        gets nothing, and the request is answered with an error instead.
+        """
+        if worker.input_closed or worker.writer.is_closing():
+            return await self._refuse(request, send)
+        key = f"s{next(self.ids)}"
+        done = asyncio.get_running_loop().create_future()
+        worker.pending[key] = (request.get("id"), send, done)
+        worker.dispatched += 1
+        try:
+            await worker.send(dict(request, id=key))
+        except (ConnectionError, RuntimeError) as e:
+            log_error(f"Could not send to bridge worker: {str(e)}", pid=worker.pid)
+            if worker.pending.pop(key, None) is None:
+                # The worker was lost meanwhile and has answered it already
+                return await done
+            worker.failed += 1
+            return await self._refuse(request, send)
+        return await done
+
+    async def _refuse(self, request, send):
+        result = error_result("No bridge worker available", TROUBLE_REPLY, request.get("id"))
+        if send is not None:
+            await send(result)
+        return result
+
+    async def handle_line(self, line, send):
+        """``pump_requests`` handler: answer ping/stats here and pass everything else to a worker"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            log_error(f"JSON decode error: {str(e)}")
+            await send(error_result(
+                f"Invalid JSON input: {str(e)}",
+                "I'm sorry, there was a communication error. Please try again."
+            ))
+            return
+
+        op = request.get("op", "chat")
+        if op == "ping":
+            await send(self.ping(request.get("id")))
+        elif op == "stats":
+            await send(await self.stats(request.get("id")))
+        else:
+            worker = await self.pick(request)
+            if worker is None:
+                await send(error_result("No bridge worker available", TROUBLE_REPLY, request.get("id")))
+            else:
+                await self.submit(worker, request, send)
+
+    def ping(self, request_id=None):
+        result = {
+            "success": True,
+            "op": "ping",
+            "mode": "development" if bridge.DEVELOPMENT_MODE else "production",
+            "workers": sum(worker is not None for worker in self.slots),
+        }
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+    async def stats(self, request_id=None):
+        """Per-worker load from the supervisor, each live worker with its own ``stats`` result.
+
+        Retiring workers no longer read requests, so they are listed with
+        ``"stats": null``.
+        """
+        live = [worker for worker in self.slots if worker is not None]
+        answers = await asyncio.gather(*(self.submit(worker, {"op": "stats"}) for worker in live))
+        loads = []
+        for worker, answer in zip(live, answers):
+            load = worker.load()
+            load["stats"] = answer.get("stats")
+            loads.append(load)
+        for worker in list(self.retiring):
+            loads.append(dict(worker.load(), stats=None))
+        result = {
+            "success": True,
+            "op": "stats",
+            "mode": next((answer["mode"] for answer in answers if "mode" in answer),
+                         "development" if bridge.DEVELOPMENT_MODE else "production"),
+            "supervisor": {
+                "pid": os.getpid(),
+                "workers": len(self.slots),
+                "dispatch": self.dispatch,
+                "restarts": self.restarts,
+                "recycled": self.recycled,
+                "lost_requests": self.lost_requests,
+                "max_worker_mb": self.max_worker_mb or None,
+            },
+            "workers": loads,
+        }
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+
+async def serve_supervised(sock, max_concurrency=None, max_queue=bridge.MAX_QUEUE):
+    """Worker side: NDJSON requests from the supervisor on ``sock`` until EOF or SIGTERM"""
+    bridge.get_bridge()
+    stopping = asyncio.Event()
+    bridge.install_stop_handlers(stopping)
+    bridge.configure_admission(max_concurrency, max_queue)
+    reader, writer = await asyncio.open_connection(sock=sock, limit=MAX_REQUEST_LINE_BYTES)
+    try:
+        await bridge.pump_requests(reader, bridge.stream_sender(writer), stopping)
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    """Fork the workers, then serve clients on stdin or a socket until EOF or SIGTERM/SIGINT"""
+    log_info(f"Starting bridge supervisor with {args.workers} worker(s)...")
+    if args.dispatch == "least" and args.workers > 1 and not bridge.SESSION_DB:
+        log_error("--dispatch least without BRIDGE_SESSION_DB: each worker keeps its own copy of a session")
+    warm_imports()
+    supervisor = Supervisor(
+        args.workers,
+        dispatch=args.dispatch,
+        max_worker_mb=args.max_worker_mb,
+        check_interval=args.check_interval,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+    )
+    stopping = asyncio.Event()
+    bridge.install_stop_handlers(stopping)
+    await supervisor.start()
+
+    try:
+        if args.unix or args.port is not None:
+            connections = set()
+
+            async def on_connection(reader, writer):
+                connections.add(asyncio.current_task())
+                fd = writer.get_extra_info("socket").fileno()
+                supervisor.inherited_fds.add(fd)
+                try:
+                    await bridge.pump_requests(
+                        reader, bridge.stream_sender(writer), stopping, args.max_pipeline, supervisor.handle_line)
+                finally:
+                    supervisor.inherited_fds.discard(fd)
+                    writer.close()
+                    try:
+                        await writer.wait_closed()
+                    except ConnectionError:
+                        pass
+                    connections.discard(asyncio.current_task())
+
+            server = await bridge.start_listener(on_connection, args.unix, args.host, args.port)
+            supervisor.inherited_fds.update(listener.fileno() for listener in server.sockets)
+            try:
+                await stopping.wait()
+            finally:
+                log_info("Shutting down supervisor...")
+                await bridge.close_listener(server, connections, args.unix)
+        else:
+            reader = await bridge.open_stdin_reader()
+
+            async def send(result):
+                bridge.write_result(result)
+
+            await bridge.pump_requests(reader, send, stopping, handler=supervisor.handle_line)
+    finally:
+        await supervisor.stop()
+    log_info("Bridge supervisor stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-forked pool of BrightBridge agent bridge workers")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--worker",
+        action="store_true",
+        help="serve newline-delimited JSON requests on stdin until EOF (the default)"
+    )
+    mode.add_argument("--unix", metavar="PATH", help="serve newline-delimited JSON requests on a Unix domain socket")
+    mode.add_argument("--port", type=int, help="serve newline-delimited JSON requests on a TCP port")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP bind address for --port (default: 127.0.0.1)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv('BRIDGE_WORKERS', '0')) or os.cpu_count() or 1,
+        help="worker processes to fork (env BRIDGE_WORKERS, default: one per CPU)"
+    )
+    parser.add_argument(
+        "--dispatch",
+        choices=DISPATCH_POLICIES,
+        default=os.getenv('BRIDGE_DISPATCH', 'affinity'),
+        help="affinity: keep each session on one worker, least-outstanding otherwise; "
+             "least: always the least-outstanding worker, needs BRIDGE_SESSION_DB for sessions "
+             "(env BRIDGE_DISPATCH, default: affinity)"
+    )
+    parser.add_argument(
+        "--max-worker-mb",
+        type=float,
+        default=float(os.getenv('BRIDGE_WORKER_MAX_MB', '0')),
+        help="replace a worker once its private memory passes this many MB (env BRIDGE_WORKER_MAX_MB, 0 = no cap)"
+    )
+    parser.add_argument(
+        "--check-interval",
+        type=float,
+        default=1.0,
+        help="seconds between worker memory checks (default: 1)"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.getenv('BRIDGE_MAX_CONCURRENCY', '0')) or None,
+        help="most requests each worker processes at once (env BRIDGE_MAX_CONCURRENCY)"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=bridge.MAX_QUEUE,
+        help="chats allowed to wait in each worker before new ones are shed (env BRIDGE_MAX_QUEUE, default 64)"
+    )
+    parser.add_argument(
+        "--max-pipeline",
+        type=int,
+        default=32,
+        help="most in-flight requests per socket connection before reading pauses (default: 32)"
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(args))
+    except Exception as e:
+        log_error(f"Supervisor error: {str(e)}")
+        sys.exit(1)
@@ -1 +1,8 @@
-from . import agent
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # Importing ``agent`` loads the agent registry, so only do it when it is asked for
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
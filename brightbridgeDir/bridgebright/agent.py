@@ -6,58 +6,34 @@
 #
 # ------------------
 #
-import random
-import os
-from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
-
-
-# Import sub-agents
-from .sub_agents.educator_agent.agent import educator_agent
-from .sub_agents.therapist_agent.agent import therapist_agent
-from .sub_agents.caregiver_agent.agent import caregiver_agent
-from .sub_agents.social_skills_agent.agent import social_skills_agent
-from .sub_agents.daily_living_agent.agent import daily_living_agent
-from .sub_agents.crisis_support_agent.agent import crisis_support_agent
-from .sub_agents.interview_skills_agent.agent import interview_skills_agent
-from .sub_agents.screening_agent.agent import screening_agent
-
-root_agent=Agent(
-    name="bridgebright",
-    description="A manager/orchestrator that communicates with the user and other agents",
-    model="gemini-2.0-flash",
-    instruction="""
-        You are the manager and user responsive agent for a neurodivergent user helper programme.
-        Your job is to have conversation with the user and identify key characteristics on how they are feeling.
-        You will manage and delegate specific tasks to the tools as per your intelligence.
-        If possible, always use the tools.
-        
-        Tools to be used:
-        - google_search: Use this tool when user asks for information that is not available in your knowledge base.
-        - caregiver_agent: Delegate when user needs support for family/caregiver guidance, understanding neurodivergent behaviors, communication strategies, or home environment support
-        - therapist_agent: Delegate when user needs mental health support, emotional regulation, coping strategies, anxiety/stress management, or therapeutic techniques
-        - educator_agent: Delegate when user needs learning strategies, study techniques, academic support, time management, or educational accommodations
-        - social_skills_agent: Delegate when user needs help with communication, social interaction, relationship building, social anxiety, or understanding social cues
-        - daily_living_agent: Delegate when user needs life skills support, daily routines, independent living, executive functioning, or workplace accommodations
-        - crisis_support_agent: Delegate when user is in crisis, experiencing overwhelming emotions, panic attacks, meltdowns, or needs immediate intervention
-        - interview_skills_agent: Delegate when user needs help with job interviews, communication skills, confidence building, or professional development
-        - screening_agent: Delegate when user wants to understand potential neurodivergent conditions, needs educational information about ADHD, autism, dyslexia, etc., or guidance on seeking professional evaluation
-        
-        IMPORTANT: Sub-agents ONLY respond to you, not directly to the user. You must relay their responses to the user in a natural, conversational way.
-        Never mention that you are consulting or delegating to sub-agents in your responses to the user.
-        You should make the user feel fine, don't use technical terms like (Consulting this agent).
-        If it takes time of greater than 5-6s, say that you are generating the response in proper manner.
-        
-        Always maintain a warm, empathetic tone and ensure the user feels supported and understood.
-    """,
-    tools=[AgentTool(educator_agent),
-                AgentTool(therapist_agent),
-                AgentTool(caregiver_agent),
-                AgentTool(social_skills_agent),
-                AgentTool(daily_living_agent),
-                AgentTool(crisis_support_agent),
-                AgentTool(interview_skills_agent),
-                AgentTool(screening_agent)
-                
-                ]
-)
\ No newline at end of file
+"""
+Entry points for the root agent and its sub-agents, all built from the registry
+
+The agents themselves are declared in agents.json (see registry.py) and are
+only constructed on first use.
+"""
+from .registry import get_registry
+
+_registry = get_registry()
+
+# agent_type (as sent by the Node server) -> AgentSpec
+SUB_AGENTS = _registry.specs
+
+ROOT_AGENT_NAME = _registry.root.name
+
+
+def get_sub_agent(agent_type):
+    """Build (once) only the sub-agent serving ``agent_type``, instructed to answer the user directly"""
+    return _registry.direct_agent(agent_type)
+
+
+def get_root_agent():
+    """Build the root agent on first use and cache it; its sub-agents are built on first delegation"""
+    return _registry.root_agent()
+
+
+def __getattr__(name):
+    # Keeps ``from bridgebright.agent import root_agent`` (and ``adk web``) working
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
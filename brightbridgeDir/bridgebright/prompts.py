@@ -0,0 +1,36 @@
+"""
+Instruction composition for the root agent's sub-agents
+
+Every sub-agent instruction is the registry's ``specialist_prefix`` (or, for
+requests routed to it directly, ``specialist_direct_prefix``), byte for
+byte, followed by that agent's own section (role, expertise, approach).
+Keeping the shared rules first and identical, with no per-agent words or
+indentation in them, lets provider-side prompt caching reuse the prefix
+across agents and turns; only the short suffix differs. This module does
+not import ADK, so the prompts can be measured (benchmarks/prompt_tokens.py)
+without it.
+"""
+
+
+def _section(title, items):
+    return title + ":\n" + "".join(f"- {item}\n" for item in items)
+
+
+def specialist_suffix(entry):
+    """The agent-specific part of an instruction, from a registry entry.
+
+    An entry either spells out its ``instruction`` or gives a ``role`` line
+    plus ``expertise`` and ``approach`` bullet lists.
+    """
+    if "instruction" in entry:
+        return entry["instruction"]
+    return (
+        entry["role"] + "\n"
+        + _section("SPECIFIC AREAS OF EXPERTISE", entry.get("expertise", ()))
+        + _section("APPROACH", entry.get("approach", ()))
+    )
+
+
+def specialist_instruction(prefix, entry):
+    """Full sub-agent instruction: the shared prefix, then the entry's own section"""
+    return prefix + specialist_suffix(entry)
@@ -0,0 +1,164 @@
+"""
+Config-driven agent registry
+
+The root agent and its sub-agents (names, models, descriptions and
+instructions) are declared in agents.json, or the file named by
+BRIDGE_AGENTS_CONFIG. Each sub-agent comes in two variants: the one the root
+agent delegates to (``specialist_prefix``: answer the root agent) and the
+one requests are routed to directly (``specialist_direct_prefix``: answer
+the user). Nothing is built up front: a variant's ``Agent`` is constructed
+the first time it is used. The root agent's tools declare themselves from
+the config and only build their agent on first call. Loading the registry
+does not import ADK.
+"""
+import functools
+import json
+import os
+import threading
+from collections import namedtuple
+
+from .prompts import specialist_instruction
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents.json")
+
+AgentSpec = namedtuple("AgentSpec", ["agent_type", "name", "model", "description", "instruction"])
+
+
+def load_config(path=None):
+    with open(path or DEFAULT_CONFIG_PATH, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class AgentRegistry:
+    """Agent specs by ``agent_type`` plus the root spec, with build-once caching"""
+
+    def __init__(self, config):
+        prefix = config.get("specialist_prefix", "")
+        direct_prefix = config.get("specialist_direct_prefix", prefix)
+        root = config["root"]
+        self.root = AgentSpec(None, root["name"], root["model"], root.get("description", ""), root["instruction"])
+        self.specs = self._specialist_specs(config, prefix)
+        self.direct_specs = self._specialist_specs(config, direct_prefix)
+        self._lock = threading.Lock()
+        self._agents = {}
+        self._direct_agents = {}
+        self._root_agent = None
+
+    @staticmethod
+    def _specialist_specs(config, prefix):
+        root_model = config["root"]["model"]
+        return {
+            agent_type: AgentSpec(
+                agent_type,
+                entry["name"],
+                entry.get("model", root_model),
+                entry.get("description", ""),
+                specialist_instruction(prefix, entry),
+            )
+            for agent_type, entry in config["agents"].items()
+        }
+
+    @classmethod
+    def from_file(cls, path=None):
+        return cls(load_config(path))
+
+    def __contains__(self, agent_type):
+        return agent_type in self.specs
+
+    def __len__(self):
+        return len(self.specs)
+
+    def agent(self, agent_type):
+        """The sub-agent serving ``agent_type`` for the root agent, built on first use"""
+        with self._lock:
+            agent = self._agents.get(agent_type)
+            if agent is None:
+                agent = self._agents[agent_type] = _build_agent(self.specs[agent_type])
+            return agent
+
+    def direct_agent(self, agent_type):
+        """The sub-agent serving ``agent_type`` when a request is routed straight to it, built on first use"""
+        with self._lock:
+            agent = self._direct_agents.get(agent_type)
+            if agent is None:
+                agent = self._direct_agents[agent_type] = _build_agent(self.direct_specs[agent_type])
+            return agent
+
+    def root_agent(self):
+        """The root agent, with a lazily built tool per sub-agent"""
+        with self._lock:
+            if self._root_agent is None:
+                tools = [_lazy_tool_class()(self, spec) for spec in self.specs.values()]
+                self._root_agent = _build_agent(self.root, tools=tools)
+            return self._root_agent
+
+    def stats(self):
+        with self._lock:
+            return {
+                "agents": len(self.specs),
+                "built": sorted(self._agents),
+                "direct_built": sorted(self._direct_agents),
+                "root_built": self._root_agent is not None,
+            }
+
+
+def _build_agent(spec, tools=()):
+    from google.adk.agents import Agent
+    return Agent(
+        name=spec.name,
+        description=spec.description,
+        model=spec.model,
+        instruction=spec.instruction,
+        tools=list(tools),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_tool_class():
+    """Defined on first use so importing the registry does not import ADK"""
+    from google.adk.tools.agent_tool import AgentTool
+
+    class LazyAgentTool(AgentTool):
+        """An ``AgentTool`` whose agent is a placeholder until the tool is first called.
+
+        The placeholder carries the spec's name and description and no
+        schemas, so ADK builds the same declaration it would for the real
+        sub-agent: the root agent's prompt does not change once it is built.
+        """
+
+        def __init__(self, registry, spec):
+            super().__init__(_AgentPlaceholder(spec))
+            self.registry = registry
+            self.agent_type = spec.agent_type
+
+        async def run_async(self, *, args, tool_context):
+            if isinstance(self.agent, _AgentPlaceholder):
+                self.agent = self.registry.agent(self.agent_type)
+            return await super().run_async(args=args, tool_context=tool_context)
+
+    return LazyAgentTool
+
+
+class _AgentPlaceholder:
+    """Just enough of an agent for ``AgentTool`` to declare it"""
+
+    sub_agents = ()
+    input_schema = None
+    output_schema = None
+
+    def __init__(self, spec):
+        self.name = spec.name
+        self.description = spec.description
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The process-wide registry, loaded from BRIDGE_AGENTS_CONFIG (or agents.json) once"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry.from_file(os.getenv("BRIDGE_AGENTS_CONFIG") or None)
+        return _registry
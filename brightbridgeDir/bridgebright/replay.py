@@ -0,0 +1,208 @@
+"""
+Record and replay agent event streams
+
+With BRIDGE_RECORD_DIR set, every agent run the bridge makes is captured:
+the agent, the user's message, the streaming mode, and each event ADK
+yielded with its offset from the start of the run (plus the error, when the
+run failed). A run is one JSON line appended to ``events-<pid>.jsonl.gz`` as
+its own gzip member, so a crash loses at most the run being written and
+forked workers never share a file.
+
+With BRIDGE_REPLAY_DIR set, recordings stand in for the model. A run whose
+agent and message were recorded gets that recording back; any other run
+gets one of the agent's recordings, picked by a stable hash of the message.
+Events are yielded at their recorded offsets divided by BRIDGE_REPLAY_SPEED
+(0 = no waiting) and recorded failures are raised again, so routing,
+sessions, delegation events and retries all run as in production, with no
+network.
+"""
+import asyncio
+import functools
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from google.adk.events import Event
+
+FORMAT_VERSION = 1
+
+
+def content_text(content):
+    """Concatenated text parts of a ``Content`` ("" when it has none)"""
+    if content is None or not getattr(content, "parts", None):
+        return ""
+    return "".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+class EventRecorder:
+    """Passes an agent's events through unchanged while writing each run to ``directory``"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.bytes_written = 0
+
+    @property
+    def path(self):
+        # Looked up per write: workers forked by bridge_supervisor.py get their own file
+        return os.path.join(self.directory, f"events-{os.getpid()}.jsonl.gz")
+
+    async def run(self, agent, context):
+        """``agent.run_async(context)``, recorded"""
+        started = time.perf_counter()
+        streaming_mode = getattr(context.run_config, "streaming_mode", None)
+        record = {
+            "v": FORMAT_VERSION,
+            "agent": agent.name,
+            "message": content_text(context.user_content),
+            "streaming": getattr(streaming_mode, "value", streaming_mode),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "events": [],
+        }
+        finished = False
+        try:
+            async for event in agent.run_async(context):
+                record["events"].append({
+                    "t_ms": _elapsed_ms(started),
+                    "event": event.model_dump(mode="json", exclude_none=True, by_alias=True),
+                })
+                yield event
+            finished = True
+        except Exception as e:
+            record["error"] = {
+                "t_ms": _elapsed_ms(started),
+                "type": type(e).__name__,
+                "message": str(e),
+                "code": getattr(e, "code", None) or getattr(e, "status_code", None),
+                "status": getattr(e, "status", None),
+            }
+            finished = True
+            raise
+        finally:
+            # A cancelled or abandoned run has no honest ending to replay
+            if finished:
+                record["duration_ms"] = _elapsed_ms(started)
+                self.write(record)
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        member = gzip.compress(line.encode("utf-8"))
+        with self._lock:
+            with open(self.path, "ab") as handle:
+                handle.write(member)
+            self.recorded += 1
+            self.bytes_written += len(member)
+
+    def stats(self):
+        return {"directory": self.directory, "recorded": self.recorded, "bytes_written": self.bytes_written}
+
+
+def read_records(directory):
+    """Every recorded run in ``directory``; a torn last write ends its file early"""
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl.gz"))):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+        except (EOFError, OSError, ValueError):
+            continue
+
+
+class ReplayedError(Exception):
+    """A recorded run's failure, raised again on replay"""
+
+
+@functools.lru_cache(maxsize=None)
+def _error_class(name):
+    # Keeps the original class name, which is_transient() looks at
+    return type(name, (ReplayedError,), {})
+
+
+def replayed_error(error):
+    exception = _error_class(error.get("type") or "ReplayedError")(error.get("message", ""))
+    exception.code = error.get("code")
+    exception.status = error.get("status")
+    return exception
+
+
+class EventReplayer:
+    """Serves recorded runs in place of ``agent.run_async``"""
+
+    def __init__(self, records, speed=1.0):
+        self.speed = speed
+        self.by_message = {}
+        self.by_agent = {}
+        for record in records:
+            self.by_message[(record["agent"], record["message"])] = record
+            self.by_agent.setdefault(record["agent"], []).append(record)
+        self.exact = 0
+        self.fallback = 0
+        self.missing = 0
+
+    @classmethod
+    def from_directory(cls, directory, speed=1.0):
+        return cls(read_records(directory), speed)
+
+    def __len__(self):
+        return sum(len(records) for records in self.by_agent.values())
+
+    def pick(self, agent_name, message):
+        """The recording of this exact run, else a stable pick among the agent's, else None"""
+        record = self.by_message.get((agent_name, message))
+        if record is not None:
+            self.exact += 1
+            return record
+        candidates = self.by_agent.get(agent_name)
+        if not candidates:
+            self.missing += 1
+            return None
+        self.fallback += 1
+        return candidates[zlib.crc32(message.encode("utf-8")) % len(candidates)]
+
+    async def _wait_until(self, started, t_ms):
+        if self.speed <= 0:
+            await asyncio.sleep(0)
+            return
+        delay = started + t_ms / 1000 / self.speed - time.perf_counter()
+        await asyncio.sleep(max(delay, 0))
+
+    async def run(self, agent, context):
+        """Replay a recorded run as if ``agent.run_async(context)`` had produced it"""
+        record = self.pick(agent.name, content_text(context.user_content))
+        if record is None:
+            raise LookupError(f"No recorded runs for agent {agent.name}")
+
+        started = time.perf_counter()
+        for item in record["events"]:
+            await self._wait_until(started, item["t_ms"])
+            event = Event.model_validate(item["event"])
+            # Fresh identity, so the session sees a new turn rather than a copy of an old one
+            event.invocation_id = context.invocation_id
+            event.id = Event.new_id()
+            event.timestamp = time.time()
+            yield event
+        error = record.get("error")
+        if error:
+            await self._wait_until(started, error["t_ms"])
+            raise replayed_error(error)
+
+    def stats(self):
+        return {
+            "recordings": len(self),
+            "speed": self.speed,
+            "exact": self.exact,
+            "fallback": self.fallback,
+            "missing": self.missing,
+        }
@@ -0,0 +1,248 @@
+"""
+Helpers for running the root agent against a reusable ADK session.
+
+Shared by agent_bridge.py and the Streamlit app so both keep conversation
+state the same way the ADK Runner does: the user's message and every final
+event are appended to the session, and the next turn's model call sees them.
+"""
+import inspect
+import time
+import uuid
+
+from google.adk.agents.invocation_context import InvocationContext, new_invocation_context_id
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.sessions.session import Session
+from google.genai.types import ModelContent, UserContent
+
+from bridge.history import SUMMARY_PREFIX, SUMMARY_ROLE, CompactedHistory, estimate_tokens
+from bridge.metrics import REGISTRY
+from bridge.timing import NULL_TIMER
+
+APP_NAME = "brightbridge"
+
+DELEGATIONS = REGISTRY.counter(
+    "bridge_delegations_total", "Sub-agent (AgentTool) calls made while running an agent", ("tool",))
+DELEGATION_SECONDS = REGISTRY.histogram(
+    "bridge_delegation_duration_seconds", "Time from a sub-agent call to its result", ("tool",))
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "bridge_agent_run_duration_seconds", "Duration of one agent turn", ("agent", "outcome"))
+
+
+def new_session(user_id, session_id=None):
+    """Create an empty ADK session (not registered with any session service)"""
+    return Session(
+        id=session_id or str(uuid.uuid4()),
+        app_name=APP_NAME,
+        user_id=user_id or "user",
+        state={},
+        events=[],
+        last_update_time=time.time(),
+    )
+
+
+async def append_event(session_service, session, event):
+    """Append ``event`` to ``session``; works with sync and async session services"""
+    result = session_service.append_event(session=session, event=event)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def seed_history(session_service, session, conversation_history, agent_name):
+    """Load a client-side transcript ({"role", "content"} dicts) into a new session.
+
+    Anything that is not a user turn (assistant replies, a compaction summary)
+    is recorded as the agent's own content.
+    """
+    invocation_id = new_invocation_context_id()
+    for turn in conversation_history or []:
+        text = (turn or {}).get("content")
+        if not text:
+            continue
+        if turn.get("role") == "user":
+            event = Event(invocation_id=invocation_id, author="user", content=UserContent(text))
+        else:
+            event = Event(invocation_id=invocation_id, author=agent_name, content=ModelContent(text))
+        await append_event(session_service, session, event)
+
+
+def event_tokens(event):
+    """Estimated prompt tokens an event adds to later turns (text and tool results)"""
+    tokens = estimate_tokens(event_text(event))
+    for response in function_responses(event):
+        tokens += estimate_tokens(str(getattr(response, "response", "") or ""))
+    return tokens
+
+
+async def compact_session(session_service, session, compactor, agent_name):
+    """Fold old turns of a long-lived session into one summary event.
+
+    The last ``compactor.keep_turns`` text turns (with any tool events between
+    them) are kept as they are; everything before is replaced by a single
+    summary event that later compactions extend. A session service with
+    ``replace_events`` (the SQLite one) stores the compacted history too.
+    Returns None when the session is already within budget.
+    """
+    events = session.events
+    turns, owners = [], []
+    for index, event in enumerate(events):
+        text = event_text(event)
+        if not text or getattr(event, "partial", False):
+            continue
+        if event.author == "user":
+            role = "user"
+        elif text.startswith(SUMMARY_PREFIX):
+            role = SUMMARY_ROLE
+        else:
+            role = "assistant"
+        turns.append({"role": role, "content": text})
+        owners.append(index)
+
+    tokens_before = sum(event_tokens(event) for event in events)
+    if not compactor.needs_compaction(turns) and tokens_before <= compactor.token_budget:
+        return None
+
+    compacted = compactor.compact(turns)
+    kept = [turn for turn in compacted.turns if turn["role"] != SUMMARY_ROLE]
+    first_kept = owners[len(owners) - len(kept)] if kept else len(events)
+
+    new_events = []
+    if len(kept) < len(compacted.turns):
+        new_events.append(Event(
+            invocation_id=new_invocation_context_id(),
+            author=agent_name,
+            content=ModelContent(compacted.turns[0]["content"]),
+        ))
+    new_events.extend(events[first_kept:])
+    session.events[:] = new_events
+    replace_events = getattr(session_service, "replace_events", None)
+    if replace_events is not None:
+        replace_events(session, new_events)
+
+    return CompactedHistory(
+        compacted.turns,
+        tokens_before,
+        sum(event_tokens(event) for event in new_events),
+        compacted.turns_summarized,
+    )
+
+
+async def run_agent(agent, session_service, session, message, run_config=None, timer=NULL_TIMER, event_source=None):
+    """Run one user turn on ``session`` and yield every event the agent produces.
+
+    ``event_source(agent, context)`` replaces ``agent.run_async(context)`` when
+    given, e.g. to record or replay the run (see replay.py).
+    """
+    started = time.perf_counter()
+    invocation_id = new_invocation_context_id()
+    user_content = UserContent(message)
+    await append_event(
+        session_service,
+        session,
+        Event(invocation_id=invocation_id, author="user", content=user_content),
+    )
+
+    context = InvocationContext(
+        session_service=session_service,
+        invocation_id=invocation_id,
+        agent=agent,
+        user_content=user_content,
+        session=session,
+        # Some ADK versions leave run_config unset (None) and then fail reading it
+        run_config=run_config or RunConfig(),
+    )
+    timer.since("invocation_context", started)
+
+    started = time.perf_counter()
+    first = True
+    events = event_source(agent, context) if event_source is not None else agent.run_async(context)
+    async for event in events:
+        if first:
+            timer.since("first_event", started)
+            first = False
+        if not getattr(event, "partial", False):
+            await append_event(session_service, session, event)
+        yield event
+
+
+async def stream_turn(agent, session_service, session, message, partial_text=True, timer=NULL_TIMER,
+                      event_source=None):
+    """Run one user turn and translate its events into the bridge's stream protocol.
+
+    Yields ``{"event": "chunk", "text": ...}`` as text arrives (deltas when
+    ``partial_text`` turns on SSE streaming), ``tool_start``/``tool_end`` around
+    each sub-agent delegation, and last ``{"event": "final", "response": ...}``
+    holding the final reply text ("" when the agent produced none). Each
+    delegation's duration goes to ``timer`` as ``delegate:<tool>`` and to the
+    delegation metrics; the whole turn is observed per agent. ``event_source``
+    is passed on to ``run_agent``.
+    """
+    response = ""
+    streamed_partial = False
+    run_config = streaming_run_config() if partial_text else None
+    delegations = {}
+    started = time.perf_counter()
+
+    try:
+        async for event in run_agent(agent, session_service, session, message, run_config, timer, event_source):
+            for tool in function_call_names(event):
+                DELEGATIONS.inc(tool=tool)
+                delegations[tool] = time.perf_counter()
+                yield {"event": "tool_start", "tool": tool}
+            for tool in function_response_names(event):
+                if tool in delegations:
+                    delegation_started = delegations.pop(tool)
+                    DELEGATION_SECONDS.observe(time.perf_counter() - delegation_started, tool=tool)
+                    timer.since(f"delegate:{tool}", delegation_started)
+                yield {"event": "tool_end", "tool": tool}
+
+            text = event_text(event)
+            if getattr(event, "partial", False):
+                if text:
+                    streamed_partial = True
+                    yield {"event": "chunk", "text": text}
+                continue
+
+            if text:
+                response = text
+                # The aggregated event repeats text already streamed as partials
+                if not streamed_partial:
+                    yield {"event": "chunk", "text": text}
+            streamed_partial = False
+    except Exception:
+        AGENT_RUN_SECONDS.observe(time.perf_counter() - started, agent=agent.name, outcome="error")
+        raise
+
+    AGENT_RUN_SECONDS.observe(time.perf_counter() - started, agent=agent.name, outcome="ok")
+    yield {"event": "final", "response": response}
+
+
+def event_text(event):
+    """Concatenated text parts of an event's content ("" when it has none)"""
+    content = getattr(event, "content", None)
+    if not content or not getattr(content, "parts", None):
+        return ""
+    return "".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+def function_call_names(event):
+    """Names of the tools (sub-agents) an event asks to call"""
+    get_calls = getattr(event, "get_function_calls", None)
+    return [call.name for call in get_calls()] if get_calls else []
+
+
+def function_responses(event):
+    get_responses = getattr(event, "get_function_responses", None)
+    return get_responses() if get_responses else []
+
+
+def function_response_names(event):
+    """Names of the tools (sub-agents) whose results an event carries"""
+    return [response.name for response in function_responses(event)]
+
+
+def streaming_run_config():
+    """RunConfig that makes the model stream partial text events over SSE"""
+    from google.adk.agents.run_config import StreamingMode
+    return RunConfig(streaming_mode=StreamingMode.SSE)
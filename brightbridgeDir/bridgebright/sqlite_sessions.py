@@ -0,0 +1,518 @@
+"""
+Durable ADK session service backed by a local SQLite file
+
+A drop-in for ``InMemorySessionService`` whose sessions survive restarts and
+can be shared by several worker processes on one host:
+
+- The database runs in WAL mode, so readers never wait for the writer.
+- ``append_event`` only queues its rows; a background thread writes them in
+  one transaction per batch (every ``flush_ms`` or ``batch_size`` rows).
+  A crash can lose at most that window of events. A batch that fails on a
+  locked or busy database goes back on the queue and is retried.
+- Every other database call runs in a worker thread, never on the event loop.
+- ``get_session`` serves recently used sessions from an in-process LRU,
+  revalidated with one primary-key read of the session's ``update_time`` so
+  writes made by another process are picked up.
+- Sessions are indexed by ``(app_name, user_id, update_time)`` for listing
+  and by ``update_time`` for pruning idle ones.
+
+``app:`` and ``user:`` state keys are stored per app and per user and merged
+back into every session, like the in-memory service; ``temp:`` keys are not
+stored.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+logger = logging.getLogger("bridge.sessions")
+
+# Pause before the writer retries a batch that failed
+WRITE_RETRY_SECONDS = 1.0
+# Attempts at a batch that keeps failing before its rows are dropped
+WRITE_MAX_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_user ON sessions (app_name, user_id, update_time);
+CREATE INDEX IF NOT EXISTS sessions_by_update_time ON sessions (update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (app_name, user_id, session_id, id)
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+UPSERT_SESSION = (
+    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (app_name, user_id, id) DO UPDATE SET state = excluded.state, update_time = excluded.update_time"
+)
+INSERT_EVENT = (
+    "INSERT OR IGNORE INTO events (app_name, user_id, session_id, id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)"
+)
+MERGE_APP_STATE = (
+    "INSERT INTO app_states (app_name, state) VALUES (?, ?) "
+    "ON CONFLICT (app_name) DO UPDATE SET state = json_patch(state, excluded.state)"
+)
+MERGE_USER_STATE = (
+    "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) "
+    "ON CONFLICT (app_name, user_id) DO UPDATE SET state = json_patch(state, excluded.state)"
+)
+DELETE_EVENT = "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND id = ?"
+DELETE_SESSION_EVENTS = "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+TOUCH_SESSION = "UPDATE sessions SET update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?"
+# Guarded by the session's expected update_time: a no-op once another process has written to it
+UNCHANGED_SINCE = "(SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?) <= ?"
+DELETE_EVENTS_IF_UNCHANGED = DELETE_SESSION_EVENTS + " AND " + UNCHANGED_SINCE
+INSERT_EVENT_IF_UNCHANGED = (
+    "INSERT OR IGNORE INTO events (app_name, user_id, session_id, id, timestamp, data) "
+    "SELECT ?, ?, ?, ?, ?, ? WHERE " + UNCHANGED_SINCE
+)
+TOUCH_IF_UNCHANGED = TOUCH_SESSION + " AND update_time <= ?"
+
+
+def split_state(state):
+    """(app, user, session) state dicts from prefixed keys; ``temp:`` keys are dropped"""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def merge_state(app_state, user_state, session_state):
+    state = dict(session_state)
+    state.update((State.APP_PREFIX + key, value) for key, value in app_state.items())
+    state.update((State.USER_PREFIX + key, value) for key, value in user_state.items())
+    return state
+
+
+class SqliteSessionService(BaseSessionService):
+    """``BaseSessionService`` on a WAL-mode SQLite file with batched writes and a read-through cache"""
+
+    def __init__(self, path, batch_size=64, flush_ms=50.0, cache_size=256):
+        self.path = path
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_ms / 1000
+        self.cache_size = cache_size
+
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._reader = self._connect()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+        # (app_name, user_id, session_id) -> Session, least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._pending = []
+        # A batch that failed with an OperationalError, retried ahead of newer rows
+        self._failed = []
+        self._failed_attempts = 0
+        self._cond = threading.Condition()
+        # Held from taking a batch until it is committed, so batches land in queue order
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._stats = {"events_appended": 0, "batches": 0, "rows_written": 0, "write_errors": 0, "rows_dropped": 0,
+                       "cache_hits": 0, "cache_misses": 0, "cache_stale": 0}
+        self._thread = threading.Thread(target=self._run_writer, name="session-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Durable across process crashes; only an OS crash can lose the last commits
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # -- BaseSessionService ------------------------------------------------
+
+    async def create_session(
+        self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None, session_id: Optional[str] = None
+    ) -> Session:
+        session = await asyncio.to_thread(self._create_session, app_name, user_id, state, session_id)
+        return session.model_copy(deep=True)
+
+    async def get_session(
+        self, *, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        session = await asyncio.to_thread(self._load_session, app_name, user_id, session_id)
+        if session is None:
+            return None
+        session = session.model_copy(deep=True)
+        if config is not None:
+            if config.after_timestamp:
+                session.events = [event for event in session.events if event.timestamp >= config.after_timestamp]
+            if config.num_recent_events:
+                session.events = session.events[-config.num_recent_events:]
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        """Sessions without events, oldest update first"""
+        query = "SELECT user_id, id, update_time FROM sessions WHERE app_name = ?"
+        params = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        rows = await asyncio.to_thread(self._query, query + " ORDER BY update_time", params)
+        return ListSessionsResponse(sessions=[
+            Session(id=session_id, app_name=app_name, user_id=row_user, state={}, events=[], last_update_time=updated)
+            for row_user, session_id, updated in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop((app_name, user_id, session_id), None)
+        key = (app_name, user_id, session_id)
+        await asyncio.to_thread(self._execute, [
+            (DELETE_SESSION_EVENTS, key),
+            ("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key),
+        ])
+
+    def _create_session(self, app_name, user_id, state, session_id):
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        if self._session_update_time(app_name, user_id, session_id) is not None:
+            raise ValueError(f"Session {session_id} already exists")
+        app_delta, user_delta, session_state = split_state(state)
+        now = time.time()
+        ops = [(UPSERT_SESSION, (app_name, user_id, session_id, json.dumps(session_state), now, now))]
+        if app_delta:
+            ops.append((MERGE_APP_STATE, (app_name, json.dumps(app_delta))))
+        if user_delta:
+            ops.append((MERGE_USER_STATE, (app_name, user_id, json.dumps(user_delta))))
+        # Written straight away so other processes see the session exists
+        self._execute(ops)
+
+        app_state, user_state = self._shared_state(app_name, user_id)
+        session = Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=merge_state(app_state, user_state, session_state),
+            events=[],
+            last_update_time=now,
+        )
+        self._cache_put(session)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        """Apply ``event`` to ``session`` and queue it for the next batch.
+
+        ``session`` does not have to come from ``create_session``: a session
+        row is written for it on its first event.
+        """
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        state_delta = event.actions.state_delta if event.actions else None
+        app_delta, user_delta, session_delta = split_state(state_delta)
+        app_name, user_id = session.app_name, session.user_id
+        ops = [
+            (UPSERT_SESSION, (app_name, user_id, session.id, json.dumps(split_state(session.state)[2], default=str),
+                              event.timestamp, event.timestamp)),
+            (INSERT_EVENT, (app_name, user_id, session.id, event.id, event.timestamp,
+                            event.model_dump_json(exclude_none=True))),
+        ]
+        if app_delta:
+            ops.append((MERGE_APP_STATE, (app_name, json.dumps(app_delta, default=str))))
+        if user_delta:
+            ops.append((MERGE_USER_STATE, (app_name, user_id, json.dumps(user_delta, default=str))))
+        self._enqueue(ops)
+
+        # Keep the cached copy current when the caller holds a different object
+        with self._cache_lock:
+            cached = self._cache.get((app_name, user_id, session.id))
+            if cached is not None and cached is not session:
+                cached.events.append(event)
+                cached.state.update((key, value) for key, value in (state_delta or {}).items()
+                                    if not key.startswith(State.TEMP_PREFIX))
+                cached.last_update_time = event.timestamp
+        self._stats["events_appended"] += 1
+        return event
+
+    async def flush(self) -> None:
+        """Write every queued row now"""
+        await asyncio.to_thread(self.flush_pending)
+
+    # -- Extras used by the bridge -----------------------------------------
+
+    async def has_session(self, app_name, user_id, session_id):
+        if (app_name, user_id, session_id) in self._cache:
+            return True
+        return await asyncio.to_thread(self._session_update_time, app_name, user_id, session_id) is not None
+
+    async def is_stale(self, session):
+        """Whether the stored session is newer than ``session``, i.e. another process wrote to it since"""
+        update_time = await asyncio.to_thread(self._session_update_time, session.app_name, session.user_id, session.id)
+        return update_time is not None and update_time > session.last_update_time
+
+    def discard_events(self, session, events):
+        """Forget ``events`` (already removed from ``session``), e.g. a turn being retried"""
+        if not events:
+            return
+        key = (session.app_name, session.user_id, session.id)
+        ids = {event.id for event in events}
+        # A newer update_time makes other processes drop their cached copy
+        now = max(time.time(), session.last_update_time)
+        session.last_update_time = now
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached is not session:
+                    cached.events[:] = [event for event in cached.events if event.id not in ids]
+                cached.last_update_time = now
+        self._enqueue([(DELETE_EVENT, key + (event_id,)) for event_id in ids] + [(TOUCH_SESSION, (now,) + key)])
+
+    def replace_events(self, session, events):
+        """Store ``events`` (already ``session.events``) as the session's whole history, e.g. after compaction.
+
+        Only applies if the stored session is no newer than ``session`` was:
+        when another process has written to it since, the stored history is
+        left alone and the next load picks it up.
+        """
+        key = (session.app_name, session.user_id, session.id)
+        expected = session.last_update_time
+        now = max(time.time(), expected)
+        session.last_update_time = now
+        # Reloaded from the database next time, which holds whichever history won
+        with self._cache_lock:
+            self._cache.pop(key, None)
+        guard = key + (expected,)
+        # Rewritten in order, in one batch, so the seq order matches the list (a summary first)
+        self._enqueue(
+            [(DELETE_EVENTS_IF_UNCHANGED, key + guard)]
+            + [(INSERT_EVENT_IF_UNCHANGED,
+                key + (event.id, event.timestamp, event.model_dump_json(exclude_none=True)) + guard)
+               for event in events]
+            + [(TOUCH_IF_UNCHANGED, (now,) + key + (expected,))]
+        )
+
+    def delete_idle_sessions(self, max_idle_seconds):
+        """Delete sessions not updated for ``max_idle_seconds``; returns how many"""
+        cutoff = time.time() - max_idle_seconds
+        self.flush_pending()
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                self._writer.execute(
+                    "DELETE FROM events WHERE (app_name, user_id, session_id) IN "
+                    "(SELECT app_name, user_id, id FROM sessions WHERE update_time < ?)", (cutoff,))
+                deleted = self._writer.execute("DELETE FROM sessions WHERE update_time < ?", (cutoff,)).rowcount
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+        with self._cache_lock:
+            for key in [key for key, session in self._cache.items() if session.last_update_time < cutoff]:
+                del self._cache[key]
+        return deleted
+
+    def flush_pending(self):
+        """Write every queued row from this thread; raises if a batch fails"""
+        with self._flush_lock:
+            if self._failed:
+                self._write(self._failed)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if batch:
+                self._write(batch)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        try:
+            self.flush_pending()
+        finally:
+            self._writer.close()
+            self._reader.close()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending) + len(self._failed)
+        with self._cache_lock:
+            cached = len(self._cache)
+        return dict(self._stats, pending_rows=pending, cached_sessions=cached, path=self.path)
+
+    # -- Internals ---------------------------------------------------------
+
+    def _enqueue(self, ops):
+        with self._cond:
+            self._pending.extend(ops)
+            self._cond.notify()
+
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._failed or self._closed)
+                if self._closed:
+                    return
+                # Give the batch a moment to fill before committing it
+                self._cond.wait_for(lambda: len(self._pending) >= self.batch_size or self._closed,
+                                    timeout=self.flush_interval)
+            try:
+                self.flush_pending()
+            except sqlite3.Error:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed, timeout=WRITE_RETRY_SECONDS)
+
+    def _write(self, batch):
+        """Commit ``batch`` in one transaction.
+
+        On failure the error is raised. A locked, busy or full database
+        (``OperationalError``) may recover, so the batch is kept and retried
+        before any newer rows, up to ``WRITE_MAX_ATTEMPTS`` times; after that,
+        or on any other error, it is dropped.
+        """
+        try:
+            self._execute(batch)
+        except sqlite3.Error as error:
+            attempts = self._failed_attempts + 1 if batch is self._failed else 1
+            requeued = isinstance(error, sqlite3.OperationalError) and attempts < WRITE_MAX_ATTEMPTS
+            with self._cond:
+                self._stats["write_errors"] += 1
+                if requeued:
+                    self._failed, self._failed_attempts = batch, attempts
+                else:
+                    self._failed, self._failed_attempts = [], 0
+                    self._stats["rows_dropped"] += len(batch)
+            logger.error("Session batch write failed",
+                         extra={"rows": len(batch), "error": str(error), "attempts": attempts,
+                                "requeued": requeued})
+            raise
+        if batch is self._failed:
+            self._failed, self._failed_attempts = [], 0
+        self._stats["batches"] += 1
+        self._stats["rows_written"] += len(batch)
+
+    def _execute(self, ops):
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in ops:
+                    self._writer.execute(sql, params)
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    def _load_session(self, app_name, user_id, session_id):
+        """The cached session if it is at least as new as the stored row, else a fresh read"""
+        key = (app_name, user_id, session_id)
+        update_time = self._session_update_time(app_name, user_id, session_id)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            # Queued writes can make the cached copy newer than the row (or the row not exist yet)
+            if cached is not None and (update_time is None or cached.last_update_time >= update_time):
+                self._stats["cache_hits"] += 1
+                self._cache.move_to_end(key)
+                return cached
+            self._stats["cache_stale" if cached is not None else "cache_misses"] += 1
+
+        # Our own queued rows must be visible to the read
+        self.flush_pending()
+        session = self._read_session(app_name, user_id, session_id)
+        if session is not None:
+            self._cache_put(session)
+        return session
+
+    def _query(self, query, params):
+        with self._read_lock:
+            return self._reader.execute(query, params).fetchall()
+
+    def _session_update_time(self, app_name, user_id, session_id):
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _shared_state(self, app_name, user_id):
+        with self._read_lock:
+            app_row = self._reader.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            user_row = self._reader.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)).fetchone()
+        return json.loads(app_row[0]) if app_row else {}, json.loads(user_row[0]) if user_row else {}
+
+    def _read_session(self, app_name, user_id, session_id):
+        with self._read_lock:
+            # One read transaction so the row and its events are consistent
+            self._reader.execute("BEGIN")
+            try:
+                row = self._reader.execute(
+                    "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (app_name, user_id, session_id),
+                ).fetchone()
+                events = self._reader.execute(
+                    "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+                    (app_name, user_id, session_id),
+                ).fetchall() if row else []
+            finally:
+                self._reader.execute("COMMIT")
+        if row is None:
+            return None
+        app_state, user_state = self._shared_state(app_name, user_id)
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=merge_state(app_state, user_state, json.loads(row[0])),
+            events=[Event.model_validate_json(data) for (data,) in events],
+            last_update_time=row[1],
+        )
+
+    def _cache_put(self, session):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[(session.app_name, session.user_id, session.id)] = session
+            self._cache.move_to_end((session.app_name, session.user_id, session.id))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -28,35 +28,7 @@
 #     )
 # ) 
 
-import random
-import os
-from google.adk.agents import Agent
+# Built from the registry (bridgebright/agents.json) on first import
+from ...registry import get_registry
 
-therapist_agent=Agent(
-    name="therapeutic_support_agent",
-    description="A therapeutic agent specializing in mental health support and therapeutic interventions for neurodivergent individuals",
-    model="gemini-1.5-flash",
-    instruction="""
-        You are a therapeutic support specialist for neurodivergent individuals.
-        IMPORTANT: You ONLY respond to the root agent (bright_bridge_manager_agent), never directly to users.
-        Your role is to provide mental health support, emotional regulation, and coping strategies.
-        SPECIFIC AREAS OF EXPERTISE:
-        - Emotional regulation and coping strategies
-        - Anxiety and stress management
-        - Therapeutic interventions and techniques
-        - Mindfulness and relaxation exercises
-        - Building resilience and self-esteem
-        - Managing sensory sensitivities and overwhelm
-        - Crisis intervention and de-escalation
-        - Supporting transitions and change
-        APPROACH:
-        - Provide empathetic, non-judgmental support
-        - Help users identify and express their emotions
-        - Offer practical strategies for managing difficult feelings
-        - Suggest appropriate coping tools and resources
-        - Emphasize self-care and self-compassion
-        Always be supportive and help build confidence while providing realistic, practical guidance.
-        Provide detailed, actionable therapeutic advice that the root agent can relay to the user in a natural way.
-        If response generation takes more than 5-6 seconds, acknowledge that you are carefully crafting therapeutic strategies.
-    """
-) 
\ No newline at end of file
+therapist_agent = get_registry().agent("therapy")
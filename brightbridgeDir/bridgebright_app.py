@@ -3,23 +3,32 @@ import time
 import sys
 import os
 import asyncio
+import functools
+import queue
+import threading
 from datetime import datetime
 import json
 import uuid
+import weakref
 
 # Add the current directory to Python path to import bridgebright
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from bridgebright.agent import root_agent
+    from bridgebright.runner import new_session, stream_turn
+    from bridge.crisis import CrisisDetector
+    from bridge.sessions import SessionManager
     from google.adk.sessions.in_memory_session_service import InMemorySessionService
-    from google.adk.sessions.session import Session
-    from google.adk.agents.invocation_context import InvocationContext, new_invocation_context_id
-    from google.genai.types import UserContent
 except ImportError as e:
     st.error(f"Error importing BrightBridge: {e}")
     st.stop()
 
+# Messages rendered on each rerun (0 renders them all), and how many more each
+# "Show earlier messages" click adds
+CHAT_WINDOW = int(os.getenv("BRIDGE_CHAT_WINDOW", "20"))
+CHAT_PAGE_SIZE = int(os.getenv("BRIDGE_CHAT_PAGE_SIZE", "20"))
+
 # Page configuration
 st.set_page_config(
     page_title="BrightBridge - Neurodivergent Support Assistant",
@@ -149,6 +158,40 @@ if 'conversation_started' not in st.session_state:
     st.session_state.conversation_started = False
 if 'user_name' not in st.session_state:
     st.session_state.user_name = ""
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = str(uuid.uuid4())
+if 'history_pages' not in st.session_state:
+    st.session_state.history_pages = 0
+
+@st.cache_resource
+def get_session_store():
+    """Process-wide session service and bounded ADK session store, shared by all browser tabs"""
+    return InMemorySessionService(), SessionManager(max_sessions=500, idle_ttl=3600)
+
+@st.cache_resource
+def get_event_loop():
+    """One event loop on a daemon thread for the whole process.
+
+    Agent turns are submitted to it instead of starting a loop per message,
+    so the loop, the agent and its HTTP clients stay warm across reruns.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_turn_locks():
+    """Session id -> asyncio.Lock held for each turn, so one session runs one turn at a time.
+
+    Only touched on the agent loop. Entries go away once no turn holds or
+    waits for them.
+    """
+    return weakref.WeakValueDictionary()
+
+@st.cache_resource
+def get_crisis_detector():
+    """Local crisis lexicon, checked before the agent is asked anything"""
+    return CrisisDetector.from_file()
 
 def display_crisis_resources():
     """Display crisis support resources"""
@@ -165,35 +208,115 @@ def display_crisis_resources():
     </div>
     """, unsafe_allow_html=True)
 
-async def get_agent_response(prompt):
-    # 1. Create a session service (reuse across requests for real apps)
-    session_service = InMemorySessionService()
-    # 2. Create a session (use a persistent user_id and session_id for real apps)
-    session_id = str(uuid.uuid4())
-    session = Session(
-        id=session_id,
-        app_name="brightbridge",
-        user_id=st.session_state.user_name or "user",
-        state={},
-        events=[],
-        last_update_time=time.time(),
-    )
-    # 3. Create user content
-    user_content = UserContent(prompt)
-    # 4. Create invocation context
-    context = InvocationContext(
-        session_service=session_service,
-        invocation_id=new_invocation_context_id(),
-        agent=root_agent,
-        user_content=user_content,
-        session=session,
+def format_message(role, content):
+    """Chat bubble HTML for one message"""
+    if role == "user":
+        return f"""<div class="chat-message user-message">
+<strong>You:</strong> {content}
+</div>"""
+    return f"""<div class="chat-message assistant-message">
+<strong>BrightBridge:</strong> {content}
+</div>"""
+
+# Past messages never change, so their HTML is built once per process
+message_html = functools.lru_cache(maxsize=4096)(format_message)
+
+def show_earlier_messages():
+    st.session_state.history_pages += 1
+
+def render_transcript(messages):
+    """Render the newest messages as a single block, with older ones paged in on demand.
+
+    Only the last CHAT_WINDOW messages (plus CHAT_PAGE_SIZE per page asked
+    for) are sent to the browser, so a rerun costs the same however long the
+    conversation has grown.
+    """
+    shown = len(messages)
+    if CHAT_WINDOW:
+        shown = min(shown, CHAT_WINDOW + st.session_state.history_pages * CHAT_PAGE_SIZE)
+    hidden = len(messages) - shown
+    if hidden:
+        st.button(f"⬆️ Show earlier messages ({hidden} more)", on_click=show_earlier_messages)
+    if shown:
+        st.markdown(
+            "\n\n".join(message_html(message["role"], message["content"]) for message in messages[hidden:]),
+            unsafe_allow_html=True
+        )
+
+def get_chat_session():
+    """This browser session's ADK session, reused so the agent sees earlier turns"""
+    session_service, sessions = get_session_store()
+    user_id = st.session_state.user_name or "user"
+    # Keyed by the session id alone: entering a name mid-conversation keeps the same session
+    session, _ = sessions.get_or_create(
+        st.session_state.session_id,
+        lambda: new_session(user_id, st.session_state.session_id)
     )
-    # 5. Run the agent
-    async for event in root_agent.run_async(context):
-        if hasattr(event, "content") and event.content:
-            return event.content
+    return session_service, session
+
+def stream_agent_response(prompt, partial_text=True):
+    """Run one turn on the background loop and yield its events in the script thread.
+
+    Yields chunk / tool_start / tool_end events, then a final event with the
+    reply. Streamlit calls (session state, placeholders) stay on this thread;
+    only the agent runs on the loop.
+    """
+    session_service, session = get_chat_session()
+    events = queue.Queue()
+
+    async def pump():
+        locks = get_turn_locks()
+        lock = locks.get(session.id)
+        if lock is None:
+            lock = locks[session.id] = asyncio.Lock()
+        try:
+            # A rerun's turn waits here until a cancelled one has been rolled back
+            async with lock:
+                events_before = len(session.events)
+                try:
+                    async for event in stream_turn(root_agent, session_service, session, prompt, partial_text):
+                        events.put(event)
+                except asyncio.CancelledError:
+                    # Stopped before the reply: take the turn back out, the user's message
+                    # included, so the session never ends on a question it did not answer
+                    del session.events[events_before:]
+                    raise
+        except Exception as error:
+            events.put(error)
+        finally:
+            events.put(None)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while (item := events.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # The script was stopped (rerun, closed tab) before the turn finished
+        future.cancel()
+
+def get_agent_response(prompt):
+    for event in stream_agent_response(prompt, partial_text=False):
+        if event["event"] == "final":
+            return event["response"] or "Sorry, I couldn't generate a response."
     return "Sorry, I couldn't generate a response."
 
+def render_agent_stream(prompt, placeholder):
+    """Show the reply in ``placeholder`` as it streams in and return the final text"""
+    shown = ""
+    response = ""
+    for event in stream_agent_response(prompt):
+        if event["event"] == "chunk":
+            shown += event["text"]
+            placeholder.markdown(format_message("assistant", f"{shown} ▌"), unsafe_allow_html=True)
+        elif event["event"] == "final":
+            response = event["response"] or shown
+
+    response = response or "Sorry, I couldn't generate a response."
+    placeholder.markdown(message_html("assistant", response), unsafe_allow_html=True)
+    return response
+
 def main():
     # Header
     st.markdown("""
@@ -235,7 +358,10 @@ def main():
             display_crisis_resources()
     with colB:
         if st.button("🗑️ Clear Conversation"):
+            get_session_store()[1].discard(st.session_state.session_id)
+            st.session_state.session_id = str(uuid.uuid4())
             st.session_state.messages = []
+            st.session_state.history_pages = 0
             st.session_state.conversation_started = False
             st.rerun()
 
@@ -244,37 +370,21 @@ def main():
     with col1:
         st.subheader("💬 Chat with BrightBridge")
         # Display chat messages
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(f"""
-                <div class="chat-message user-message">
-                    <strong>You:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div class="chat-message assistant-message">
-                    <strong>BrightBridge:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
+        render_transcript(st.session_state.messages)
         # Chat input
         if prompt := st.chat_input("Type your message here..."):
             st.session_state.messages.append({"role": "user", "content": prompt})
             st.session_state.conversation_started = True
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>You:</strong> {prompt}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(message_html("user", prompt), unsafe_allow_html=True)
+            # Show crisis resources straight away rather than after the agent replies
+            if get_crisis_detector().detect(prompt):
+                display_crisis_resources()
             with st.spinner("BrightBridge is thinking..."):
                 try:
-                    assistant_response = asyncio.run(get_agent_response(prompt))
+                    # Stream the reply into place so the first words show up right away
+                    response_placeholder = st.empty()
+                    assistant_response = render_agent_stream(prompt, response_placeholder)
                     st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-                    st.markdown(f"""
-                    <div class="chat-message assistant-message">
-                        <strong>BrightBridge:</strong> {assistant_response}
-                    </div>
-                    """, unsafe_allow_html=True)
                 except Exception as e:
                     st.error(f"Error getting response: {e}")
                     st.session_state.messages.append({"role": "assistant", "content": "I'm sorry, I'm having trouble responding right now. Please try again."})
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The bridge modules import each other as top-level packages (bridge, bridgebright)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when a test sets ``now``"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
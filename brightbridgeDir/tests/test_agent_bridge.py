@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+import agent_bridge
+from bridgebright.runner import event_text
+
+
+@pytest.fixture
+def shared_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_bridge, "SESSION_DB", str(tmp_path / "sessions.db"))
+
+
+def texts(session):
+    return [event_text(event) for event in session.events]
+
+
+def test_workers_sharing_a_session_see_each_others_turns(shared_db):
+    # Two bridges on one database stand in for two supervisor workers under --dispatch least
+    first, second = agent_bridge.AgentBridge(), agent_bridge.AgentBridge()
+
+    async def scenario():
+        await first.remember_turn("ann", "s1", "hello", "hi")
+        await first.session_service.flush()
+        await second.remember_turn("ann", "s1", "how are you", "fine")
+        await second.session_service.flush()
+        # first still holds its copy from before second's turn
+        await first.remember_turn("ann", "s1", "bye", "see you")
+        slot, created = await first.session_slot("ann", "s1")
+        return slot[0], created
+
+    try:
+        session, created = asyncio.run(scenario())
+    finally:
+        first.session_service.close()
+        second.session_service.close()
+    assert not created
+    assert texts(session) == ["hello", "hi", "how are you", "fine", "bye", "see you"]
+
+
+class StallingLlm:
+    """Builds a model that sends a partial reply, then stalls past any deadline"""
+
+    @staticmethod
+    def build():
+        from google.adk.models.base_llm import BaseLlm
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+
+        class Stalling(BaseLlm):
+            model: str = "stalling"
+
+            async def generate_content_async(self, llm_request, stream=False):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Let me think")]),
+                                  partial=True)
+                await asyncio.sleep(30)
+
+        return Stalling()
+
+
+@pytest.fixture
+def stalling_bridge(monkeypatch):
+    """Fresh agents on a model that never finishes, and a fresh process-wide bridge"""
+    import bridgebright.agent
+    import bridgebright.registry
+
+    build = bridgebright.registry._build_agent
+
+    def build_stalling(spec, tools=()):
+        agent = build(spec, tools)
+        agent.model = StallingLlm.build()
+        return agent
+
+    monkeypatch.setattr(bridgebright.registry, "_build_agent", build_stalling)
+    monkeypatch.setattr(bridgebright.agent, "_registry", bridgebright.registry.AgentRegistry.from_file())
+    monkeypatch.setattr(agent_bridge, "DEVELOPMENT_MODE", False)
+    monkeypatch.setattr(agent_bridge, "_bridge", None)
+    yield
+    bridge = agent_bridge._bridge
+    if agent_bridge.SESSION_DB and bridge is not None:
+        bridge.session_service.close()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("durable", [False, True])
+def test_truncated_turn_leaves_no_unanswered_message(stalling_bridge, tmp_path, monkeypatch, stream, durable):
+    if durable:
+        monkeypatch.setattr(agent_bridge, "SESSION_DB", str(tmp_path / "sessions.db"))
+    events = []
+
+    async def emit(event):
+        events.append(event)
+
+    async def scenario():
+        result = await agent_bridge.handle_request({
+            "id": "r1", "agent_type": "education", "message": "How should I study?", "user_name": "ann",
+            "session_id": "s1", "deadline_ms": 300, "stream": stream,
+        }, emit)
+        bridge = agent_bridge.get_bridge()
+        slot, _ = await bridge.session_slot("ann", "s1")
+        stored = None
+        if durable:
+            await bridge.session_service.flush()
+            stored = await bridge.session_service.get_session(app_name="brightbridge", user_id="ann", session_id="s1")
+        return result, slot[0], stored
+
+    result, session, stored = asyncio.run(scenario())
+    assert result["status"] == "truncated"
+    assert session.events == []
+    if durable:
+        # No row at all when the deadline lands before the first event is stored
+        assert stored is None or stored.events == []
+    if stream:
+        assert result["response"] == "Let me think…"
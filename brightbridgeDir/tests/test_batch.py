@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from bridge.batch import load_checkpoint, run_batch, to_request
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+async def echo(request):
+    # Later requests finish first, so ordered output has to wait for earlier ones
+    await asyncio.sleep(0.01 * (5 - int(request["id"])))
+    return {"success": True, "id": request["id"], "response": request["message"].upper()}
+
+
+def test_results_keep_input_order_and_record_their_line(tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": str(index), "message": f"m{index}"}) for index in range(5)])
+    summary = asyncio.run(run_batch(echo, str(source), str(output), concurrency=5))
+    results = read_results(output)
+    assert [result["line"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[0]["response"] == "M0"
+    assert (summary["processed"], summary["succeeded"], summary["skipped"]) == (5, 5, 0)
+
+
+def test_invalid_and_failing_requests_are_written_as_failures(tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, ["not json", "", json.dumps({"id": "x", "message": "boom"})])
+
+    async def handle(request):
+        raise RuntimeError("model down")
+
+    summary = asyncio.run(run_batch(handle, str(source), str(output)))
+    results = read_results(output)
+    assert results[0]["line"] == 0 and results[0]["error"].startswith("Invalid request")
+    assert results[1] == {"success": False, "error": "model down", "id": "x", "line": 2}
+    assert (summary["processed"], summary["failed"]) == (2, 2)
+
+
+def test_checkpoint_cuts_a_torn_last_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"line": 0}\n{"line": 2}\n{"line": 3', encoding="utf-8")
+    assert load_checkpoint(str(output)) == {0, 2}
+    assert output.read_text(encoding="utf-8") == '{"line": 0}\n{"line": 2}\n'
+    assert load_checkpoint(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_resume_answers_only_the_missing_lines(tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": str(index), "message": f"m{index}"}) for index in range(4)])
+    output.write_text('{"success": true, "line": 1}\n{"success": true, "line": 3}\n{"succ', encoding="utf-8")
+    answered = []
+
+    async def handle(request):
+        answered.append(request["id"])
+        return {"success": True, "id": request["id"]}
+
+    summary = asyncio.run(run_batch(handle, str(source), str(output), resume=True))
+    assert sorted(answered) == ["0", "2"]
+    assert sorted(result["line"] for result in read_results(output)) == [0, 1, 2, 3]
+    assert (summary["processed"], summary["skipped"]) == (2, 2)
+
+
+def test_stopping_drains_and_reports_an_interrupted_run(tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": str(index), "message": "m"}) for index in range(4)])
+
+    async def scenario():
+        stopping = asyncio.Event()
+
+        async def handle(request):
+            stopping.set()
+            return {"success": True, "id": request["id"]}
+
+        return await run_batch(handle, str(source), str(output), concurrency=1, stopping=stopping)
+
+    summary = asyncio.run(scenario())
+    assert summary["interrupted"] and summary["processed"] < 4
+    assert len(read_results(output)) == summary["processed"]
+
+
+def test_to_request_with_a_message_field():
+    record = {"request_id": "r7", "body": "Help me plan", "title": "ignored"}
+    request = to_request(record, "body", "request_id", {"agent_type": "general", "stream": True})
+    assert request == {"agent_type": "general", "message": "Help me plan", "id": "r7"}
+    with pytest.raises(ValueError):
+        to_request({"title": "no body"}, "body")
+    with pytest.raises(ValueError):
+        to_request(["not", "an", "object"])
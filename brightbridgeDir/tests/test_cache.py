@@ -0,0 +1,73 @@
+from bridge.cache import USER_PLACEHOLDER, ResponseCache, normalize_message, reply_template
+
+
+def test_normalize_message():
+    assert normalize_message("  I'm   FEELING anxious!! ") == "im feeling anxious"
+
+
+def test_template_replaces_whole_words_only():
+    assert reply_template("Hi Ann! Annual reviews are hard, Ann.", "Ann") == (
+        f"Hi {USER_PLACEHOLDER}! Annual reviews are hard, {USER_PLACEHOLDER}."
+    )
+
+
+def test_template_is_ambiguous_for_single_letters_and_ordinary_words():
+    assert reply_template("Hi e! Here we are.", "e") is None
+    assert reply_template("Hi Hope! I hope this helps.", "Hope") is None
+    assert reply_template("Hi Sam! Take care.", "") == "Hi Sam! Take care."
+
+
+def test_reply_is_personalised_per_user():
+    cache = ResponseCache()
+    cache.put("general", "How do I relax?", "Ann", "Hi Ann! Annual leave helps, Ann.")
+    assert cache.get("general", "how do i relax", "Bob") == "Hi Bob! Annual leave helps, Bob."
+
+
+def test_single_letter_name_does_not_corrupt_the_cached_reply():
+    cache = ResponseCache()
+    cache.put("general", "How do I relax?", "e", "Hi e! Breathe deeply.")
+    assert cache.get("general", "How do I relax?", "Bob") is None
+    assert cache.stats()["unstorable"] == 1
+
+
+def test_near_duplicate_lookup():
+    cache = ResponseCache(similarity=0.8)
+    cache.put("general", "I can't sleep at night lately", "Ann", "Hi Ann! Try a routine.")
+    assert cache.get("general", "I cant sleep at night lately!", "Bo") == "Hi Bo! Try a routine."
+    assert cache.get("general", "What should I eat for breakfast", "Bo") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 0, 1)
+    assert cache.get("general", "I cannot sleep at night lately", "Bo") == "Hi Bo! Try a routine."
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_entries_are_per_agent_type():
+    cache = ResponseCache()
+    cache.put("anxiety", "help", "Ann", "Breathe, Ann.")
+    assert cache.get("adhd", "help", "Ann") is None
+
+
+def test_excluded_agent_types_are_never_stored():
+    cache = ResponseCache()
+    cache.put("crisis", "help", "Ann", "Please call a hotline, Ann.")
+    assert cache.get("crisis", "help", "Ann") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("general", "hello", "Ann", "Hi Ann!")
+    clock.now = 11
+    assert cache.get("general", "hello", "Ann") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("general", "first question", "Ann", "one")
+    cache.put("general", "second question", "Ann", "two")
+    assert cache.get("general", "first question", "Ann") == "one"
+    cache.put("general", "third question", "Ann", "three")
+    assert cache.get("general", "second question", "Ann") is None
+    assert cache.get("general", "first question", "Ann") == "one"
+    assert cache.stats()["evictions"] == 1
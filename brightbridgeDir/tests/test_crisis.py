@@ -0,0 +1,55 @@
+from bridge.crisis import CrisisDetector, normalize
+
+LEXICON = {
+    "resources": "Call 988.",
+    "terms": {"suicide": ["suicid", "kill myself"], "emergency": ["can't cope", "not safe"]},
+    "agent_types": ["crisis"],
+}
+
+
+def test_terms_match_as_word_prefixes():
+    detector = CrisisDetector(LEXICON)
+    match = detector.detect("I keep having Suicidal thoughts")
+    assert match.categories == {"suicide"} and match.terms == ("suicid",)
+    assert detector.detect("a nonsuicidal aside") is None
+
+
+def test_curly_apostrophes_and_extra_spaces_still_match():
+    assert normalize("can’t \n cope") == "can't cope"
+    detector = CrisisDetector(LEXICON)
+    assert detector.detect("I can’t   cope anymore").categories == {"emergency"}
+
+
+def test_every_category_hit_is_reported():
+    match = CrisisDetector(LEXICON).detect("I'm not safe and want to kill myself")
+    assert match.categories == {"suicide", "emergency"}
+    assert match.terms == ("not safe", "kill myself")
+
+
+def test_crisis_agent_type_always_counts():
+    detector = CrisisDetector(LEXICON)
+    assert detector.detect("hello", agent_type="crisis").categories == {"agent_type"}
+    assert detector.detect("hello", agent_type="education") is None
+    assert detector.detect(None) is None
+
+
+def test_resources_are_added_once():
+    detector = CrisisDetector(LEXICON)
+    assert detector.with_resources("We're here.") == "Call 988.\n\nWe're here."
+    assert detector.with_resources("Call 988. We're here.") == "Call 988. We're here."
+    assert detector.with_resources("") == "Call 988."
+
+
+def test_stats_count_scans_and_categories():
+    detector = CrisisDetector(LEXICON)
+    detector.detect("fine")
+    detector.detect("kill myself", agent_type="crisis")
+    stats = detector.stats()
+    assert (stats["scans"], stats["detections"]) == (2, 1)
+    assert stats["by_category"] == {"suicide": 1, "agent_type": 1}
+
+
+def test_shipped_lexicon_loads_and_matches():
+    detector = CrisisDetector.from_file()
+    assert detector.detect("I have been hurting myself").categories == {"self_harm"}
+    assert detector.detect("Can you help me plan my study week?") is None
@@ -0,0 +1,32 @@
+from bridgebright.registry import AgentRegistry, load_config
+
+ROOT_ONLY_CLAUSE = "You ONLY respond to the root agent"
+
+
+def test_directly_routed_specialists_address_the_user():
+    registry = AgentRegistry.from_file()
+    for agent_type, spec in registry.specs.items():
+        direct = registry.direct_specs[agent_type]
+        assert ROOT_ONLY_CLAUSE in spec.instruction
+        assert ROOT_ONLY_CLAUSE not in direct.instruction
+        assert "talking with the user directly" in direct.instruction
+        assert (direct.name, direct.model, direct.description) == (spec.name, spec.model, spec.description)
+
+
+def test_every_variant_starts_with_its_shared_prefix():
+    config = load_config()
+    registry = AgentRegistry(config)
+    for agent_type, spec in registry.specs.items():
+        suffix = spec.instruction[len(config["specialist_prefix"]):]
+        assert spec.instruction.startswith(config["specialist_prefix"])
+        assert registry.direct_specs[agent_type].instruction == config["specialist_direct_prefix"] + suffix
+
+
+def test_direct_prefix_defaults_to_the_specialist_prefix():
+    registry = AgentRegistry({
+        "specialist_prefix": "Shared rules.\n",
+        "root": {"name": "root", "model": "m", "instruction": "Route."},
+        "agents": {"education": {"name": "edu", "instruction": "Teach."}},
+    })
+    assert registry.direct_specs["education"].instruction == registry.specs["education"].instruction == "Shared rules.\nTeach."
+    assert registry.specs["education"].model == "m"
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from bridge.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Resilience, RetryPolicy, is_transient
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+def make_breaker(clock, **options):
+    return CircuitBreaker(**dict(dict(window=4, error_rate=0.5, min_calls=4, open_seconds=10, clock=clock), **options))
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False)
+
+
+def test_breaker_opens_at_error_rate_and_probes_after_open_seconds(clock):
+    breaker = make_breaker(clock)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+
+
+def test_is_open_does_not_take_the_probe(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    assert breaker.is_open()
+    clock.now = 10
+    assert not breaker.is_open()
+    assert not breaker.is_open()
+    assert breaker.allow()
+
+
+def test_cancelled_probe_frees_the_probe_slot(clock):
+    breaker = make_breaker(clock)
+    resilience = Resilience(retry=RetryPolicy(attempts=1), breaker=breaker)
+    trip(breaker)
+    clock.now = 10
+    assert breaker.allow()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def probe_past_deadline():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.call(slow), 0.01)
+
+    asyncio.run(probe_past_deadline())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_transient_errors_are_retried_until_success():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Unavailable("busy")
+        return "ok"
+
+    resilience = Resilience(retry=RetryPolicy(attempts=3, base_ms=0, max_ms=0))
+    assert asyncio.run(resilience.call(flaky)) == "ok"
+    assert len(attempts) == 3
+    assert resilience.stats()["retries"] == 2
+
+
+def test_retry_does_not_consume_the_half_open_probe(clock):
+    breaker = make_breaker(clock, min_calls=100)
+    resilience = Resilience(retry=RetryPolicy(attempts=2, base_ms=0, max_ms=0), breaker=breaker)
+    calls = []
+
+    async def fails_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Unavailable("busy")
+        return "ok"
+
+    assert asyncio.run(resilience.call(fails_once)) == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_gets_one_outcome_per_call(clock):
+    breaker = make_breaker(clock, min_calls=100)
+    resilience = Resilience(retry=RetryPolicy(attempts=3, base_ms=0, max_ms=0), breaker=breaker)
+    calls = []
+
+    async def fails_twice():
+        calls.append(1)
+        if len(calls) % 3:
+            raise Unavailable("busy")
+        return "ok"
+
+    async def always_fails():
+        raise Unavailable("down")
+
+    assert asyncio.run(resilience.call(fails_twice)) == "ok"
+    assert breaker.stats()["recent_calls"] == 1 and breaker.stats()["recent_failures"] == 0
+    with pytest.raises(Unavailable):
+        asyncio.run(resilience.call(always_fails))
+    assert breaker.stats()["recent_calls"] == 2 and breaker.stats()["recent_failures"] == 1
+
+
+def test_no_retry_once_the_breaker_opens(clock):
+    breaker = make_breaker(clock, window=1, min_calls=1)
+    resilience = Resilience(retry=RetryPolicy(attempts=3, base_ms=0, max_ms=0), breaker=breaker)
+    calls = []
+
+    async def always_fails():
+        calls.append(1)
+        # Other calls failing meanwhile open the breaker
+        breaker.record(False)
+        raise Unavailable("down")
+
+    with pytest.raises(Unavailable):
+        asyncio.run(resilience.call(always_fails))
+    assert len(calls) == 1
+    assert breaker.state == OPEN
+
+
+def test_non_transient_errors_are_not_retried():
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(Resilience(retry=RetryPolicy(attempts=3, base_ms=0, max_ms=0)).call(broken))
+    assert len(calls) == 1
+    assert is_transient(Unavailable()) and not is_transient(ValueError())
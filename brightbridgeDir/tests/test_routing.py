@@ -0,0 +1,45 @@
+from bridge.routing import DIRECT, ORCHESTRATOR, IntentRouter
+
+
+def test_unambiguous_request_goes_direct():
+    decision = IntentRouter().route("education", "How should I study for my exam?")
+    assert decision == (DIRECT, "education", "unambiguous")
+
+
+def test_signals_for_another_specialist_go_to_the_orchestrator():
+    decision = IntentRouter().route("education", "My exam is coming up and I am so anxious")
+    assert decision.route == ORCHESTRATOR and decision.reason == "ambiguous"
+
+
+def test_general_and_unknown_types_go_to_the_orchestrator():
+    router = IntentRouter()
+    assert router.route("general", "hello").reason == "general"
+    assert router.route("astrology", "hello").route == ORCHESTRATOR
+
+
+def test_crisis_is_always_direct():
+    decision = IntentRouter().route("crisis", "I feel overwhelmed about my exam and my job")
+    assert decision == (DIRECT, "crisis", "pinned")
+
+
+def test_overrides_and_disabled_routing():
+    assert IntentRouter().route("education", "study tips", override=ORCHESTRATOR).reason == "requested"
+    assert IntentRouter().route("education", "I am anxious", override=DIRECT).route == DIRECT
+    assert IntentRouter(enabled=False).route("education", "study tips").reason == "disabled"
+
+
+def test_keywords_match_whole_words():
+    router = IntentRouter()
+    assert "education" not in router.signals("I saw the latest news")
+    assert router.signals("Can't cope with my homework") == {"crisis", "education"}
+
+
+def test_latency_is_recorded_per_route():
+    router = IntentRouter()
+    router.record(router.route("education", "study tips"), 10.0)
+    router.record(router.route("education", "study tips"), 30.0)
+    router.record(router.route("general", "hi"), 50.0)
+    assert router.stats() == {
+        "direct:education": {"count": 2, "mean_ms": 20.0, "max_ms": 30.0},
+        "orchestrator": {"count": 1, "mean_ms": 50.0, "max_ms": 50.0},
+    }
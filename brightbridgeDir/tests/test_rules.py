@@ -0,0 +1,54 @@
+from bridge.keywords import KeywordMatcher, trie_pattern
+from bridge.rules import Rule, RuleEngine, load_rules
+
+
+def rule(name, priority=0, keywords=(), agent_types=(), exclusive=False):
+    return Rule(name, priority, tuple(keywords), frozenset(agent_types), f"<{name}>", exclusive)
+
+
+def test_trie_pattern_prefers_the_longest_keyword():
+    assert trie_pattern(["work", "workplace"]) == "work(?:place)?"
+    whole = KeywordMatcher({"a": ["work"], "b": ["workplace"]})
+    prefix = KeywordMatcher({"a": ["work"], "b": ["workplace"]}, whole_words=False)
+    assert list(whole.matches("At the workplace")) == [("workplace", frozenset({"b"}))]
+    assert list(prefix.matches("At the workplace")) == [("workplace", frozenset({"a", "b"}))]
+
+
+def test_whole_words_and_prefixes():
+    whole = KeywordMatcher({"education": ["test"]})
+    prefix = KeywordMatcher({"education": ["test"]}, whole_words=False)
+    assert whole.labels("I'm so attested") == set() and whole.labels("a Test tomorrow") == {"education"}
+    assert prefix.labels("testing") == {"education"} and prefix.labels("attest") == set()
+
+
+def test_shorter_keyword_labels_fold_in_only_at_a_word_end():
+    matcher = KeywordMatcher({"work": ["job"], "kids": ["job fair"], "other": ["jo"]})
+    assert matcher.labels("a job fair") == {"work", "kids"}
+    assert matcher.labels("a jo") == {"other"}
+
+
+def test_empty_matcher_matches_nothing():
+    matcher = KeywordMatcher({})
+    assert len(matcher) == 0 and matcher.labels("anything") == set()
+
+
+def test_rules_fire_by_priority_up_to_max_matches():
+    engine = RuleEngine([rule("social", 20, ["friends"]), rule("study", 30, ["study"]),
+                         rule("anxiety", 40, ["anxious"])])
+    names = [fired.name for fired in engine.match("Anxious about study with friends")]
+    assert names == ["anxiety", "study"]
+    assert engine.enrich("my friends") == "\n\n<social>"
+
+
+def test_exclusive_rule_stops_further_blocks():
+    engine = RuleEngine([rule("crisis", 100, agent_types=["crisis"], exclusive=True),
+                         rule("anxiety", 40, ["anxious"])])
+    assert [fired.name for fired in engine.match("so anxious", agent_type="crisis")] == ["crisis"]
+    assert [fired.name for fired in engine.match("so anxious")] == ["anxiety"]
+
+
+def test_default_rule_table_loads():
+    rules = load_rules()
+    assert rules and all(entry.text for entry in rules)
+    engine = RuleEngine(rules)
+    assert [fired.name for fired in engine.match("help with homework")] == ["study_strategies"]
@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import uuid
+
+import pytest
+
+from bridge.sessions import SessionManager
+
+
+def test_get_or_create_builds_once():
+    sessions = SessionManager()
+    first, created = sessions.get_or_create("s1", object)
+    again, created_again = sessions.get_or_create("s1", object)
+    assert created and not created_again
+    assert again is first
+    assert sessions.get("s1") is first and "s1" in sessions
+    assert sessions.get("s2") is None
+    assert (sessions.stats()["hits"], sessions.stats()["misses"]) == (2, 2)
+
+
+def test_least_recently_used_session_is_evicted():
+    evicted = []
+    sessions = SessionManager(max_sessions=2, on_evict=lambda key, value: evicted.append(key))
+    sessions.put("a", 1)
+    sessions.put("b", 2)
+    sessions.get("a")
+    sessions.put("c", 3)
+    assert evicted == ["b"]
+    assert "a" in sessions and "c" in sessions and len(sessions) == 2
+    assert sessions.stats()["evictions"] == 1
+
+
+def test_idle_sessions_expire(clock):
+    evicted = []
+    sessions = SessionManager(idle_ttl=10, clock=clock, on_evict=lambda key, value: evicted.append((key, value)))
+    sessions.put("a", 1)
+    clock.now = 5
+    sessions.put("b", 2)
+    clock.now = 12
+    assert sessions.sweep() == 1
+    assert evicted == [("a", 1)]
+    assert sessions.get("b") == 2
+    clock.now = 30
+    assert sessions.get("b") is None
+    assert sessions.stats()["expirations"] == 2
+
+
+def test_use_refreshes_the_idle_timer(clock):
+    sessions = SessionManager(idle_ttl=10, clock=clock)
+    sessions.put("a", 1)
+    clock.now = 8
+    assert sessions.get("a") == 1
+    clock.now = 16
+    assert sessions.get("a") == 1
+
+
+def test_discard_notifies():
+    evicted = []
+    sessions = SessionManager(on_evict=lambda key, value: evicted.append(key))
+    sessions.put("a", 1)
+    sessions.discard("a")
+    sessions.discard("missing")
+    assert evicted == ["a"] and len(sessions) == 0
+
+
+def test_app_keeps_one_session_when_the_user_name_changes():
+    pytest.importorskip("google.adk")
+    st = pytest.importorskip("streamlit")
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bridgebright_app.py")
+    spec = importlib.util.spec_from_file_location("bridgebright_app", path)
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+
+    st.session_state.session_id = str(uuid.uuid4())
+    st.session_state.user_name = ""
+    _, before = app.get_chat_session()
+    st.session_state.user_name = "Ann"
+    _, after = app.get_chat_session()
+    assert after is before
+    assert after.id == st.session_state.session_id
+
+
+def test_zero_limits_mean_unbounded(clock):
+    sessions = SessionManager(max_sessions=0, idle_ttl=0, clock=clock)
+    for index in range(100):
+        sessions.put(index, index)
+    clock.now = 1e9
+    assert sessions.sweep() == 0 and len(sessions) == 100
@@ -0,0 +1,310 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.events import Event
+from google.genai.types import ModelContent, UserContent
+
+from bridge.history import SUMMARY_PREFIX, HistoryCompactor
+from bridgebright.runner import APP_NAME, compact_session, event_text, new_session
+from bridgebright.sqlite_sessions import SqliteSessionService
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def open_service(path, **options):
+    return SqliteSessionService(path, **dict(dict(flush_ms=1.0), **options))
+
+
+def turn(author, text):
+    content = UserContent(text) if author == "user" else ModelContent(text)
+    return Event(invocation_id="inv", author=author, content=content)
+
+
+async def fill(service, session, count):
+    for index in range(count):
+        await service.append_event(session, turn("user" if index % 2 == 0 else "agent", f"message {index}"))
+
+
+def texts(session):
+    return [event_text(event) for event in session.events]
+
+
+def test_sessions_survive_a_restart(db_path):
+    async def write():
+        service = open_service(db_path)
+        session = await service.create_session(app_name=APP_NAME, user_id="ann", state={"mood": "ok"}, session_id="s1")
+        await fill(service, session, 4)
+        service.close()
+
+    async def read():
+        service = open_service(db_path)
+        session = await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        service.close()
+        return session
+
+    asyncio.run(write())
+    session = asyncio.run(read())
+    assert texts(session) == ["message 0", "message 1", "message 2", "message 3"]
+    assert session.state["mood"] == "ok"
+
+
+def test_session_row_is_written_on_first_event(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        session = new_session("ann", "s1")
+        await fill(service, session, 2)
+        await service.flush()
+        other = open_service(db_path)
+        try:
+            return await other.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        finally:
+            other.close()
+            service.close()
+
+    assert texts(asyncio.run(scenario())) == ["message 0", "message 1"]
+
+
+def test_create_session_rejects_duplicates(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        try:
+            await service.create_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+            with pytest.raises(ValueError):
+                await service.create_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        finally:
+            service.close()
+
+    asyncio.run(scenario())
+
+
+def test_discarded_events_are_not_reloaded(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        session = new_session("ann", "s1")
+        await fill(service, session, 3)
+        abandoned = session.events[1:]
+        del session.events[1:]
+        service.discard_events(session, abandoned)
+        await service.flush()
+        other = open_service(db_path)
+        try:
+            return await other.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        finally:
+            other.close()
+            service.close()
+
+    assert texts(asyncio.run(scenario())) == ["message 0"]
+
+
+def test_compaction_is_persisted(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        session = new_session("ann", "s1")
+        await fill(service, session, 10)
+        history = await compact_session(service, session, HistoryCompactor(keep_turns=2), "agent")
+        assert history is not None
+        service.close()
+        reopened = open_service(db_path)
+        try:
+            return session, await reopened.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        finally:
+            reopened.close()
+
+    session, stored = asyncio.run(scenario())
+    assert texts(stored) == texts(session)
+    assert len(stored.events) == 3
+    assert texts(stored)[0].startswith(SUMMARY_PREFIX)
+    assert texts(stored)[1:] == ["message 8", "message 9"]
+
+
+def test_get_session_applies_config(db_path):
+    from google.adk.sessions.base_session_service import GetSessionConfig
+
+    async def scenario():
+        service = open_service(db_path)
+        try:
+            session = await service.create_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+            await fill(service, session, 5)
+            return await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1",
+                                             config=GetSessionConfig(num_recent_events=2))
+        finally:
+            service.close()
+
+    assert texts(asyncio.run(scenario())) == ["message 3", "message 4"]
+
+
+def test_delete_idle_sessions(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        try:
+            session = await service.create_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+            await fill(service, session, 2)
+            assert service.delete_idle_sessions(3600) == 0
+            assert service.delete_idle_sessions(-1) == 1
+            return await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        finally:
+            service.close()
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_has_session(db_path):
+    async def scenario():
+        service = open_service(db_path)
+        try:
+            await service.create_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+            other = open_service(db_path)
+            try:
+                return (await other.has_session(APP_NAME, "ann", "s1"), await other.has_session(APP_NAME, "ann", "s2"))
+            finally:
+                other.close()
+        finally:
+            service.close()
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_failed_batch_is_requeued_and_retried(db_path, monkeypatch):
+    import sqlite3
+
+    # A long flush interval leaves every write to the test
+    service = open_service(db_path, flush_ms=60000.0)
+    execute = service._execute
+    failures = []
+
+    def locked_once(ops):
+        if not failures:
+            failures.append(ops)
+            raise sqlite3.OperationalError("database is locked")
+        return execute(ops)
+
+    monkeypatch.setattr(service, "_execute", locked_once)
+
+    async def scenario():
+        session = new_session("ann", "s1")
+        await fill(service, session, 2)
+        with pytest.raises(sqlite3.OperationalError):
+            service.flush_pending()
+        assert service.stats()["pending_rows"] > 0
+        await service.flush()
+        return await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+
+    try:
+        session = asyncio.run(scenario())
+        stats = service.stats()
+    finally:
+        service.close()
+    assert texts(session) == ["message 0", "message 1"]
+    assert (stats["write_errors"], stats["rows_dropped"], stats["pending_rows"]) == (1, 0, 0)
+
+
+def test_failed_batch_that_cannot_recover_is_dropped(db_path, monkeypatch):
+    import sqlite3
+
+    service = open_service(db_path, flush_ms=60000.0)
+
+    def broken(ops):
+        raise sqlite3.IntegrityError("constraint failed")
+
+    monkeypatch.setattr(service, "_execute", broken)
+
+    async def scenario():
+        await fill(service, new_session("ann", "s1"), 1)
+
+    asyncio.run(scenario())
+    with pytest.raises(sqlite3.IntegrityError):
+        service.flush_pending()
+    stats = service.stats()
+    monkeypatch.undo()
+    service.close()
+    assert stats["pending_rows"] == 0 and stats["rows_dropped"] == 2
+
+
+def test_batch_that_keeps_failing_is_dropped_after_the_retry_cap(db_path, monkeypatch):
+    import sqlite3
+
+    from bridgebright.sqlite_sessions import WRITE_MAX_ATTEMPTS
+
+    service = open_service(db_path, flush_ms=60000.0)
+    execute = service._execute
+
+    def poisoned(ops):
+        if any("poison" in str(params) for _, params in ops):
+            raise sqlite3.OperationalError("disk I/O error")
+        return execute(ops)
+
+    monkeypatch.setattr(service, "_execute", poisoned)
+
+    async def scenario():
+        await service.append_event(new_session("ann", "s1"), turn("user", "poison"))
+        with pytest.raises(sqlite3.OperationalError):
+            service.flush_pending()
+        # Rows queued behind the failing batch wait until it is dropped
+        await fill(service, new_session("bob", "s2"), 2)
+        for _ in range(WRITE_MAX_ATTEMPTS - 1):
+            with pytest.raises(sqlite3.OperationalError):
+                service.flush_pending()
+        service.flush_pending()
+        return (await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1"),
+                await service.get_session(app_name=APP_NAME, user_id="bob", session_id="s2"))
+
+    try:
+        dropped, written = asyncio.run(scenario())
+        stats = service.stats()
+    finally:
+        service.close()
+    assert dropped is None and texts(written) == ["message 0", "message 1"]
+    assert (stats["write_errors"], stats["rows_dropped"], stats["pending_rows"]) == (WRITE_MAX_ATTEMPTS, 2, 0)
+
+
+OTHER_WORKER = """
+import asyncio, sys
+sys.path.insert(0, {root!r})
+from google.adk.events import Event
+from google.genai.types import UserContent
+from bridgebright.runner import APP_NAME
+from bridgebright.sqlite_sessions import SqliteSessionService
+
+async def main():
+    service = SqliteSessionService({path!r})
+    session = await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+    await service.append_event(session, Event(invocation_id="other", author="user",
+                                              content=UserContent("from the other worker")))
+    service.close()
+
+asyncio.run(main())
+"""
+
+
+def test_compaction_of_a_stale_copy_keeps_another_process_turns(db_path):
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    async def scenario():
+        service = open_service(db_path)
+        session = new_session("ann", "s1")
+        await fill(service, session, 10)
+        await service.flush()
+        assert not await service.is_stale(session)
+
+        subprocess.run([sys.executable, "-c", OTHER_WORKER.format(root=root, path=db_path)], check=True)
+        assert await service.is_stale(session)
+
+        # This process's copy lacks the other worker's turn: compacting it must not overwrite the database
+        assert await compact_session(service, session, HistoryCompactor(keep_turns=2), "agent") is not None
+        await service.flush()
+        stored = await service.get_session(app_name=APP_NAME, user_id="ann", session_id="s1")
+        service.close()
+        return stored
+
+    stored = asyncio.run(scenario())
+    assert texts(stored) == [f"message {index}" for index in range(10)] + ["from the other worker"]
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import bridge_supervisor
+from bridge_supervisor import Supervisor
+
+SUPERVISOR_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bridge_supervisor.py")
+
+
+class FakeWorker:
+    def __init__(self, slot, outstanding=0):
+        self.slot = slot
+        self.pending = dict.fromkeys(range(outstanding))
+        self.dispatched = outstanding
+
+
+def chat(session_id=None, user_name="ann"):
+    return {"message": "hi", "user_name": user_name, "session_id": session_id}
+
+
+def test_affinity_keeps_a_session_on_one_slot():
+    async def scenario():
+        supervisor = Supervisor(4)
+        for slot in range(4):
+            await supervisor.fill_slot(slot, FakeWorker(slot))
+        picked = {(await supervisor.pick(chat("s1"))).slot for _ in range(5)}
+        spread = {(await supervisor.pick(chat(f"s{index}"))).slot for index in range(40)}
+        return picked, spread
+
+    picked, spread = asyncio.run(scenario())
+    assert len(picked) == 1
+    assert len(spread) > 1
+
+
+def test_least_picks_the_worker_with_fewest_outstanding():
+    async def scenario():
+        supervisor = Supervisor(3, dispatch="least")
+        for slot, outstanding in enumerate([2, 0, 1]):
+            await supervisor.fill_slot(slot, FakeWorker(slot, outstanding))
+        return (await supervisor.pick(chat("s1"))).slot, (await supervisor.pick(chat())).slot
+
+    assert asyncio.run(scenario()) == (1, 1)
+
+
+def test_session_waits_for_its_slot_to_be_refilled():
+    async def scenario():
+        supervisor = Supervisor(1)
+        waiting = asyncio.ensure_future(supervisor.pick(chat("s1")))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        replacement = FakeWorker(0)
+        await supervisor.fill_slot(0, replacement)
+        return await waiting is replacement
+
+    assert asyncio.run(scenario())
+
+
+def test_session_is_refused_rather_than_moved_when_its_slot_stays_empty(monkeypatch):
+    monkeypatch.setattr(bridge_supervisor, "SLOT_WAIT_SECONDS", 0.05)
+
+    async def scenario():
+        supervisor = Supervisor(2)
+        await supervisor.fill_slot(0, FakeWorker(0))
+        await supervisor.fill_slot(1, FakeWorker(1))
+        slot = (await supervisor.pick(chat("s1"))).slot
+        supervisor.slots[slot] = None
+        return await supervisor.pick(chat("s1")), (await supervisor.pick(chat())).slot, slot
+
+    session_worker, sessionless_slot, emptied = asyncio.run(scenario())
+    assert session_worker is None
+    assert sessionless_slot == 1 - emptied
+
+
+def run_supervisor(tmp_path, *args):
+    """The supervisor in mock mode on a Unix socket, and a connection to it"""
+    socket_path = str(tmp_path / "bridge.sock")
+    env = dict(os.environ, NODE_ENV="development", BRIDGE_MOCK_LATENCY="fixed:0")
+    process = subprocess.Popen([sys.executable, SUPERVISOR_SCRIPT, "--unix", socket_path, *args],
+                               env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not os.path.exists(socket_path):
+        assert process.poll() is None and time.monotonic() < deadline
+        time.sleep(0.05)
+    return process, socket_path
+
+
+async def exchange(socket_path, requests):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    results = []
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        while True:
+            result = json.loads(await asyncio.wait_for(reader.readline(), 10))
+            if result.get("event") not in bridge_supervisor.PROGRESS_EVENTS:
+                results.append(result)
+                break
+    writer.close()
+    return results
+
+
+def stop(process):
+    process.terminate()
+    assert process.wait(30) == 0
+
+
+def test_sessions_stay_on_one_worker(tmp_path):
+    process, socket_path = run_supervisor(tmp_path, "--workers", "3")
+    try:
+        requests = [dict(chat(f"s{index % 4}"), id=index, agent_type="general") for index in range(12)]
+        results = asyncio.run(exchange(socket_path, requests + [{"op": "stats", "id": "stats"}]))
+    finally:
+        stop(process)
+    assert all(result["success"] for result in results)
+    stats = results[-1]
+    assert len(stats["workers"]) == 3
+    # Each session was tracked by exactly one worker
+    assert sum(worker["stats"]["sessions"]["size"] for worker in stats["workers"]) == 4
+
+
+def test_recycled_workers_answer_everything(tmp_path):
+    # A 1 MB cap recycles every worker on each check
+    process, socket_path = run_supervisor(tmp_path, "--workers", "2", "--max-worker-mb", "1",
+                                          "--check-interval", "0.05")
+    try:
+        requests = []
+        for index in range(30):
+            requests.append(dict(chat(f"s{index % 3}"), id=index, agent_type="general"))
+            requests.append({"op": "stats", "id": f"stats{index}"})
+        results = asyncio.run(exchange(socket_path, requests))
+    finally:
+        stop(process)
+    assert len(results) == 60
+    assert all(result["success"] for result in results)
+    assert results[-1]["supervisor"]["recycled"] > 0
+    assert results[-1]["supervisor"]["lost_requests"] == 0
@@ -45,7 +45,7 @@ router.post('/chat', rateLimit, async (req, res) => {
       userAgent: req.get('User-Agent')
     });
 
-    const { message, userName, conversationHistory } = req.body;
+    const { message, userName, sessionId, conversationHistory } = req.body;
 
     // Input validation
     if (!message || typeof message !== 'string' || !message.trim()) {
@@ -68,16 +68,20 @@ router.post('/chat', rateLimit, async (req, res) => {
     const sanitizedHistory = Array.isArray(conversationHistory) 
       ? conversationHistory.slice(-10) // Keep only last 10 messages for context
       : [];
+    const sanitizedSessionId = typeof sessionId === 'string' && /^[\w-]{1,100}$/.test(sessionId)
+      ? sessionId
+      : null;
 
-    console.log(`Processing message from ${sanitizedUserName}: ${sanitizedMessage.substring(0, 100)}...`);
+    console.log(`Processing chat message (${sanitizedMessage.length} chars)`);
 
     const response = await brightBridge.processMessage({
       message: sanitizedMessage,
       userName: sanitizedUserName,
+      sessionId: sanitizedSessionId,
       conversationHistory: sanitizedHistory
     });
 
-    console.log(`Sending response: ${response.substring(0, 100)}...`);
+    console.log(`Sending response (${response.length} chars)`);
 
     res.json({ 
       response,
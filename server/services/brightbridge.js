@@ -7,9 +7,9 @@ export class BrightBridgeAgent {
     this.fallbackEnabled = true;
   }
 
-  async processMessage({ message, userName, conversationHistory }) {
+  async processMessage({ message, userName, sessionId, conversationHistory }) {
     try {
-      console.log(`Processing message from ${userName}: ${message.substring(0, 100)}...`);
+      console.log(`Processing message (${message.length} chars)`);
       
       // Analyze the message to determine which agent(s) to use
       const intent = this.analyzeIntent(message, conversationHistory);
@@ -20,10 +20,11 @@ export class BrightBridgeAgent {
         intent, 
         message, 
         userName, 
-        conversationHistory
+        conversationHistory,
+        sessionId
       );
       
-      console.log(`Received response: ${response.substring(0, 100)}...`);
+      console.log(`Received response (${response.length} chars)`);
       return response;
       
     } catch (error) {
@@ -20,6 +20,134 @@ export class PythonBridge {
       '/usr/bin/python3',
       '/usr/local/bin/python3'
     ];
+
+    // Opt-in persistent worker (agent_bridge.py --worker) instead of one process per message
+    this.useWorker = process.env.PYTHON_BRIDGE_MODE === 'worker';
+    this.worker = null;
+    this.workerStarting = null;
+    this.workerBuffer = '';
+    this.pending = new Map();
+    this.nextRequestId = 1;
+  }
+
+  pythonEnv() {
+    return {
+      ...process.env,
+      PYTHONPATH: this.pythonPath,
+      PYTHONUNBUFFERED: '1',
+      // Railway-specific environment
+      RAILWAY_ENVIRONMENT_NAME: process.env.RAILWAY_ENVIRONMENT_NAME || '',
+      NODE_ENV: process.env.NODE_ENV || 'production'
+    };
+  }
+
+  requestTimeout() {
+    return process.env.RAILWAY_ENVIRONMENT_NAME ? 30000 : 45000;
+  }
+
+  // Ask the bridge to cut the agent off a little before we would give up on it,
+  // so the user gets whatever it had produced instead of a timeout message
+  deadlineMs() {
+    return this.requestTimeout() - 2000;
+  }
+
+  async ensureWorker() {
+    if (this.worker) return this.worker;
+    if (!this.workerStarting) {
+      this.workerStarting = this.startWorker().finally(() => {
+        this.workerStarting = null;
+      });
+    }
+    return this.workerStarting;
+  }
+
+  async startWorker() {
+    const pythonCmd = await this.findPythonCommand();
+    console.log(`Starting persistent Python worker with: ${pythonCmd}`);
+
+    const worker = spawn(pythonCmd, [this.scriptPath, '--worker'], {
+      cwd: this.pythonPath,
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: this.pythonEnv()
+    });
+
+    worker.stdout.on('data', (data) => {
+      this.workerBuffer += data.toString();
+      let newline;
+      while ((newline = this.workerBuffer.indexOf('\n')) >= 0) {
+        const line = this.workerBuffer.slice(0, newline).trim();
+        this.workerBuffer = this.workerBuffer.slice(newline + 1);
+        if (line) this.handleWorkerLine(line);
+      }
+    });
+
+    worker.stderr.on('data', (data) => {
+      console.error('Python worker stderr:', data.toString());
+    });
+
+    const reset = (reason) => {
+      if (this.worker !== worker) return;
+      console.error(`Python worker stopped: ${reason}`);
+      this.worker = null;
+      this.workerBuffer = '';
+      for (const { resolve, timer } of this.pending.values()) {
+        clearTimeout(timer);
+        resolve("I'm experiencing technical difficulties with my AI agents. Please try again in a moment.");
+      }
+      this.pending.clear();
+    };
+
+    worker.on('close', (code) => reset(`exit code ${code}`));
+    worker.on('error', (error) => reset(error.message));
+
+    this.worker = worker;
+    return worker;
+  }
+
+  handleWorkerLine(line) {
+    let result;
+    try {
+      result = JSON.parse(line);
+    } catch (parseError) {
+      console.error('Failed to parse Python worker output:', line);
+      return;
+    }
+
+    const entry = this.pending.get(result.id);
+    if (!entry) return;
+    this.pending.delete(result.id);
+    clearTimeout(entry.timer);
+
+    if (result.success) {
+      entry.resolve(result.response);
+    } else {
+      console.error('Python agent error:', result.error);
+      entry.resolve(result.response || "I'm experiencing technical difficulties. Please try again.");
+    }
+  }
+
+  async callWorkerAgent(agentType, message, userName, conversationHistory, sessionId) {
+    const worker = await this.ensureWorker();
+    const id = this.nextRequestId++;
+
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        if (this.pending.delete(id)) {
+          resolve("I'm taking longer than usual to respond. Please try again with a shorter message.");
+        }
+      }, this.requestTimeout());
+
+      this.pending.set(id, { resolve, timer });
+      worker.stdin.write(JSON.stringify({
+        id,
+        agent_type: agentType,
+        message: message,
+        user_name: userName,
+        session_id: sessionId,
+        conversation_history: conversationHistory,
+        deadline_ms: this.deadlineMs()
+      }) + '\n');
+    });
   }
 
   async findPythonCommand() {
@@ -50,7 +178,16 @@ export class PythonBridge {
     throw new Error('No Python interpreter found');
   }
 
-  async callPythonAgent(agentType, message, userName, conversationHistory) {
+  async callPythonAgent(agentType, message, userName, conversationHistory, sessionId = null) {
+    if (this.useWorker) {
+      try {
+        return await this.callWorkerAgent(agentType, message, userName, conversationHistory, sessionId);
+      } catch (error) {
+        console.error('Python worker setup error:', error);
+        return "I'm experiencing setup issues with my AI agents. Please try again.";
+      }
+    }
+
     return new Promise(async (resolve, reject) => {
       try {
         const pythonCmd = await this.findPythonCommand();
@@ -59,21 +196,16 @@ export class PythonBridge {
         const pythonProcess = spawn(pythonCmd, [this.scriptPath], {
           cwd: this.pythonPath,
           stdio: ['pipe', 'pipe', 'pipe'],
-          env: {
-            ...process.env,
-            PYTHONPATH: this.pythonPath,
-            PYTHONUNBUFFERED: '1',
-            // Railway-specific environment
-            RAILWAY_ENVIRONMENT_NAME: process.env.RAILWAY_ENVIRONMENT_NAME || '',
-            NODE_ENV: process.env.NODE_ENV || 'production'
-          }
+          env: this.pythonEnv()
         });
 
         const requestData = JSON.stringify({
           agent_type: agentType,
           message: message,
           user_name: userName,
-          conversation_history: conversationHistory
+          session_id: sessionId,
+          conversation_history: conversationHistory,
+          deadline_ms: this.deadlineMs()
         });
 
         let outputData = '';
@@ -124,7 +256,7 @@ export class PythonBridge {
         pythonProcess.stdin.end();
 
         // Set a timeout appropriate for Railway
-        const timeout = process.env.RAILWAY_ENVIRONMENT_NAME ? 30000 : 45000;
+        const timeout = this.requestTimeout();
         setTimeout(() => {
           if (!pythonProcess.killed) {
             pythonProcess.kill('SIGTERM');
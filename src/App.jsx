@@ -14,6 +14,8 @@ function App() {
   const [showCrisis, setShowCrisis] = useState(false);
   const [connectionStatus, setConnectionStatus] = useState('checking');
   const messagesEndRef = useRef(null);
+  // Lets the agent bridge keep this conversation's context between messages
+  const sessionIdRef = useRef(crypto.randomUUID());
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -51,6 +53,7 @@ function App() {
       const data = await apiClient.post('/api/chat', {
         message: message,
         userName: userName || 'User',
+        sessionId: sessionIdRef.current,
         conversationHistory: messages.slice(-5) // Send only last 5 messages for context
       });
 
@@ -98,6 +101,7 @@ function App() {
 
   const clearConversation = () => {
     setMessages([]);
+    sessionIdRef.current = crypto.randomUUID();
   };
 
   const features = [